@@ -0,0 +1,129 @@
+# api/pagination.py
+"""
+Keyset (cursor) pagination for the read API
+
+Cursor pages seek on an indexed ordering instead of OFFSET, so page
+1,000 costs the same as page 1 on tables with millions of rows.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+from base64 import b64decode
+from functools import reduce
+import operator
+from urllib import parse
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination ordered by primary key unless a view says otherwise"""
+    
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = 'id'
+
+
+class CompositeKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over every ordering field, for non-unique sort keys
+    
+    CursorPagination only seeks on the first ordering field and steps
+    over ties with an offset capped at offset_cutoff, so a run of more
+    than 1,000 equal scores pages round in a loop. Here the cursor holds
+    the full ordering key of the boundary row and each page seeks past
+    it: (a, b) after (x, y) is a > x OR (a = x AND b > y). The last
+    ordering field must be unique and none may be null.
+    """
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+        
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek(queryset.model, ordering, position))
+        
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+    
+    def seek(self, model, ordering, position) -> Q:
+        """Rows after position in ordering"""
+        clauses = []
+        ties = {}
+        for order, value in zip(ordering, position):
+            name = order.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            clauses.append(Q(**ties, **{f'{name}__{lookup}': value}))
+            ties[name] = value
+        return reduce(operator.or_, clauses)
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.position(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+    
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+    
+    def position(self, instance):
+        """The instance's full ordering key, as cursor strings"""
+        names = [order.lstrip('-') for order in self.ordering]
+        if isinstance(instance, dict):
+            return [str(instance[name]) for name in names]
+        return [str(getattr(instance, name)) for name in names]
+    
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        position = tokens.get('p')
+        if position is not None and len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+
+class LeaderboardPagination(CompositeKeysetPagination):
+    """Highest score first; the cursor carries (score, id) so tied scores page correctly"""
+    
+    ordering = ('-total_trophy_score', 'id')
+
+
+class RankingPagination(CompositeKeysetPagination):
+    """Global rank order within one ranking period"""
+    
+    ordering = ('global_rank', 'id')
@@ -0,0 +1,102 @@
+# api/serializers.py
+"""
+Compact read-only serializers
+
+Related objects are exposed as ids (or a couple of flattened fields)
+rather than nested serializers, and ?fields=a,b,c trims any response
+down to the requested fields.
+"""
+
+from rest_framework import serializers
+from games.models import Game
+from rankings.models import RankingPeriod, UserRanking
+from trophies.models import Trophy, UserGameProgress
+from users.models import User
+
+
+class SparseFieldsMixin:
+    """Drop fields not listed in the ?fields= query parameter"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            for field_name in set(self.fields) - requested:
+                self.fields.pop(field_name)
+
+
+def requested_fields(request):
+    """Set of field names from ?fields=, or None for all fields"""
+    if request is None:
+        return None
+    fields = request.query_params.get('fields', '')
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    return requested or None
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    level_name = serializers.CharField(source='get_trophy_level_name', read_only=True)
+    
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'psn_id', 'psn_avatar_url', 'total_trophy_score',
+            'current_trophy_level', 'level_name', 'level_progress_percentage',
+            'bronze_count', 'silver_count', 'gold_count', 'platinum_count',
+            'last_trophy_sync',
+        ]
+
+
+class GameSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Game
+        fields = [
+            'id', 'np_communication_id', 'title', 'platform', 'icon_url', 'publisher',
+            'release_date', 'bronze_count', 'silver_count', 'gold_count', 'platinum_count',
+            'difficulty_multiplier', 'difficulty_category', 'completion_rate',
+        ]
+
+
+class TrophySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    game = serializers.IntegerField(source='game_id', read_only=True)
+    
+    class Meta:
+        model = Trophy
+        fields = [
+            'id', 'game', 'trophy_id', 'trophy_group_id', 'name', 'description',
+            'trophy_type', 'icon_url', 'hidden', 'earn_rate', 'rarity_level',
+        ]
+
+
+class UserGameProgressSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    game = serializers.IntegerField(source='game_id', read_only=True)
+    game_title = serializers.CharField(source='game.title', read_only=True)
+    platform = serializers.CharField(source='game.platform', read_only=True)
+    
+    class Meta:
+        model = UserGameProgress
+        fields = [
+            'id', 'game', 'game_title', 'platform', 'progress_percentage',
+            'bronze_earned', 'silver_earned', 'gold_earned', 'platinum_earned',
+            'total_score_earned', 'max_possible_score', 'completed',
+            'last_trophy_date', 'completion_date',
+        ]
+
+
+class RankingPeriodSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = RankingPeriod
+        fields = ['id', 'period_type', 'start_date', 'end_date', 'calculation_date']
+
+
+class UserRankingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    psn_id = serializers.CharField(source='user.psn_id', read_only=True)
+    period = serializers.IntegerField(source='ranking_period_id', read_only=True)
+    
+    class Meta:
+        model = UserRanking
+        fields = [
+            'id', 'period', 'global_rank', 'username', 'psn_id', 'total_score',
+            'trophies_earned_period', 'platinum_earned_period',
+        ]
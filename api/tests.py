@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class LeaderboardPaginationTests(TestCase):
+    """The leaderboard cursor seeks on (score, id), however many scores tie"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        # More ties than CursorPagination's offset_cutoff of 1,000
+        User.objects.bulk_create([User(username=f'tied{i:04d}', total_trophy_score=0) for i in range(1300)])
+        User.objects.bulk_create([User(username=f'top{i}', total_trophy_score=100 + i) for i in range(3)])
+    
+    def setUp(self):
+        cache.clear()  # anonymous throttle history
+    
+    def follow(self, url, link='next'):
+        pages = []
+        while url:
+            self.assertLess(len(pages), 20, f'{link} link never runs out')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['username'] for row in response.json()['results']])
+            url = response.json()[link]
+        return pages
+    
+    def test_tied_scores_page_through_once(self):
+        pages = self.follow(reverse('api:user-list') + '?page_size=200&fields=username')
+        usernames = [username for page in pages for username in page]
+        
+        self.assertEqual(len(pages), 7)
+        self.assertEqual(len(usernames), 1303)
+        self.assertEqual(len(set(usernames)), 1303)
+        self.assertEqual(usernames[:3], ['top2', 'top1', 'top0'])
+        self.assertEqual(usernames[3:], sorted(usernames[3:]))  # ties in id order
+    
+    def test_previous_links_walk_back(self):
+        pages = self.follow(reverse('api:user-list') + '?page_size=500&fields=username')
+        last = self.client.get(reverse('api:user-list') + '?page_size=500&fields=username')
+        for _ in range(len(pages) - 1):
+            last = self.client.get(last.json()['next'])
+        
+        back = self.follow(last.json()['previous'], link='previous')
+        self.assertEqual(back, pages[-2::-1])
+    
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('api:user-list') + '?cursor=cD14JnA9MQ%3D%3D')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,17 @@
+# api/urls.py
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from . import views
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('users', views.UserViewSet, basename='user')
+router.register('games', views.GameViewSet, basename='game')
+router.register('trophies', views.TrophyViewSet, basename='trophy')
+router.register('ranking-periods', views.RankingPeriodViewSet, basename='ranking-period')
+router.register('rankings', views.RankingViewSet, basename='ranking')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,169 @@
+# api/views.py
+"""
+Read-only API viewsets (mounted under /api/v1/)
+
+Querysets load only the columns the (possibly ?fields= trimmed)
+serializer reads, follow foreign keys with select_related, and page
+with keyset cursors on indexed orderings. GET requests read from a
+replica when one is configured (trophy_tracker.db_router).
+"""
+
+from django.db.models import Max
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from trophy_tracker.db_router import ReplicaReadsMixin
+from games.models import Game
+from rankings.models import RankingPeriod, UserRanking
+from trophies.models import Trophy, UserGameProgress
+from users.models import User
+from .pagination import KeysetPagination, LeaderboardPagination, RankingPagination
+from .serializers import (
+    GameSerializer, RankingPeriodSerializer, TrophySerializer,
+    UserGameProgressSerializer, UserRankingSerializer, UserSerializer,
+    requested_fields,
+)
+
+
+def select_columns(serializer_class, request, extra_columns=None, required_columns=('id',)):
+    """
+    Model columns a serializer reads for this request's ?fields=;
+    extra_columns maps serializer fields whose columns can't be derived
+    from their source
+    """
+    extra_columns = extra_columns or {}
+    fields = serializer_class.Meta.fields
+    requested = requested_fields(request)
+    if requested:
+        fields = [name for name in fields if name in requested]
+    
+    declared = serializer_class._declared_fields
+    columns = set(required_columns)
+    for name in fields:
+        if name in extra_columns:
+            columns.update(extra_columns[name])
+        elif name in declared:
+            columns.add(declared[name].source.replace('.', '__'))
+        else:
+            columns.add(name)
+    return columns
+
+
+class SparseQuerysetMixin:
+    """Defer every column the response will not use"""
+    
+    extra_columns = {}
+    # Columns always loaded (primary key and cursor ordering fields)
+    required_columns = ('id',)
+    
+    def get_queryset(self):
+        columns = select_columns(
+            self.get_serializer_class(), self.request, self.extra_columns, self.required_columns
+        )
+        return super().get_queryset().only(*columns)
+
+
+class UserViewSet(ReplicaReadsMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """Public trophy hunters, highest score first"""
+    
+    queryset = User.objects.filter(profile_public=True)
+    serializer_class = UserSerializer
+    pagination_class = LeaderboardPagination
+    lookup_field = 'username'
+    extra_columns = {'level_name': ('current_trophy_level',)}
+    required_columns = ('id', 'total_trophy_score')
+    
+    @action(detail=True, methods=['get'], pagination_class=KeysetPagination)
+    def progress(self, request, username=None):
+        """Per-game progress for one public user"""
+        user = get_object_or_404(User.objects.filter(profile_public=True).only('id'), username=username)
+        
+        columns = select_columns(
+            UserGameProgressSerializer, request,
+            extra_columns={'game': ('game',)}, required_columns=('id', 'game')
+        )
+        queryset = UserGameProgress.objects.filter(user=user, hidden=False).select_related('game').only(*columns)
+        
+        page = self.paginate_queryset(queryset)
+        serializer = UserGameProgressSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+
+class GameViewSet(ReplicaReadsMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """Games; filter with ?platform=PS5"""
+    
+    queryset = Game.objects.all()
+    serializer_class = GameSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        platform = self.request.query_params.get('platform')
+        if platform:
+            queryset = queryset.filter(platform=platform)
+        return queryset
+    
+    @action(detail=True, methods=['get'])
+    def trophies(self, request, pk=None):
+        """Trophies of one game"""
+        game = get_object_or_404(Game.objects.only('id'), pk=pk)
+        columns = select_columns(TrophySerializer, request, TrophyViewSet.extra_columns)
+        queryset = Trophy.objects.filter(game=game).only(*columns)
+        
+        page = self.paginate_queryset(queryset)
+        serializer = TrophySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+
+class TrophyViewSet(ReplicaReadsMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """Trophies; filter with ?game=<id> and ?trophy_type=gold"""
+    
+    queryset = Trophy.objects.all()
+    serializer_class = TrophySerializer
+    pagination_class = KeysetPagination
+    extra_columns = {'game': ('game',)}
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        game = self.request.query_params.get('game')
+        if game and game.isdigit():
+            queryset = queryset.filter(game_id=int(game))
+        trophy_type = self.request.query_params.get('trophy_type')
+        if trophy_type:
+            queryset = queryset.filter(trophy_type=trophy_type)
+        return queryset
+
+
+class RankingPeriodViewSet(ReplicaReadsMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """Calculated ranking periods"""
+    
+    queryset = RankingPeriod.objects.filter(rankings_calculated=True)
+    serializer_class = RankingPeriodSerializer
+    pagination_class = KeysetPagination
+
+
+class RankingViewSet(ReplicaReadsMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Rankings of one period (?period=<id>), by default the most recently
+    calculated one
+    """
+    
+    queryset = UserRanking.objects.select_related('user')
+    serializer_class = UserRankingSerializer
+    pagination_class = RankingPagination
+    extra_columns = {'period': ('ranking_period',)}
+    required_columns = ('id', 'global_rank', 'user')
+    
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user__profile_public=True)
+        period = self.request.query_params.get('period')
+        if period and period.isdigit():
+            return queryset.filter(ranking_period_id=int(period))
+        
+        latest = RankingPeriod.objects.filter(rankings_calculated=True).aggregate(
+            latest=Max('calculation_date')
+        )['latest']
+        return queryset.filter(
+            ranking_period__rankings_calculated=True,
+            ranking_period__calculation_date=latest
+        )
@@ -2,8 +2,10 @@
 # games/admin.py
 # =============================================================================
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.html import format_html
 from .models import Game
+from search.backends import ADMIN_RESULT_LIMIT, search_ids
 
 @admin.register(Game)
 class GameAdmin(admin.ModelAdmin):
@@ -50,6 +52,14 @@ class GameAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of icontains scans"""
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        ids = [pk for pk, _ in search_ids('games', search_term, limit=ADMIN_RESULT_LIMIT, prefix=True)]
+        queryset = queryset.filter(Q(pk__in=ids) | Q(np_communication_id=search_term.strip()))
+        return queryset, False
+    
     def get_difficulty_display(self, obj):
         """Display difficulty with color coding"""
         colors = {
@@ -66,8 +76,8 @@ class GameAdmin(admin.ModelAdmin):
         
         color = colors.get(obj.difficulty_category, '#007bff')
         return format_html(
-            '<span style="color: {}; font-weight: bold;">{:.1f}x</span>',
-            color, obj.difficulty_multiplier
+            '<span style="color: {}; font-weight: bold;">{}x</span>',
+            color, f"{obj.difficulty_multiplier:.1f}"
         )
     get_difficulty_display.short_description = 'Difficulty'
     
@@ -5,4 +5,7 @@ from django.apps import AppConfig
 
 class GamesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'games'
\ No newline at end of file
+    name = 'games'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
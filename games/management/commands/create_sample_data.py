@@ -1,17 +1,162 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
 from django.utils import timezone
-from games.models import Game, GameDifficultyRating
+from games.models import Game
 from trophies.models import Trophy, UserTrophy, UserGameProgress
+from trophies.bulk import insert_rows
+from trophies.scoring import BASE_POINTS, recompute_user_scores
+from rankings.milestones import backfill_milestones
 from rankings.models import RankingPeriod, UserRanking, TrophyMilestone
+import bisect
+import itertools
 import random
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 
 User = get_user_model()
 
-class Command(BaseCommand):
-    help = 'Create sample data for Trophy Tracker development and testing'
+SAMPLE_GAMES = [
+    # (title, platform, difficulty multiplier, description, bronze, silver, gold, platinum)
+    ('My Name is Mayo', 'PS4', 1.0, 'Click the mayo jar 10,000 times.', 5, 3, 2, 1),
+    ('Slyde', 'PS4', 1.0, 'Simple sliding block puzzle game.', 8, 4, 3, 1),
+    ('Life is Strange', 'PS4', 1.3, 'Episodic adventure game with time manipulation.', 15, 8, 4, 1),
+    ("Telltale's The Walking Dead", 'PS4', 1.4, 'Narrative-driven zombie survival game.', 20, 10, 5, 1),
+    ('Hollow Knight', 'PS4', 2.2, 'Challenging metroidvania with precise combat.', 25, 12, 6, 1),
+    ('Stardew Valley', 'PS4', 2.0, 'Farming simulation with RPG elements.', 30, 15, 8, 1),
+    ("Marvel's Spider-Man", 'PS5', 3.0, 'Open-world superhero action game.', 35, 18, 10, 1),
+    ('God of War (2018)', 'PS4', 3.0, 'Norse mythology action-adventure.', 32, 16, 9, 1),
+    ('Horizon Zero Dawn', 'PS4', 3.0, 'Post-apocalyptic robot hunting adventure.', 40, 20, 12, 1),
+    ('Final Fantasy XV', 'PS4', 4.0, 'JRPG with extensive grinding and side content.', 45, 22, 15, 1),
+    ('Persona 5 Royal', 'PS5', 4.0, '100+ hour JRPG with social simulation.', 50, 25, 18, 1),
+    ('Celeste', 'PS4', 5.0, 'Precision platformer with challenging mechanics.', 20, 10, 7, 1),
+    ('Dead Cells', 'PS4', 5.0, 'Challenging roguelike metroidvania.', 28, 14, 8, 1),
+    ('Dark Souls III', 'PS4', 6.0, 'Notoriously difficult action RPG.', 30, 15, 10, 1),
+    ('Bloodborne', 'PS4', 6.0, 'Gothic horror souls-like with aggressive combat.', 25, 12, 8, 1),
+    ('Sekiro: Shadows Die Twice', 'PS4', 6.0, 'Shinobi action game with punishing difficulty.', 22, 11, 7, 1),
+    ('Super Meat Boy', 'PS5', 8.0, 'Brutal precision platformer.', 15, 8, 5, 1),
+    ('Cuphead', 'PS4', 8.0, 'Hand-drawn run-and-gun with boss rush.', 18, 9, 6, 1),
+    ('Crypt of the NecroDancer', 'PS4', 10.0, 'Rhythm-based roguelike with perfect timing requirements.', 12, 6, 4, 1),
+    ('The Binding of Isaac: Repentance', 'PS5', 10.0, 'Extremely challenging roguelike with RNG elements.', 20, 10, 8, 1),
+]
+
+# Column order of the UserTrophy row tuples written with insert_rows()
+USER_TROPHY_COLUMNS = ['user', 'trophy', 'earned', 'earned_datetime', 'synced_at', 'created_at']
+PROGRESS_COLUMNS = [
+    'user', 'game', 'progress_percentage', 'bronze_earned', 'silver_earned', 'gold_earned', 'platinum_earned',
+    'total_score_earned', 'max_possible_score', 'completed', 'hidden', 'started_date', 'last_trophy_date',
+    'completion_date', 'last_updated',
+]
+
+TITLE_ADJECTIVES = [
+    'Crimson', 'Silent', 'Eternal', 'Broken', 'Neon', 'Forgotten', 'Iron', 'Hollow',
+    'Savage', 'Lunar', 'Shattered', 'Golden', 'Frozen', 'Wild', 'Last', 'Hidden',
+]
+TITLE_NOUNS = [
+    'Kingdom', 'Frontier', 'Legacy', 'Horizon', 'Protocol', 'Odyssey', 'Requiem', 'Arena',
+    'Dynasty', 'Echoes', 'Tides', 'Citadel', 'Outlaws', 'Chronicle', 'Labyrinth', 'Vanguard',
+]
+
+# Multiplier -> weight for generated games (most games are AAA-ish)
+DIFFICULTY_WEIGHTS = [(1.0, 4), (1.3, 6), (2.0, 14), (3.0, 40), (4.0, 16), (5.0, 9), (6.0, 6), (8.0, 3), (10.0, 2)]
+
+TROPHY_TEMPLATES = {
+    'bronze': [
+        ('First Steps', 'Complete the tutorial'),
+        ('Collector', 'Find 10 collectibles'),
+        ('Explorer', 'Visit 5 different areas'),
+        ('Survivor', 'Survive for 10 minutes'),
+        ('Fighter', 'Win 5 battles'),
+        ('Helper', 'Complete a side quest'),
+        ('Skilled', 'Perform a special move'),
+        ('Lucky', 'Find a rare item'),
+        ('Patient', 'Wait for 1 minute'),
+        ('Quick', 'Complete a level in under 2 minutes'),
+    ],
+    'silver': [
+        ('Veteran', 'Complete 50% of the game'),
+        ('Master Collector', 'Find 50 collectibles'),
+        ('Boss Slayer', 'Defeat 10 bosses'),
+        ('Completionist', 'Complete all side quests'),
+        ('Speedster', 'Complete game in under 5 hours'),
+        ('Perfectionist', 'Get perfect score on a level'),
+    ],
+    'gold': [
+        ('Champion', 'Complete the main story'),
+        ('Legendary', 'Reach maximum level'),
+        ('Flawless', 'Complete game without dying'),
+        ('Ultimate Collector', 'Find all collectibles'),
+        ('Master', 'Unlock all abilities'),
+    ],
+}
+
+# Earn rate ranges (%) per trophy type
+EARN_RATE_RANGES = {
+    'bronze': (40.0, 95.0),
+    'silver': (20.0, 70.0),
+    'gold': (10.0, 50.0),
+    'platinum': (1.0, 15.0),
+}
+
+SAMPLE_USERNAMES = [
+    'TrophyHunter2024', 'PlatinumSeeker', 'GamingLegend', 'SoulsVeteran',
+    'IndieExplorer', 'RPGMaster', 'SpeedRunner99', 'CompletionistPro',
+    'CasualGamer', 'HardcorePlayer', 'RetroCollector', 'AchievementUnlocker',
+    'DigitalNinja', 'PixelWarrior', 'GamepadGuru', 'ConsoleCommander',
+]
+
+def rarity_for_earn_rate(earn_rate):
+    """Rarity level (0 common .. 4 ultra rare) for an earn rate percentage"""
+    if earn_rate < 1:
+        return 4
+    if earn_rate < 5:
+        return 3
+    if earn_rate < 15:
+        return 2
+    if earn_rate < 50:
+        return 1
+    return 0
 
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class GameTable:
+    """Per-game lookup arrays used while generating libraries"""
+    
+    def __init__(self, game, trophies):
+        self.game_id = game.pk
+        self.multiplier = game.difficulty_multiplier
+        # Earned progressively from the most to the least commonly earned trophy
+        ordered = sorted(
+            (trophy for trophy in trophies if trophy[1] != 'platinum'),
+            key=lambda trophy: -trophy[2]
+        )
+        self.trophy_ids = [trophy[0] for trophy in ordered]
+        self.types = [trophy[1] for trophy in ordered]
+        self.points = [int(BASE_POINTS[trophy_type] * self.multiplier) for trophy_type in self.types]
+        # Cumulative counts/points so any "first k earned" prefix is O(1) to score
+        self.cumulative_points = list(itertools.accumulate(self.points, initial=0))
+        self.cumulative_types = {
+            trophy_type: list(itertools.accumulate((t == trophy_type for t in self.types), initial=0))
+            for trophy_type in ('bronze', 'silver', 'gold')
+        }
+        platinum = [trophy for trophy in trophies if trophy[1] == 'platinum']
+        self.platinum_id = platinum[0][0] if platinum else None
+        self.platinum_points = int(BASE_POINTS['platinum'] * self.multiplier)
+        self.total = len(trophies)
+        self.max_score = game.calculate_max_possible_score()
+        # Harder games have lower completion rates
+        self.completion_factor = max(0.2, 1.0 - (self.multiplier - 1.0) * 0.1)
+
+class Command(BaseCommand):
+    help = 'Create seeded, production-scale sample data for Trophy Tracker development and benchmarking'
+    
     def add_arguments(self, parser):
         parser.add_argument(
             '--users',
@@ -25,6 +170,35 @@ class Command(BaseCommand):
             default=20,
             help='Number of sample games to create',
         )
+        parser.add_argument(
+            '--avg-library',
+            type=int,
+            default=10,
+            help='Average number of games each user has played',
+        )
+        parser.add_argument(
+            '--avg-trophies',
+            type=int,
+            default=40,
+            help='Average trophies per generated game (beyond the built-in sample games)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed - the same seed and options always produce the same data',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk_create batch',
+        )
+        parser.add_argument(
+            '--include-unearned',
+            action='store_true',
+            help='Also create unearned UserTrophy rows (the old dense shape; syncs now only store earned trophies)',
+        )
         parser.add_argument(
             '--clear',
             action='store_true',
@@ -32,494 +206,331 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        if options['games'] < 1 or options['users'] < 0:
+            raise CommandError('--games must be at least 1 and --users non-negative')
+        
+        self.seed = options['seed']
+        self.chunk_size = options['chunk_size']
+        started = time.perf_counter()
+        
         if options['clear']:
             self.stdout.write(self.style.WARNING('Clearing existing data...'))
             self.clear_data()
 
         self.stdout.write(self.style.SUCCESS('Creating sample data...'))
         
-        # Create sample games first
-        games = self.create_sample_games(options['games'])
-        
-        # Create sample users
-        users = self.create_sample_users(options['users'])
+        if connection.vendor == 'sqlite':
+            # Throwaway benchmark data - skip fsync on every commit
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
         
-        # Create trophies for games
-        self.create_sample_trophies(games)
+        games = self.create_sample_games(options['games'], options['avg_trophies'])
+        tables = self.create_sample_trophies(games)
+        user_ids = self.create_sample_users(options['users'])
+        rows = self.create_user_progress(user_ids, tables, options['avg_library'], options['include_unearned'])
         
-        # Create user progress and earned trophies
-        self.create_user_progress(users, games)
+        # Totals, counts and levels in one set-based pass
+        recompute_user_scores(user_ids)
         
-        # Create ranking periods
         self.create_ranking_periods()
+        self.create_sample_milestones(user_ids)
         
-        # Create some milestones
-        self.create_sample_milestones(users, games)
-
+        elapsed = time.perf_counter() - started
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully created sample data: '
-                f'{len(users)} users, {len(games)} games'
+                f'{len(user_ids)} users, {len(games)} games, {rows:,} user trophies '
+                f'in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)'
             )
         )
 
     def clear_data(self):
         """Clear existing data"""
-        UserTrophy.objects.all().delete()
-        Trophy.objects.all().delete()
-        UserGameProgress.objects.all().delete()
-        GameDifficultyRating.objects.all().delete()
-        UserRanking.objects.all().delete()
         TrophyMilestone.objects.all().delete()
+        UserRanking.objects.all().delete()
         RankingPeriod.objects.all().delete()
+        UserTrophy.objects.all().delete()
+        UserGameProgress.objects.all().delete()
+        Trophy.objects.all().delete()
         Game.objects.all().delete()
         # Keep superuser, delete other users
         User.objects.filter(is_superuser=False).delete()
-
-    def create_sample_games(self, count):
-        """Create sample games with varying difficulties"""
+    
+    def bulk_insert(self, model, objects):
+        """bulk_create in chunks, each in its own transaction"""
+        for chunk in chunked(objects, self.chunk_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+    
+    def create_sample_games(self, count, avg_trophies):
+        """Create the curated sample games, then generated ones up to count"""
+        rng = random.Random(f"{self.seed}:games")
+        multipliers, weights = zip(*DIFFICULTY_WEIGHTS)
+        cumulative_weights = list(itertools.accumulate(weights))
+        now = timezone.now()
+        start = Game.objects.count()
         
-        sample_games = [
-            # Extremely Easy (Ratalaika games)
-            {
-                'title': 'My Name is Mayo',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 1.0,
-                'description': 'Click the mayo jar 10,000 times.',
-                'bronze': 5, 'silver': 3, 'gold': 2, 'platinum': 1
-            },
-            {
-                'title': 'Slyde',
-                'platform': 'PS4',
-                'difficulty_multiplier': 1.0,
-                'description': 'Simple sliding block puzzle game.',
-                'bronze': 8, 'silver': 4, 'gold': 3, 'platinum': 1
-            },
-            
-            # Easy Games
-            {
-                'title': 'Life is Strange',
-                'platform': 'PS4',
-                'difficulty_multiplier': 1.3,
-                'description': 'Episodic adventure game with time manipulation.',
-                'bronze': 15, 'silver': 8, 'gold': 4, 'platinum': 1
-            },
-            {
-                'title': 'Telltale\'s The Walking Dead',
-                'platform': 'PS4',
-                'difficulty_multiplier': 1.4,
-                'description': 'Narrative-driven zombie survival game.',
-                'bronze': 20, 'silver': 10, 'gold': 5, 'platinum': 1
-            },
-            
-            # Standard Games
-            {
-                'title': 'Hollow Knight',
-                'platform': 'PS4',
-                'difficulty_multiplier': 2.2,
-                'description': 'Challenging metroidvania with precise combat.',
-                'bronze': 25, 'silver': 12, 'gold': 6, 'platinum': 1
-            },
-            {
-                'title': 'Stardew Valley',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 2.0,
-                'description': 'Farming simulation with RPG elements.',
-                'bronze': 30, 'silver': 15, 'gold': 8, 'platinum': 1
-            },
-            
-            # AAA Standard
-            {
-                'title': 'Marvel\'s Spider-Man',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 3.0,
-                'description': 'Open-world superhero action game.',
-                'bronze': 35, 'silver': 18, 'gold': 10, 'platinum': 1
-            },
-            {
-                'title': 'God of War (2018)',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 3.0,
-                'description': 'Norse mythology action-adventure.',
-                'bronze': 32, 'silver': 16, 'gold': 9, 'platinum': 1
-            },
-            {
-                'title': 'Horizon Zero Dawn',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 3.0,
-                'description': 'Post-apocalyptic robot hunting adventure.',
-                'bronze': 40, 'silver': 20, 'gold': 12, 'platinum': 1
-            },
-            
-            # Grind-Heavy
-            {
-                'title': 'Final Fantasy XV',
-                'platform': 'PS4',
-                'difficulty_multiplier': 4.0,
-                'description': 'JRPG with extensive grinding and side content.',
-                'bronze': 45, 'silver': 22, 'gold': 15, 'platinum': 1
-            },
-            {
-                'title': 'Persona 5 Royal',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 4.0,
-                'description': '100+ hour JRPG with social simulation.',
-                'bronze': 50, 'silver': 25, 'gold': 18, 'platinum': 1
-            },
-            
-            # Challenging
-            {
-                'title': 'Celeste',
-                'platform': 'PS4',
-                'difficulty_multiplier': 5.0,
-                'description': 'Precision platformer with challenging mechanics.',
-                'bronze': 20, 'silver': 10, 'gold': 7, 'platinum': 1
-            },
-            {
-                'title': 'Dead Cells',
-                'platform': 'PS4',
-                'difficulty_multiplier': 5.0,
-                'description': 'Challenging roguelike metroidvania.',
-                'bronze': 28, 'silver': 14, 'gold': 8, 'platinum': 1
-            },
-            
-            # Souls-like
-            {
-                'title': 'Dark Souls III',
-                'platform': 'PS4',
-                'difficulty_multiplier': 6.0,
-                'description': 'Notoriously difficult action RPG.',
-                'bronze': 30, 'silver': 15, 'gold': 10, 'platinum': 1
-            },
-            {
-                'title': 'Bloodborne',
-                'platform': 'PS4',
-                'difficulty_multiplier': 6.0,
-                'description': 'Gothic horror souls-like with aggressive combat.',
-                'bronze': 25, 'silver': 12, 'gold': 8, 'platinum': 1
-            },
-            {
-                'title': 'Sekiro: Shadows Die Twice',
-                'platform': 'PS4',
-                'difficulty_multiplier': 6.0,
-                'description': 'Shinobi action game with punishing difficulty.',
-                'bronze': 22, 'silver': 11, 'gold': 7, 'platinum': 1
-            },
-            
-            # Very Difficult
-            {
-                'title': 'Super Meat Boy',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 8.0,
-                'description': 'Brutal precision platformer.',
-                'bronze': 15, 'silver': 8, 'gold': 5, 'platinum': 1
-            },
-            {
-                'title': 'Cuphead',
-                'platform': 'PS4',
-                'difficulty_multiplier': 8.0,
-                'description': 'Hand-drawn run-and-gun with boss rush.',
-                'bronze': 18, 'silver': 9, 'gold': 6, 'platinum': 1
-            },
-            
-            # Extremely Difficult
-            {
-                'title': 'Crypt of the NecroDancer',
-                'platform': 'PS4',
-                'difficulty_multiplier': 10.0,
-                'description': 'Rhythm-based roguelike with perfect timing requirements.',
-                'bronze': 12, 'silver': 6, 'gold': 4, 'platinum': 1
-            },
-            {
-                'title': 'The Binding of Isaac: Repentance',
-                'platform': 'PS4,PS5',
-                'difficulty_multiplier': 10.0,
-                'description': 'Extremely challenging roguelike with RNG elements.',
-                'bronze': 20, 'silver': 10, 'gold': 8, 'platinum': 1
-            }
-        ]
-
         games = []
-        for i, game_data in enumerate(sample_games[:count]):
-            game = Game.objects.create(
-                np_communication_id=f'NPWR{10000 + i:05d}_00',
-                np_title_id=f'CUSA{10000 + i:05d}_00',
-                title=game_data['title'],
-                description=game_data['description'],
-                platform=game_data['platform'],
-                difficulty_multiplier=game_data['difficulty_multiplier'],
-                bronze_count=game_data['bronze'],
-                silver_count=game_data['silver'],
-                gold_count=game_data['gold'],
-                platinum_count=game_data['platinum'],
-                admin_verified=True,
-                players_count=random.randint(1000, 50000),
-                completion_rate=random.uniform(5.0, 85.0),
-                last_synced=timezone.now()
-            )
-            games.append(game)
-
-        self.stdout.write(f'Created {len(games)} sample games')
-        return games
-
-    def create_sample_users(self, count):
-        """Create sample users with PSN IDs"""
-        
-        sample_usernames = [
-            'TrophyHunter2024', 'PlatinumSeeker', 'GamingLegend', 'SoulsVeteran',
-            'IndieExplorer', 'RPGMaster', 'SpeedRunner99', 'CompletionistPro',
-            'CasualGamer', 'HardcorePlayer', 'RetroCollector', 'AchievementUnlocker',
-            'DigitalNinja', 'PixelWarrior', 'GamepadGuru', 'ConsoleCommander'
-        ]
-        
-        users = []
         for i in range(count):
-            username = f"{sample_usernames[i % len(sample_usernames)]}{i+1}"
-            psn_id = f"{username.lower()}"
+            index = start + i
+            if index < len(SAMPLE_GAMES):
+                title, platform, multiplier, description, bronze, silver, gold, platinum = SAMPLE_GAMES[index]
+            else:
+                title = f"{rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_NOUNS)} {index + 1}"
+                platform = rng.choice(['PS4', 'PS4', 'PS5', 'PS5', 'PS3', 'PSV'])
+                multiplier = rng.choices(multipliers, cum_weights=cumulative_weights)[0]
+                description = f"Generated sample game #{index + 1}."
+                trophies = max(4, int(rng.gauss(avg_trophies, avg_trophies / 3)))
+                gold = max(1, trophies // 12)
+                silver = max(1, trophies // 5)
+                bronze = max(1, trophies - gold - silver - 1)
+                platinum = 1 if trophies >= 12 else 0
             
-            user = User.objects.create_user(
-                username=username,
-                email=f"{username.lower()}@example.com",
-                password='testpassword123',
-                psn_id=psn_id,
-                profile_public=random.choice([True, True, True, False]),  # 75% public
-                allow_trophy_sync=True,
-                last_trophy_sync=timezone.now() - timedelta(hours=random.randint(1, 72))
-            )
-            users.append(user)
-
-        self.stdout.write(f'Created {len(users)} sample users')
-        return users
-
+            games.append(Game(
+                np_communication_id=f'NPWR{10000 + index:05d}_00',
+                title=title,
+                description=description,
+                platform=platform,
+                difficulty_multiplier=multiplier,
+                bronze_count=bronze,
+                silver_count=silver,
+                gold_count=gold,
+                platinum_count=platinum,
+                completion_rate=round(rng.uniform(5.0, 85.0), 1),
+                last_synced=now,
+            ))
+        
+        self.bulk_insert(Game, games)
+        games = list(Game.objects.filter(
+            np_communication_id__in=[game.np_communication_id for game in games]
+        ).order_by('pk'))
+        self.stdout.write(f'Created {len(games)} sample games')
+        return games
+    
     def create_sample_trophies(self, games):
-        """Create trophies for each game"""
+        """Create trophies for each game; returns the per-game lookup tables"""
+        rng = random.Random(f"{self.seed}:trophies")
         
-        trophy_templates = {
-            'bronze': [
-                ('First Steps', 'Complete the tutorial'),
-                ('Collector', 'Find 10 collectibles'),
-                ('Explorer', 'Visit 5 different areas'),
-                ('Survivor', 'Survive for 10 minutes'),
-                ('Fighter', 'Win 5 battles'),
-                ('Helper', 'Complete a side quest'),
-                ('Skilled', 'Perform a special move'),
-                ('Lucky', 'Find a rare item'),
-                ('Patient', 'Wait for 1 minute'),
-                ('Quick', 'Complete a level in under 2 minutes')
-            ],
-            'silver': [
-                ('Veteran', 'Complete 50% of the game'),
-                ('Master Collector', 'Find 50 collectibles'),
-                ('Boss Slayer', 'Defeat 10 bosses'),
-                ('Completionist', 'Complete all side quests'),
-                ('Speedster', 'Complete game in under 5 hours'),
-                ('Perfectionist', 'Get perfect score on a level')
-            ],
-            'gold': [
-                ('Champion', 'Complete the main story'),
-                ('Legendary', 'Reach maximum level'),
-                ('Flawless', 'Complete game without dying'),
-                ('Ultimate Collector', 'Find all collectibles'),
-                ('Master', 'Unlock all abilities')
-            ],
-            'platinum': [
-                ('Platinum Trophy', 'Earn all other trophies')]
-        }
-
-        for game in games:
-            trophy_id = 0
-            
-            # Create platinum trophy first
-            platinum_trophy = Trophy.objects.create(
-                game=game,
-                trophy_id=trophy_id,
-                name=f"{game.title} Platinum",
-                description=f"Earn all other trophies in {game.title}",
-                trophy_type='platinum',
-                earn_rate=random.uniform(1.0, 15.0),
-                rarity_level=random.choice([3, 4])  # Very Rare or Ultra Rare
-            )
-            trophy_id += 1
-
-            # Create other trophies
-            for trophy_type in ['bronze', 'silver', 'gold']:
-                count = getattr(game, f'{trophy_type}_count')
-                templates = trophy_templates[trophy_type]
-                
-                for i in range(count):
-                    template = random.choice(templates)
-                    name = f"{template[0]} {i+1}" if i > 0 else template[0]
-                    
-                    Trophy.objects.create(
+        def generate():
+            for game in games:
+                trophy_id = 0
+                if game.platinum_count:
+                    earn_rate = round(rng.uniform(*EARN_RATE_RANGES['platinum']), 2)
+                    yield Trophy(
                         game=game,
                         trophy_id=trophy_id,
-                        name=name,
-                        description=template[1],
-                        trophy_type=trophy_type,
-                        hidden=random.choice([False, False, False, True]),  # 25% hidden
-                        earn_rate=self.get_random_earn_rate(trophy_type),
-                        rarity_level=self.get_rarity_level(trophy_type),
-                        has_progress_target=random.choice([False, False, True]),  # 33% have progress
-                        progress_target_value=random.randint(10, 100) if random.choice([False, True]) else None
+                        name=f"{game.title} Platinum",
+                        description=f"Earn all other trophies in {game.title}",
+                        trophy_type='platinum',
+                        points=int(BASE_POINTS['platinum'] * game.difficulty_multiplier),
+                        earn_rate=earn_rate,
+                        rarity_level=rarity_for_earn_rate(earn_rate),
                     )
                     trophy_id += 1
-
-        total_trophies = Trophy.objects.count()
-        self.stdout.write(f'Created {total_trophies} trophies')
-
-    def get_random_earn_rate(self, trophy_type):
-        """Generate realistic earn rates based on trophy type"""
-        if trophy_type == 'bronze':
-            return random.uniform(40.0, 95.0)
-        elif trophy_type == 'silver':
-            return random.uniform(20.0, 70.0)
-        elif trophy_type == 'gold':
-            return random.uniform(10.0, 50.0)
-        else:  # platinum
-            return random.uniform(1.0, 15.0)
-
-    def get_rarity_level(self, trophy_type):
-        """Assign rarity based on trophy type and earn rate"""
-        if trophy_type == 'bronze':
-            return random.choice([0, 0, 1, 1, 2])  # Mostly common/uncommon
-        elif trophy_type == 'silver':
-            return random.choice([1, 1, 2, 2, 3])  # Uncommon to rare
-        elif trophy_type == 'gold':
-            return random.choice([2, 2, 3, 3, 4])  # Rare to ultra rare
-        else:  # platinum
-            return random.choice([3, 4, 4])  # Very rare to ultra rare
-
-    def create_user_progress(self, users, games):
-        """Create user progress and earned trophies"""
-        
-        for user in users:
-            # Each user plays a random subset of games
-            user_games = random.sample(games, random.randint(3, min(15, len(games))))
-            
-            for game in user_games:
-                # Create progress record
-                progress = UserGameProgress.objects.create(
-                    user=user,
-                    game=game,
-                    started_date=timezone.now() - timedelta(days=random.randint(1, 365))
-                )
-                
-                # Determine completion percentage based on game difficulty
-                base_completion = random.uniform(10, 90)
-                # Harder games have lower completion rates
-                difficulty_factor = max(0.2, 1.0 - (game.difficulty_multiplier - 1.0) * 0.1)
-                completion_rate = base_completion * difficulty_factor
-                
-                # Get all trophies for this game
-                all_trophies = list(game.trophies.all())
-                total_trophies = len(all_trophies)
                 
-                if total_trophies > 0:
-                    # Calculate how many trophies to earn
-                    trophies_to_earn = int((completion_rate / 100) * total_trophies)
-                    
-                    # Sort trophies by earn rate (easier trophies first)
-                    all_trophies.sort(key=lambda t: t.earn_rate or 50, reverse=True)
-                    
-                    # Award trophies
-                    for i, trophy in enumerate(all_trophies[:trophies_to_earn]):
-                        earned_date = progress.started_date + timedelta(
-                            days=random.randint(0, 100),
-                            hours=random.randint(0, 23)
+                for trophy_type in ('bronze', 'silver', 'gold'):
+                    templates = TROPHY_TEMPLATES[trophy_type]
+                    for i in range(getattr(game, f'{trophy_type}_count')):
+                        name, description = templates[rng.randrange(len(templates))]
+                        # Skewed towards the easy end of the range, like real earn rates
+                        low, high = EARN_RATE_RANGES[trophy_type]
+                        earn_rate = round(low + (high - low) * rng.random() ** 1.5, 2)
+                        has_progress_target = rng.random() < 0.33
+                        yield Trophy(
+                            game=game,
+                            trophy_id=trophy_id,
+                            name=f"{name} {i + 1}" if i > 0 else name,
+                            description=description,
+                            trophy_type=trophy_type,
+                            points=int(BASE_POINTS[trophy_type] * game.difficulty_multiplier),
+                            hidden=rng.random() < 0.25,
+                            earn_rate=earn_rate,
+                            rarity_level=rarity_for_earn_rate(earn_rate),
+                            has_progress_target=has_progress_target,
+                            progress_target_value=rng.randint(10, 100) if has_progress_target else None,
                         )
-                        
-                        UserTrophy.objects.create(
-                            user=user,
-                            trophy=trophy,
-                            earned=True,
-                            earned_datetime=earned_date,
-                            progress_value=trophy.progress_target_value if trophy.has_progress_target else None,
-                            progress_rate=100 if trophy.has_progress_target else None
-                        )
-                
-                # Update progress statistics
-                progress.update_progress()
-            
-            # Update user's total scores and level
-            user.calculate_total_score()
-            user.update_trophy_level()
-            
-            # Update trophy counts
-            user_trophies = UserTrophy.objects.filter(user=user, earned=True)
-            user.bronze_count = user_trophies.filter(trophy__trophy_type='bronze').count()
-            user.silver_count = user_trophies.filter(trophy__trophy_type='silver').count()
-            user.gold_count = user_trophies.filter(trophy__trophy_type='gold').count()
-            user.platinum_count = user_trophies.filter(trophy__trophy_type='platinum').count()
-            user.save()
-
-        self.stdout.write('Created user progress and earned trophies')
-
-    def create_ranking_periods(self):
-        """Create ranking periods"""
+                        trophy_id += 1
+        
+        self.bulk_insert(Trophy, generate())
         
-        # All-time ranking
-        RankingPeriod.objects.create(
-            period_type='all_time',
-            start_date=timezone.now() - timedelta(days=365),
-            active=True,
-            rankings_calculated=True,
-            calculation_date=timezone.now()
+        by_game = {game.pk: [] for game in games}
+        rows = Trophy.objects.filter(game_id__in=by_game).order_by('game_id', 'trophy_id').values_list(
+            'game_id', 'pk', 'trophy_type', 'earn_rate'
         )
+        for game_id, pk, trophy_type, earn_rate in rows.iterator(chunk_size=self.chunk_size):
+            by_game[game_id].append((pk, trophy_type, earn_rate or 50.0))
         
-        # Current month
+        self.stdout.write(f'Created {sum(len(trophies) for trophies in by_game.values())} trophies')
+        return [GameTable(game, by_game[game.pk]) for game in games]
+    
+    def create_sample_users(self, count):
+        """Create sample users with PSN IDs; returns their ids"""
+        rng = random.Random(f"{self.seed}:users")
+        # Hash once - hashing per user would dominate large runs
+        password = make_password('testpassword123')
         now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        RankingPeriod.objects.create(
-            period_type='monthly',
-            start_date=month_start,
-            end_date=month_start + timedelta(days=32),  # Next month
-            active=True
-        )
+        start = User.objects.count()
         
-        # Current week
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        RankingPeriod.objects.create(
-            period_type='weekly',
-            start_date=week_start,
-            end_date=week_start + timedelta(days=7),
-            active=True
-        )
-
-        self.stdout.write('Created ranking periods')
-
-    def create_sample_milestones(self, users, games):
-        """Create sample milestones for users"""
+        usernames = []
         
-        milestone_types = [
-            ('first_platinum', 'First Platinum Trophy', 'Earned your very first platinum trophy!'),
-            ('100_platinums', '100 Platinum Trophies', 'Reached the milestone of 100 platinum trophies!'),
-            ('souls_master', 'Souls Master', 'Completed all FromSoftware games!'),
-            ('level_milestone', 'Level 10 Achieved', 'Reached Trophy Level 10!'),
-            ('rarity_hunter', 'Ultra Rare Hunter', 'Earned 10 ultra rare trophies!'),
-        ]
+        def generate():
+            for i in range(start, start + count):
+                username = f"{SAMPLE_USERNAMES[i % len(SAMPLE_USERNAMES)]}{i + 1}"
+                usernames.append(username)
+                yield User(
+                    username=username,
+                    email=f"{username.lower()}@example.com",
+                    password=password,
+                    psn_id=username.lower(),
+                    profile_public=rng.random() < 0.75,
+                    allow_trophy_sync=True,
+                    last_trophy_sync=now - timedelta(hours=rng.randint(1, 72)),
+                )
+        
+        self.bulk_insert(User, generate())
         
-        for user in users[:5]:  # Only create milestones for first 5 users
-            # First platinum milestone
-            if user.platinum_count > 0:
-                TrophyMilestone.objects.create(
-                    user=user,
-                    milestone_type='first_platinum',
-                    title='First Platinum Trophy',
-                    description='Earned your very first platinum trophy!',
-                    achieved=True,
-                    achieved_date=timezone.now() - timedelta(days=random.randint(30, 200))
+        user_ids = []
+        for chunk in chunked(usernames, self.chunk_size):
+            user_ids.extend(User.objects.filter(username__in=chunk).order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f'Created {len(user_ids)} sample users')
+        return user_ids
+    
+    def generate_library(self, user_id, tables, cumulative_popularity, avg_library, include_unearned, now):
+        """
+        Yield (UserGameProgress row tuple, [UserTrophy row tuple, ...]) for one user,
+        seeded by user id so output doesn't depend on chunking. now and the
+        row datetimes are naive UTC (see trophies.bulk.insert_rows).
+        """
+        rng = random.Random(f"{self.seed}:user:{user_id}")
+        now_value = str(now)
+        
+        # Library size: long-tailed around the average, capped by the catalogue
+        size = min(len(tables), max(1, int(rng.expovariate(1 / avg_library)) + 1))
+        if size * 2 > len(tables):
+            chosen = rng.sample(range(len(tables)), size)
+        else:
+            # Popular games show up in more libraries
+            chosen = set()
+            total_weight = cumulative_popularity[-1]
+            while len(chosen) < size:
+                chosen.add(min(bisect.bisect(cumulative_popularity, rng.random() * total_weight), len(tables) - 1))
+        
+        for index in sorted(chosen):
+            table = tables[index]
+            started_date = now - timedelta(days=rng.randint(1, 3 * 365))
+            if rng.random() < 0.08 * table.completion_factor:
+                completion = 1.0  # completionist
+            else:
+                completion = rng.betavariate(0.9, 1.1) ** (1 / table.completion_factor)
+            # The earned set is the first earned_count trophies in ease order
+            earned_count = round(completion * len(table.trophy_ids))
+            platinum_earned = bool(table.platinum_id) and earned_count == len(table.trophy_ids)
+            
+            # Earn dates increase along the ease order
+            span = rng.randint(1, 200) * 86400
+            earned_dates = [
+                started_date + timedelta(seconds=offset)
+                for offset in sorted(rng.random() * span for _ in range(earned_count))
+            ]
+            rows = [
+                (user_id, trophy_id, True, str(earned_at), now_value, now_value)
+                for trophy_id, earned_at in zip(table.trophy_ids, earned_dates)
+            ]
+            last_trophy_date = earned_dates[-1] if earned_dates else None
+            if platinum_earned:
+                rows.append((user_id, table.platinum_id, True, str(last_trophy_date), now_value, now_value))
+            if include_unearned:
+                rows.extend(
+                    (user_id, trophy_id, False, None, now_value, now_value)
+                    for trophy_id in table.trophy_ids[earned_count:]
                 )
+                if table.platinum_id and not platinum_earned:
+                    rows.append((user_id, table.platinum_id, False, None, now_value, now_value))
             
-            # Level milestone
-            if user.current_trophy_level >= 5:
-                TrophyMilestone.objects.create(
-                    user=user,
-                    milestone_type='level_milestone',
-                    title=f'Level {user.current_trophy_level} Achieved',
-                    description=f'Reached Trophy Level {user.current_trophy_level}!',
-                    achieved=True,
-                    achieved_date=timezone.now() - timedelta(days=random.randint(1, 30))
+            last_trophy_value = str(last_trophy_date) if last_trophy_date else None
+            total_earned = earned_count + int(platinum_earned)
+            percentage = int(total_earned * 100 / table.total) if table.total else 0
+            progress = (
+                user_id,
+                table.game_id,
+                percentage,
+                table.cumulative_types['bronze'][earned_count],
+                table.cumulative_types['silver'][earned_count],
+                table.cumulative_types['gold'][earned_count],
+                int(platinum_earned),
+                table.cumulative_points[earned_count] + (table.platinum_points if platinum_earned else 0),
+                table.max_score,
+                percentage == 100,
+                False,
+                str(started_date),
+                last_trophy_value,
+                last_trophy_value if percentage == 100 else None,
+                now_value,
+            )
+            yield progress, rows
+    
+    def create_user_progress(self, user_ids, tables, avg_library, include_unearned):
+        """Create user progress and earned trophies; returns the UserTrophy row count"""
+        now = timezone.now().replace(tzinfo=None)  # naive UTC for insert_rows
+        # Zipf-like popularity over the catalogue, shuffled so it isn't tied to creation order
+        popularity = [1 / (rank + 1) ** 0.8 for rank in range(len(tables))]
+        random.Random(f"{self.seed}:popularity").shuffle(popularity)
+        cumulative_popularity = list(itertools.accumulate(popularity))
+        
+        trophy_buffer, progress_buffer = [], []
+        rows_written = 0
+        started = time.perf_counter()
+        
+        def flush():
+            nonlocal rows_written
+            with transaction.atomic():
+                insert_rows(UserGameProgress, PROGRESS_COLUMNS, progress_buffer, self.chunk_size)
+                rows_written += insert_rows(UserTrophy, USER_TROPHY_COLUMNS, trophy_buffer, self.chunk_size)
+            progress_buffer.clear()
+            trophy_buffer.clear()
+        
+        for number, user_id in enumerate(user_ids, 1):
+            for progress, rows in self.generate_library(
+                user_id, tables, cumulative_popularity, avg_library, include_unearned, now
+            ):
+                progress_buffer.append(progress)
+                trophy_buffer.extend(rows)
+            if len(trophy_buffer) >= self.chunk_size:
+                flush()
+            if number % 1000 == 0:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'  {number:,}/{len(user_ids):,} users, {rows_written:,} user trophies '
+                    f'({rows_written / elapsed if elapsed else 0:,.0f} rows/s)'
                 )
-
-        self.stdout.write('Created sample milestones')
\ No newline at end of file
+        flush()
+        
+        self.stdout.write(f'Created user progress and {rows_written:,} user trophies')
+        return rows_written
+    
+    def create_ranking_periods(self):
+        """Create ranking periods"""
+        now = timezone.now()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        periods = [
+            # All-time ranking
+            ('all_time', now - timedelta(days=365), None, {'rankings_calculated': True, 'calculation_date': now}),
+            # Current month
+            ('monthly', month_start, month_start + timedelta(days=32), {}),
+            # Current week
+            ('weekly', week_start, week_start + timedelta(days=7), {}),
+        ]
+        for period_type, start_date, end_date, extra in periods:
+            if not RankingPeriod.objects.filter(period_type=period_type, active=True).exists():
+                RankingPeriod.objects.create(
+                    period_type=period_type, start_date=start_date, end_date=end_date, active=True, **extra
+                )
+        
+        self.stdout.write('Created ranking periods')
+    
+    def create_sample_milestones(self, user_ids):
+        """Award the new users' milestones with the rule engine"""
+        awarded = backfill_milestones(user_ids)
+        self.stdout.write(f'Created {len(awarded)} milestones')
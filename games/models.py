@@ -2,6 +2,19 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
+# (minimum completion rate %, difficulty multiplier) - rarer completion, harder game
+COMPLETION_RATE_DIFFICULTY = [
+    (70, 1.2), (50, 1.5), (35, 2.0), (25, 3.0), (15, 4.0),
+    (10, 5.0), (5, 6.0), (2, 8.0),
+]
+
+def difficulty_for_completion_rate(completion_rate):
+    """Difficulty multiplier for a completion rate percentage"""
+    for minimum_rate, multiplier in COMPLETION_RATE_DIFFICULTY:
+        if completion_rate >= minimum_rate:
+            return multiplier
+    return 10.0
+
 class Game(models.Model):
     """PlayStation game with difficulty multiplier for skill-based scoring"""
     
@@ -127,23 +140,6 @@ class Game(models.Model):
     def update_difficulty_from_completion_rate(self):
         """Auto-update difficulty based on completion rate"""
         if self.completion_rate is not None:
-            if self.completion_rate >= 70:
-                self.difficulty_multiplier = 1.2
-            elif self.completion_rate >= 50:
-                self.difficulty_multiplier = 1.5
-            elif self.completion_rate >= 35:
-                self.difficulty_multiplier = 2.0
-            elif self.completion_rate >= 25:
-                self.difficulty_multiplier = 3.0
-            elif self.completion_rate >= 15:
-                self.difficulty_multiplier = 4.0
-            elif self.completion_rate >= 10:
-                self.difficulty_multiplier = 5.0
-            elif self.completion_rate >= 5:
-                self.difficulty_multiplier = 6.0
-            elif self.completion_rate >= 2:
-                self.difficulty_multiplier = 8.0
-            else:
-                self.difficulty_multiplier = 10.0
+            self.difficulty_multiplier = difficulty_for_completion_rate(self.completion_rate)
             
             self.save()
\ No newline at end of file
@@ -0,0 +1,35 @@
+# games/signals.py
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import Signal, receiver
+from .models import Game
+
+# Sent after a saved game's difficulty multiplier changed (game, old_multiplier, new_multiplier)
+difficulty_multiplier_changed = Signal()
+
+# Sent after a queryset update changed several games' multipliers at once (game_ids)
+difficulty_multipliers_changed = Signal()
+
+
+@receiver(pre_save, sender=Game)
+def remember_previous_multiplier(sender, instance, **kwargs):
+    """Keep the stored multiplier so post_save can tell whether it changed"""
+    if instance._state.adding or not instance.pk:
+        instance._previous_multiplier = None
+        return
+    instance._previous_multiplier = (
+        Game.objects.filter(pk=instance.pk).values_list('difficulty_multiplier', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Game)
+def announce_multiplier_change(sender, instance, created, **kwargs):
+    """Send difficulty_multiplier_changed when an existing game's multiplier changed"""
+    previous = getattr(instance, '_previous_multiplier', None)
+    if created or previous is None or previous == instance.difficulty_multiplier:
+        return
+    difficulty_multiplier_changed.send(
+        sender=Game,
+        game=instance,
+        old_multiplier=previous,
+        new_multiplier=instance.difficulty_multiplier
+    )
@@ -4,15 +4,19 @@ Django admin configuration for PSN integration models - PSNAWP version
 """
 
 from django.contrib import admin
-from django.utils.html import format_html
+from django.db.models import Count, IntegerField, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.html import format_html, format_html_join
 from django.utils import timezone
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.contrib import messages
 from .models import (
     PSNToken, PSNSyncJob, PSNUserValidation, PSNApiCall, 
-    PSNRateLimit, PSNGameDifficultyHint
+    PSNRateLimit, PSNGameDifficultyHint, PSNCircuitBreaker, PSNApiCallHourly, PSNSyncJobArchive
 )
+from .instrumentation import STAGE_LABELS, aggregate_stage_timings
+from trophies.admin_jobs import queued_message, run_or_queue
 
 @admin.register(PSNToken)
 class PSNTokenAdmin(admin.ModelAdmin):
@@ -159,7 +163,8 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
     ]
     readonly_fields = [
         'job_id', 'duration_display', 'score_gained', 'level_gained',
-        'created_at', 'started_at', 'completed_at', 'psnawp_calls_display'
+        'created_at', 'started_at', 'completed_at', 'psnawp_calls_display',
+        'stage_timings_display'
     ]
     search_fields = ['user__username', 'user__psn_id', 'job_id']
     
@@ -168,7 +173,7 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
             'fields': ('job_id', 'user', 'sync_type', 'priority', 'status')
         }),
         ('Progress', {
-            'fields': ('progress_percentage', 'current_task')
+            'fields': ('progress_percentage', 'current_task', 'resume_after', 'synced_titles')
         }),
         ('Results', {
             'fields': (
@@ -191,7 +196,7 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Performance', {
-            'fields': ('duration_display',),
+            'fields': ('duration_display', 'stage_timings_display'),
             'classes': ('collapse',)
         }),
         ('Timestamps', {
@@ -199,7 +204,10 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['cancel_pending_jobs', 'retry_failed_jobs', 'cleanup_old_jobs']
+    actions = [
+        'cancel_pending_jobs', 'retry_failed_jobs', 'cleanup_old_jobs', 'resume_parked_jobs',
+        'show_stage_breakdown'
+    ]
     
     def job_id_short(self, obj):
         """Display shortened job ID"""
@@ -221,6 +229,7 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
         colors = {
             'pending': 'orange',
             'running': 'blue',
+            'parked': 'purple',
             'completed': 'green',
             'failed': 'red',
             'cancelled': 'gray'
@@ -283,6 +292,33 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
         return "No calls"
     psnawp_calls_display.short_description = 'PSNAWP Calls'
     
+    def stage_timings_display(self, obj):
+        """Display time spent per sync stage"""
+        if not obj.stage_timings:
+            return "No stage timings recorded"
+        
+        total = sum(stats.get('seconds', 0) for stats in obj.stage_timings.values()) or 1
+        rows = format_html_join(
+            '',
+            '<tr><td>{}</td><td style="text-align: right;">{}s</td><td style="text-align: right;">{}%</td>'
+            '<td style="text-align: right;">{}</td><td style="text-align: right;">{}</td></tr>',
+            (
+                (
+                    STAGE_LABELS.get(name, name),
+                    f"{stats.get('seconds', 0):.2f}",
+                    round(stats.get('seconds', 0) * 100 / total),
+                    stats.get('calls', 0),
+                    stats.get('errors', 0),
+                )
+                for name, stats in sorted(obj.stage_timings.items(), key=lambda item: -item[1].get('seconds', 0))
+            )
+        )
+        return format_html(
+            '<table><tr><th>Stage</th><th>Time</th><th>Share</th><th>Calls</th><th>Errors</th></tr>{}</table>',
+            rows
+        )
+    stage_timings_display.short_description = 'Stage Timings'
+    
     def cancel_pending_jobs(self, request, queryset):
         """Cancel pending jobs"""
         count = queryset.filter(status='pending').update(status='cancelled')
@@ -301,17 +337,38 @@ class PSNSyncJobAdmin(admin.ModelAdmin):
     retry_failed_jobs.short_description = 'Retry failed jobs'
     
     def cleanup_old_jobs(self, request, queryset):
-        """Clean up old completed jobs"""
+        """Move old finished jobs to the archive table"""
         from datetime import timedelta
+        from .archival import archive_jobs
         cutoff_date = timezone.now() - timedelta(days=30)
         old_jobs = queryset.filter(
-            status__in=['completed', 'failed', 'cancelled'],
+            status__in=PSNSyncJobArchive.ARCHIVED_STATUSES,
             created_at__lt=cutoff_date
+        ).values_list('pk', flat=True)
+        count = archive_jobs(old_jobs)
+        self.message_user(request, f'Archived {count} old jobs (>30 days).')
+    cleanup_old_jobs.short_description = 'Archive old jobs (30+ days)'
+    
+    def resume_parked_jobs(self, request, queryset):
+        """Make parked jobs due for resumption right away"""
+        count = queryset.filter(status='parked').update(resume_after=timezone.now())
+        self.message_user(request, f'{count} parked jobs will resume on the next resume_parked_syncs run.')
+    resume_parked_jobs.short_description = 'Resume parked jobs now'
+    
+    def show_stage_breakdown(self, request, queryset):
+        """Aggregate stage timings across the selected jobs"""
+        timings = list(queryset.exclude(stage_timings={}).values_list('stage_timings', flat=True))
+        if not timings:
+            self.message_user(request, 'No stage timings recorded for the selected jobs.', level=messages.WARNING)
+            return
+        
+        breakdown = aggregate_stage_timings(timings)
+        summary = ', '.join(
+            f"{STAGE_LABELS.get(name, name)} {stats['avg_seconds_per_job']}s/job ({stats['share']}%)"
+            for name, stats in breakdown.items()
         )
-        count = old_jobs.count()
-        old_jobs.delete()
-        self.message_user(request, f'Cleaned up {count} old jobs (>30 days).')
-    cleanup_old_jobs.short_description = 'Clean up old jobs (30+ days)'
+        self.message_user(request, f'⏱️ Stage breakdown over {len(timings)} jobs: {summary}')
+    show_stage_breakdown.short_description = 'Show stage timing breakdown'
 
 
 @admin.register(PSNUserValidation)
@@ -402,13 +459,12 @@ class PSNUserValidationAdmin(admin.ModelAdmin):
             
             for validation in queryset:
                 try:
-                    result = service.validate_psn_user(validation.psn_id)
+                    # Forced lookup refreshes both the stored validation and the local cache
+                    result = service.validate_psn_user(validation.psn_id, use_cache=False)
                     
                     if result['valid']:
-                        validation.mark_validation_success(result)
                         success_count += 1
                     else:
-                        validation.mark_validation_error(result.get('error', 'Validation failed'))
                         error_count += 1
                         
                 except Exception as e:
@@ -440,8 +496,17 @@ class PSNUserValidationAdmin(admin.ModelAdmin):
             self.message_user(request, f'Too many PSN IDs to validate at once ({count}). Select 10 or fewer.', level=messages.WARNING)
             return
         
-        # Trigger revalidation for unchecked ones
-        self.revalidate_with_psnawp(request, unchecked)
+        # Validate through the cache - IDs validated elsewhere recently cost no PSN call
+        from psn_integration.validation_cache import validate_psn_id
+        valid_count = 0
+        for validation in unchecked:
+            try:
+                if validate_psn_id(validation.psn_id)['valid']:
+                    valid_count += 1
+            except Exception as e:
+                validation.mark_validation_error(str(e))
+        
+        self.message_user(request, f'Validated {count} PSN IDs ({valid_count} valid).')
     bulk_validate.short_description = 'Bulk validate unchecked PSN IDs'
 
 
@@ -457,6 +522,7 @@ class PSNApiCallAdmin(admin.ModelAdmin):
     readonly_fields = ['timestamp']
     search_fields = ['psn_id', 'endpoint', 'error_message', 'psnawp_method']
     date_hierarchy = 'timestamp'
+    show_full_result_count = False  # no COUNT(*) over the whole log per page
     
     fieldsets = (
         ('Call Information', {
@@ -513,6 +579,49 @@ class PSNApiCallAdmin(admin.ModelAdmin):
     response_time_display.short_description = 'Response Time'
 
 
+@admin.register(PSNSyncJobArchive)
+class PSNSyncJobArchiveAdmin(admin.ModelAdmin):
+    """Admin interface for archived sync jobs (read-only)"""
+    
+    list_display = [
+        'job_id', 'user', 'sync_type', 'status', 'trophies_synced', 'trophies_new',
+        'errors_count', 'created_at', 'completed_at', 'archived_at'
+    ]
+    list_filter = ['status', 'sync_type', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['job_id', 'user__username', 'user__psn_id']
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PSNApiCallHourly)
+class PSNApiCallHourlyAdmin(admin.ModelAdmin):
+    """Admin interface for hourly PSN API call rollups (read-only)"""
+    
+    list_display = [
+        'hour', 'call_type', 'status', 'call_count', 'error_count',
+        'avg_response_display', 'p50_response_ms', 'p95_response_ms', 'p99_response_ms', 'total_bytes'
+    ]
+    list_filter = ['call_type', 'status', 'hour']
+    date_hierarchy = 'hour'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def avg_response_display(self, obj):
+        return f"{obj.avg_response_ms} ms"
+    avg_response_display.short_description = 'Avg Response'
+
+
 @admin.register(PSNRateLimit)
 class PSNRateLimitAdmin(admin.ModelAdmin):
     """Admin interface for rate limiting - PSNAWP compatible"""
@@ -578,6 +687,80 @@ class PSNRateLimitAdmin(admin.ModelAdmin):
     limit_status.short_description = 'Status'
 
 
+@admin.register(PSNCircuitBreaker)
+class PSNCircuitBreakerAdmin(admin.ModelAdmin):
+    """Admin interface for the shared PSN circuit breaker"""
+    
+    list_display = [
+        'name', 'state_display', 'trip_count', 'consecutive_failures',
+        'retry_at', 'last_failure_at', 'last_success_at', 'parked_jobs_display'
+    ]
+    readonly_fields = [
+        'state', 'consecutive_failures', 'consecutive_trips', 'trip_count',
+        'opened_at', 'retry_at', 'last_failure_at', 'last_success_at',
+        'last_error', 'updated_at', 'parked_jobs_display'
+    ]
+    
+    fieldsets = (
+        ('Breaker State', {
+            'fields': ('name', 'state', 'retry_at', 'parked_jobs_display')
+        }),
+        ('Failure Tracking', {
+            'fields': (
+                'consecutive_failures', 'consecutive_trips', 'trip_count',
+                'last_error'
+            )
+        }),
+        ('Timestamps', {
+            'fields': ('opened_at', 'last_failure_at', 'last_success_at', 'updated_at')
+        }),
+    )
+    
+    actions = ['reset_breakers', 'trip_breakers']
+    
+    def state_display(self, obj):
+        """Display breaker state with color coding"""
+        colors = {
+            'closed': 'green',
+            'half_open': 'orange',
+            'open': 'red'
+        }
+        color = colors.get(obj.state, 'black')
+        return format_html(
+            '<span style="color: {}; font-weight: bold;">{}</span>',
+            color, obj.get_state_display()
+        )
+    state_display.short_description = 'State'
+    
+    def get_queryset(self, request):
+        """Parked job count computed in the list query"""
+        parked = PSNSyncJob.objects.filter(status='parked').order_by().annotate(
+            _group=Value(1)
+        ).values('_group').annotate(total=Count('pk')).values('total')
+        return super().get_queryset(request).annotate(
+            parked_jobs=Coalesce(Subquery(parked, output_field=IntegerField()), 0)
+        )
+    
+    def parked_jobs_display(self, obj):
+        """Number of sync jobs waiting on this breaker"""
+        return obj.parked_jobs
+    parked_jobs_display.short_description = 'Parked Jobs'
+    
+    def reset_breakers(self, request, queryset):
+        """Force selected breakers closed"""
+        for breaker in queryset:
+            breaker.reset()
+        self.message_user(request, f'Closed {queryset.count()} circuit breakers.')
+    reset_breakers.short_description = 'Force close (resume PSN calls)'
+    
+    def trip_breakers(self, request, queryset):
+        """Manually open selected breakers, e.g. during a PSN outage"""
+        for breaker in queryset:
+            breaker.record_failure('Manually tripped from admin', trip_now=True)
+        self.message_user(request, f'Opened {queryset.count()} circuit breakers.', level=messages.WARNING)
+    trip_breakers.short_description = 'Force open (hold PSN calls)'
+
+
 @admin.register(PSNGameDifficultyHint)
 class PSNGameDifficultyHintAdmin(admin.ModelAdmin):
     """Admin interface for game difficulty hints - PSNAWP compatible"""
@@ -650,8 +833,8 @@ class PSNGameDifficultyHintAdmin(admin.ModelAdmin):
             color = 'red'
         
         return format_html(
-            '<span style="color: {};">{:.1f}%</span>',
-            color, percentage
+            '<span style="color: {};">{}%</span>',
+            color, f"{percentage:.1f}"
         )
     confidence_display.short_description = 'Confidence'
     
@@ -669,20 +852,10 @@ class PSNGameDifficultyHintAdmin(admin.ModelAdmin):
     
     def apply_to_games(self, request, queryset):
         """Apply difficulty hints to actual games"""
-        updated_count = 0
-        
-        for hint in queryset:
-            try:
-                from games.models import Game
-                game = Game.objects.get(np_communication_id=hint.np_communication_id)
-                game.difficulty_multiplier = hint.suggested_multiplier
-                game.save()
-                updated_count += 1
-            except Game.DoesNotExist:
-                continue
-            except Exception:
-                continue
-        
+        count, updated_count, job = run_or_queue(request, queryset, 'apply_difficulty_hints')
+        if job:
+            self.message_user(request, queued_message(job))
+            return
         self.message_user(request, f'Applied difficulty hints to {updated_count} games.')
     apply_to_games.short_description = 'Apply to games database'
     
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PsnIntegrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'psn_integration'
+    
+    def ready(self):
+        from . import collectors
+        collectors.register()
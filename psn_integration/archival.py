@@ -0,0 +1,70 @@
+# psn_integration/archival.py
+"""
+Retention for PSNSyncJob
+
+Keeps each user's newest N finished jobs (plus any pending, running or
+parked ones) in the hot table and moves older finished jobs to
+PSNSyncJobArchive. Each batch is copied and deleted in
+its own short transaction, locking only that batch's rows, so sync
+workers writing other jobs are never blocked for long.
+"""
+
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+import logging
+import time
+from typing import List
+from .models import PSNSyncJob, PSNSyncJobArchive
+
+logger = logging.getLogger(__name__)
+
+
+def archive_candidates(keep: int, limit: int = None) -> List[int]:
+    """Pks of finished jobs beyond each user's newest keep finished jobs (oldest first)"""
+    ranked = PSNSyncJob.objects.annotate(
+        recency=Window(RowNumber(), partition_by=[F('user_id')], order_by=[F('created_at').desc(), F('pk').desc()])
+    ).filter(recency__gt=keep, status__in=PSNSyncJobArchive.ARCHIVED_STATUSES)
+    return list(ranked.order_by('created_at').values_list('pk', flat=True)[:limit])
+
+
+def archive_jobs(pks) -> int:
+    """Copy the given finished jobs into the archive and delete them, in one transaction"""
+    with transaction.atomic():
+        jobs = PSNSyncJob.objects.filter(pk__in=list(pks), status__in=PSNSyncJobArchive.ARCHIVED_STATUSES)
+        if connection.features.has_select_for_update_skip_locked:
+            # Rows another worker is touching right now wait for the next run
+            jobs = jobs.select_for_update(skip_locked=True)
+        jobs = list(jobs.order_by('pk'))
+        if not jobs:
+            return 0
+        
+        PSNSyncJobArchive.objects.bulk_create(
+            [PSNSyncJobArchive.from_job(job) for job in jobs], ignore_conflicts=True
+        )
+        PSNSyncJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return len(jobs)
+
+
+def archive_old_jobs(keep: int, batch_size: int = 500, max_batches: int = None, pause: float = 0.0) -> int:
+    """
+    Archive every finished job beyond each user's newest keep finished jobs, a
+    batch at a time, pausing between batches. Returns jobs archived.
+    """
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        pks = archive_candidates(keep, batch_size)
+        if not pks:
+            break
+        moved = archive_jobs(pks)
+        archived += moved
+        batches += 1
+        if not moved:
+            break  # everything left is locked by someone else
+        if pause:
+            time.sleep(pause)
+    
+    if archived:
+        logger.info(f"🗄️ Archived {archived} sync jobs in {batches} batch(es), keeping {keep} per user")
+    return archived
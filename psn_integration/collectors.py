@@ -0,0 +1,102 @@
+# psn_integration/collectors.py
+"""
+Scrape-time metric collectors for PSN sync health
+
+These read current state from the database when /metrics is scraped -
+a few aggregate queries per scrape instead of a write per event.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Min
+from django.utils import timezone
+from datetime import timedelta
+from trophy_tracker import metrics
+from .models import PSNApiCall, PSNCircuitBreaker, PSNRateLimit, PSNSyncJob
+from .validation_cache import validation_cache
+
+BREAKER_STATES = [state for state, _ in PSNCircuitBreaker.STATE_CHOICES]
+
+metrics.describe('psn_call_seconds', 'histogram', 'PSNAWP call latency in seconds by call type and outcome')
+metrics.describe('sync_stage_seconds', 'histogram', 'Time spent per trophy sync stage pass')
+metrics.describe('sync_queue_wait_seconds', 'histogram', 'Time sync jobs waited between creation and start')
+metrics.describe('sync_duration_seconds', 'histogram', 'Trophy sync job run time from start to finish')
+metrics.describe('sync_jobs_finished', 'counter', 'Sync jobs finished by this process, by final status')
+metrics.describe('sync_jobs', 'gauge', 'Sync jobs by status')
+metrics.describe('sync_queue_depth', 'gauge', 'Pending sync jobs by priority')
+metrics.describe('sync_queue_oldest_wait_seconds', 'gauge', 'Age of the oldest pending sync job')
+metrics.describe('sync_parked_jobs_due', 'gauge', 'Parked sync jobs whose resume time has passed')
+metrics.describe('psn_rate_limit_remaining', 'gauge', 'PSN calls left in the current rate limit window')
+metrics.describe('psn_rate_limit_used_ratio', 'gauge', 'Share of the current rate limit window already used')
+metrics.describe('psn_circuit_breaker_state', 'gauge', '1 for the current state of each PSN circuit breaker')
+metrics.describe('psn_validation_cache_hits', 'counter', 'PSN ID validations answered by the per-process cache')
+metrics.describe('psn_validation_cache_db_hits', 'counter', 'PSN ID validations answered by the PSNUserValidation table')
+metrics.describe('psn_validation_cache_misses', 'counter', 'PSN ID validations that had to ask PSN')
+metrics.describe('psn_validation_cache_entries', 'gauge', 'PSN IDs held in the per-process validation cache')
+
+
+def sync_job_samples():
+    """Jobs by status, queue depth by priority and how long the queue has waited"""
+    now = timezone.now()
+    samples = []
+    
+    by_status = dict(PSNSyncJob.objects.order_by().values_list('status').annotate(total=Count('pk')))
+    for status, _ in PSNSyncJob.STATUS_CHOICES:
+        samples.append(('sync_jobs', {'status': status}, by_status.get(status, 0)))
+    
+    pending = PSNSyncJob.objects.filter(status='pending').order_by()
+    by_priority = dict(pending.values_list('priority').annotate(total=Count('pk')))
+    for priority, _ in PSNSyncJob.PRIORITY_CHOICES:
+        samples.append(('sync_queue_depth', {'priority': priority}, by_priority.get(priority, 0)))
+    
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    samples.append(('sync_queue_oldest_wait_seconds', {}, (now - oldest).total_seconds() if oldest else 0.0))
+    samples.append((
+        'sync_parked_jobs_due', {},
+        PSNSyncJob.objects.filter(status='parked', resume_after__lte=now).count(),
+    ))
+    return samples
+
+
+def rate_limit_samples():
+    """
+    Headroom in the current PSN rate limit window - the open PSNRateLimit
+    window if one is tracked, otherwise PSNApiCall rows over the last
+    PSN_RATE_LIMIT_WINDOW seconds against PSN_RATE_LIMIT_CALLS
+    """
+    now = timezone.now()
+    window = PSNRateLimit.objects.filter(window_start__lte=now, window_end__gt=now).order_by('-window_start').first()
+    if window:
+        limit, used = window.calls_limit, window.calls_made
+    else:
+        limit = settings.PSN_RATE_LIMIT_CALLS
+        used = PSNApiCall.objects.filter(
+            timestamp__gte=now - timedelta(seconds=settings.PSN_RATE_LIMIT_WINDOW)
+        ).count()
+    
+    samples = [
+        ('psn_rate_limit_remaining', {}, max(limit - used, 0)),
+        ('psn_rate_limit_used_ratio', {}, round(used / limit, 4) if limit else 0.0),
+    ]
+    for breaker in PSNCircuitBreaker.objects.only('name', 'state'):
+        for state in BREAKER_STATES:
+            samples.append((
+                'psn_circuit_breaker_state', {'breaker': breaker.name, 'state': state}, int(breaker.state == state)
+            ))
+    return samples
+
+
+def validation_cache_samples():
+    """This process's PSN ID validation cache totals"""
+    stats = validation_cache.stats()
+    return [
+        ('psn_validation_cache_hits', {}, stats['hits']),
+        ('psn_validation_cache_db_hits', {}, stats['db_hits']),
+        ('psn_validation_cache_misses', {}, stats['misses']),
+        ('psn_validation_cache_entries', {}, stats['entries']),
+    ]
+
+
+def register():
+    metrics.register_collector(sync_job_samples)
+    metrics.register_collector(rate_limit_samples)
+    metrics.register_collector(validation_cache_samples)
@@ -0,0 +1,81 @@
+# psn_integration/instrumentation.py
+"""
+Lightweight per-stage timing for trophy sync jobs
+
+Each stage accumulates wall time, call count and error count into the
+job's stage_timings JSON, so a slow sync shows whether PSN latency, DB
+writes or score recalculation is to blame.
+"""
+
+from contextlib import contextmanager
+import time
+from typing import Any, Dict, Iterable
+from trophy_tracker import metrics
+
+SYNC_STAGES = [
+    ('title_fetch', 'Title fetch'),
+    ('definition_fetch', 'Definition fetch'),
+    ('earned_fetch', 'Earned fetch'),
+    ('trophy_upsert', 'Trophy upsert'),
+    ('progress_recompute', 'Progress recompute'),
+    ('score_recompute', 'Score recompute'),
+]
+
+STAGE_LABELS = dict(SYNC_STAGES)
+
+
+class SyncStageTimer:
+    """Records stage timings onto a PSNSyncJob (saved with the job)"""
+    
+    def __init__(self, sync_job):
+        self.sync_job = sync_job
+        if not isinstance(sync_job.stage_timings, dict):
+            sync_job.stage_timings = {}
+    
+    @contextmanager
+    def stage(self, name: str, psn_calls: int = 0):
+        """Time one pass through a stage, counting psn_calls PSNAWP calls"""
+        stats = self.sync_job.stage_timings.setdefault(name, {'calls': 0, 'seconds': 0.0, 'errors': 0})
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats['calls'] += 1
+            stats['seconds'] = round(stats['seconds'] + elapsed, 4)
+            metrics.observe('sync_stage_seconds', elapsed, stage=name)
+            self.sync_job.psnawp_calls_made += psn_calls
+
+
+def aggregate_stage_timings(stage_timings_list: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Combine the stage_timings of many jobs into totals, per-job averages
+    and each stage's share of the total timed seconds
+    """
+    totals = {}
+    jobs = 0
+    
+    for stage_timings in stage_timings_list:
+        if not stage_timings:
+            continue
+        jobs += 1
+        for name, stats in stage_timings.items():
+            total = totals.setdefault(name, {'calls': 0, 'seconds': 0.0, 'errors': 0})
+            total['calls'] += stats.get('calls', 0)
+            total['seconds'] += stats.get('seconds', 0.0)
+            total['errors'] += stats.get('errors', 0)
+    
+    all_seconds = sum(total['seconds'] for total in totals.values())
+    for total in totals.values():
+        total['seconds'] = round(total['seconds'], 3)
+        total['avg_seconds_per_job'] = round(total['seconds'] / jobs, 3) if jobs else 0
+        total['avg_ms_per_call'] = round(total['seconds'] * 1000 / total['calls'], 1) if total['calls'] else 0
+        total['share'] = round(total['seconds'] * 100 / all_seconds, 1) if all_seconds else 0
+    
+    return {
+        name: totals[name]
+        for name in sorted(totals, key=lambda stage: -totals[stage]['seconds'])
+    }
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from psn_integration.archival import archive_candidates, archive_old_jobs
+from psn_integration.models import PSNSyncJob
+
+
+class Command(BaseCommand):
+    help = 'Move finished sync jobs beyond the newest N finished per user into the compact archive table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=settings.PSN_SYNC_JOBS_KEEP_PER_USER,
+            help=f'Finished jobs to keep per user in the hot table (default: {settings.PSN_SYNC_JOBS_KEEP_PER_USER})'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=0, help='Stop after this many batches (default: 0 for no limit)')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many jobs would be archived')
+    
+    def handle(self, *args, **options):
+        if options['keep'] < 1:
+            raise CommandError('--keep must be at least 1')
+        
+        if options['dry_run']:
+            candidates = archive_candidates(options['keep'], limit=None)
+            self.stdout.write(
+                f"Would archive {len(candidates)} of {PSNSyncJob.objects.count()} sync jobs "
+                f"(keeping {options['keep']} per user)"
+            )
+            return
+        
+        archived = archive_old_jobs(
+            options['keep'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'] or None,
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Archived {archived} sync jobs, {PSNSyncJob.objects.count()} left in the hot table"
+        ))
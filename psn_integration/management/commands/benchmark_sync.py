@@ -0,0 +1,335 @@
+# psn_integration/management/commands/benchmark_sync.py
+"""
+End-to-end trophy sync benchmark against the offline PSN simulator
+
+Runs sync_user_trophies on synthetic libraries of several sizes, first on
+an empty database and then again on the now warm one, in a throwaway test
+database. Reports wall time, queries, rows written and peak memory per
+stage and writes the results as JSON for comparison across commits.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+# Service methods that make up a sync, timed as separate stages
+STAGES = {
+    'call_psn': 'psn_fetch',
+    'get_or_create_game': 'game_upsert',
+    'sync_game_trophies': 'trophy_upsert',
+    'update_game_progress': 'progress_recompute',
+    'recalculate_user_scores': 'score_recompute',
+}
+
+
+INSERT_COLUMNS = re.compile(r'^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\S+\s*\(([^)]*)\)', re.IGNORECASE)
+
+
+def inserted_rows(sql, params, many):
+    """
+    Rows an INSERT statement writes, from its parameters - cursor.rowcount
+    is 0 on SQLite for INSERT ... RETURNING until the rows are fetched
+    """
+    if not params:
+        return len(params) if many else 1  # INSERT ... DEFAULT VALUES
+    if many:
+        return sum(inserted_rows(sql, row_params, False) for row_params in params)
+    if 'UNNEST(' in sql.upper():
+        return len(params[0])  # PostgreSQL bulk insert: one array per column
+    match = INSERT_COLUMNS.match(sql)
+    columns = len(match.group(1).split(',')) if match else 0
+    return max(len(params) // columns, 1) if columns else 1
+
+
+class StageRecorder:
+    """Attributes wall time, queries, rows written and peak memory to sync stages"""
+    
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.stages = {}
+        self.current = None
+        self.queries = 0
+        self.rows_written = 0
+    
+    def _stats(self, stage):
+        return self.stages.setdefault(stage, {
+            'calls': 0, 'time_s': 0.0, 'queries': 0, 'rows_written': 0, 'peak_memory_kb': 0,
+        })
+    
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook counting queries and written rows"""
+        result = execute(sql, params, many, context)
+        rows = 0
+        statement = sql.lstrip().upper()
+        if statement.startswith(WRITE_STATEMENTS):
+            rows = max(context['cursor'].rowcount, 0)
+            if not rows and statement.startswith('INSERT'):
+                rows = inserted_rows(sql, params, many)
+        
+        self.queries += 1
+        self.rows_written += rows
+        if self.current:
+            stats = self._stats(self.current)
+            stats['queries'] += 1
+            stats['rows_written'] += rows
+        return result
+    
+    @contextmanager
+    def stage(self, name):
+        if self.current:
+            # Nested stage - already attributed to the outer one
+            yield
+            return
+        
+        self.current = name
+        if self.track_memory:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self._stats(name)
+            stats['calls'] += 1
+            stats['time_s'] += time.perf_counter() - started
+            if self.track_memory:
+                peak_kb = (tracemalloc.get_traced_memory()[1] - memory_before) // 1024
+                stats['peak_memory_kb'] = max(stats['peak_memory_kb'], peak_kb)
+            self.current = None
+    
+    def instrument(self, service):
+        """Wrap the stage methods on a PSNAWPService instance"""
+        for method_name, stage_name in STAGES.items():
+            method = getattr(service, method_name)
+            
+            def timed(*args, _method=method, _stage=stage_name, **kwargs):
+                with self.stage(_stage):
+                    return _method(*args, **kwargs)
+            
+            setattr(service, method_name, timed)
+        return service
+
+
+class Command(BaseCommand):
+    help = 'Benchmark trophy sync end to end against synthetic PSN payloads'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='10,300,2000',
+            help='Comma separated library sizes in trophy titles (default: 10,300,2000)'
+        )
+        parser.add_argument(
+            '--trophies',
+            type=int,
+            default=20,
+            help='Trophies per title (default: 20)'
+        )
+        parser.add_argument(
+            '--engines',
+            type=str,
+            default='',
+            help='Comma separated DB engines to run, e.g. sqlite,postgresql; each runs in a '
+                 'subprocess with DB_ENGINE set (default: the configured database only)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default='',
+            help='JSON results file (default: sync_benchmark_<commit>.json)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the synthetic libraries'
+        )
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='Skip tracemalloc peak memory tracking (it slows the run down)'
+        )
+    
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        engines = [engine.strip() for engine in options['engines'].split(',') if engine.strip()]
+        commit = self.get_commit()
+        output = Path(options['output'] or f"sync_benchmark_{commit[:10] or 'local'}.json")
+        
+        report = {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'trophies_per_title': options['trophies'],
+            'results': [],
+        }
+        
+        if engines:
+            for engine in engines:
+                report['results'].extend(self.run_engine_subprocess(engine, options))
+        else:
+            report['results'] = self.run_benchmarks(sizes, options)
+        
+        output.write_text(json.dumps(report, indent=2))
+        self.print_report(report['results'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Results written to {output}"))
+    
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except Exception:
+            return ''
+    
+    def run_engine_subprocess(self, engine, options):
+        """Run the benchmark for one DB engine in a child process"""
+        self.stdout.write(f"🔧 Running benchmark on {engine}...")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            child_output = Path(tmp_dir) / 'results.json'
+            command = [
+                sys.executable, sys.argv[0], 'benchmark_sync',
+                '--sizes', options['sizes'],
+                '--trophies', str(options['trophies']),
+                '--seed', str(options['seed']),
+                '--output', str(child_output),
+            ]
+            if options['no_memory']:
+                command.append('--no-memory')
+            
+            completed = subprocess.run(command, env={**os.environ, 'DB_ENGINE': engine})
+            if completed.returncode != 0 or not child_output.exists():
+                raise CommandError(f"Benchmark on {engine} failed (exit code {completed.returncode})")
+            return json.loads(child_output.read_text())['results']
+    
+    def run_benchmarks(self, sizes, options):
+        """Run every size on an empty and a warm throwaway test database"""
+        from psn_integration.simulator import ReplayPSNAWP, generate_fixture, write_fixture
+        
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        
+        if not options['no_memory']:
+            tracemalloc.start()
+        
+        results = []
+        try:
+            with tempfile.TemporaryDirectory() as fixtures_dir:
+                for size in sizes:
+                    psn_id = f"bench_{size}"
+                    write_fixture(fixtures_dir, generate_fixture(
+                        psn_id, titles=size, trophies_per_title=options['trophies'], seed=options['seed'] + size
+                    ))
+                    
+                    self.reset_database()
+                    for db_state in ('empty', 'warm'):
+                        client = ReplayPSNAWP(fixtures_dir, seed=options['seed'])
+                        result = self.run_sync(client, psn_id, size, db_state, not options['no_memory'])
+                        results.append(result)
+                        self.stdout.write(
+                            f"  {result['engine']:<10} {size:>5} titles  {db_state:<5}  "
+                            f"{result['wall_time_s']:>8.2f}s  {result['queries']:>8} queries"
+                        )
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        
+        return results
+    
+    def reset_database(self):
+        """Drop everything a sync writes so the next run starts empty"""
+        from games.models import Game
+        from psn_integration.models import PSNApiCall, PSNCircuitBreaker, PSNSyncJob
+        from trophies.models import Trophy, UserGameProgress, UserTrophy
+        from users.models import User
+        
+        for model in (UserTrophy, UserGameProgress, Trophy, Game, PSNSyncJob, PSNApiCall, User):
+            model.objects.all().delete()
+        PSNCircuitBreaker.get_default().reset()
+    
+    def run_sync(self, client, psn_id, size, db_state, track_memory):
+        from psn_integration.services import PSNAWPService
+        from users.models import User
+        
+        user, _ = User.objects.get_or_create(
+            username=psn_id, defaults={'psn_id': psn_id, 'email': f"{psn_id}@example.com"}
+        )
+        
+        recorder = StageRecorder(track_memory=track_memory)
+        service = recorder.instrument(PSNAWPService(client=client))
+        service.MAX_TITLES = max(service.MAX_TITLES, size)
+        
+        if track_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder.execute_wrapper):
+            sync_job = service.sync_user_trophies(user, psn_id)
+        wall_time = time.perf_counter() - started
+        
+        for stats in recorder.stages.values():
+            stats['time_s'] = round(stats['time_s'], 4)
+        
+        staged_time = sum(stats['time_s'] for stats in recorder.stages.values())
+        recorder.stages['other'] = {
+            'calls': 1,
+            'time_s': round(max(wall_time - staged_time, 0), 4),
+            'queries': recorder.queries - sum(stats['queries'] for stats in recorder.stages.values()),
+            'rows_written': recorder.rows_written - sum(stats['rows_written'] for stats in recorder.stages.values()),
+            'peak_memory_kb': 0,
+        }
+        
+        return {
+            'engine': connection.vendor,
+            'size': size,
+            'db_state': db_state,
+            'status': sync_job.status,
+            'games_found': sync_job.games_found,
+            'trophies_synced': sync_job.trophies_synced,
+            'trophies_new': sync_job.trophies_new,
+            'errors': sync_job.errors_count,
+            'wall_time_s': round(wall_time, 4),
+            'queries': recorder.queries,
+            'rows_written': recorder.rows_written,
+            'peak_memory_kb': (tracemalloc.get_traced_memory()[1] - memory_before) // 1024 if track_memory else None,
+            'psn_calls': client.faults.calls,
+            'stages': recorder.stages,
+        }
+    
+    def print_report(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'Engine':<10} {'Titles':>6} {'DB':<5} {'Wall s':>8} {'Queries':>8} {'Rows':>8} {'Peak KB':>8}"
+        )
+        self.stdout.write("-" * 60)
+        for result in results:
+            self.stdout.write(
+                f"{result['engine']:<10} {result['size']:>6} {result['db_state']:<5} "
+                f"{result['wall_time_s']:>8.2f} {result['queries']:>8} {result['rows_written']:>8} "
+                f"{result['peak_memory_kb'] if result['peak_memory_kb'] is not None else '-':>8}"
+            )
+            for stage, stats in sorted(result['stages'].items(), key=lambda item: -item[1]['time_s']):
+                self.stdout.write(
+                    f"    {stage:<20} {stats['time_s']:>8.2f}s {stats['queries']:>8} queries "
+                    f"{stats['rows_written']:>8} rows {stats['calls']:>6} calls"
+                )
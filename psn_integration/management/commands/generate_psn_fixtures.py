@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from psn_integration.simulator import generate_fixture, write_fixture
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic replay fixtures for the offline PSN simulator'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help='Number of synthetic PSN users')
+        parser.add_argument('--prefix', type=str, default='sim_user', help='PSN ID prefix (IDs are <prefix>_<n>)')
+        parser.add_argument('--titles', type=int, default=50, help='Trophy titles per user')
+        parser.add_argument('--trophies', type=int, default=40, help='Trophies per title')
+        parser.add_argument('--earned-ratio', type=float, default=0.5, help='Average share of trophies earned')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same fixtures)')
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default=None,
+            help='Fixture directory (default: PSN_REPLAY_FIXTURES_DIR)'
+        )
+    
+    def handle(self, *args, **options):
+        output_dir = options['output_dir'] or settings.PSN_REPLAY_FIXTURES_DIR
+        
+        for index in range(1, options['users'] + 1):
+            fixture = generate_fixture(
+                f"{options['prefix']}_{index}",
+                titles=options['titles'],
+                trophies_per_title=options['trophies'],
+                earned_ratio=options['earned_ratio'],
+                seed=options['seed'] + index,
+            )
+            path = write_fixture(output_dir, fixture)
+            self.stdout.write(f"  {path}")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Generated {options['users']} fixtures "
+            f"({options['titles']} titles x {options['trophies']} trophies each) in {output_dir}"
+        ))
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from psn_integration.services import PSNAWPService, PSNCircuitOpenError
+from psn_integration.simulator import RecordingPSNAWP
+
+
+class Command(BaseCommand):
+    help = 'Record real PSNAWP responses for PSN IDs as replay fixtures for the offline PSN simulator'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('psn_ids', nargs='+', help='PSN IDs to record')
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default=None,
+            help='Fixture directory (default: PSN_REPLAY_FIXTURES_DIR)'
+        )
+        parser.add_argument(
+            '--max-titles',
+            type=int,
+            default=0,
+            help='Only record the first N trophy titles per user (default: 0 for all)'
+        )
+    
+    def handle(self, *args, **options):
+        if getattr(settings, 'PSN_BACKEND', 'live') != 'live':
+            raise CommandError("Recording needs the live PSN backend (PSN_BACKEND=live)")
+        
+        live_service = PSNAWPService()
+        if not live_service.psnawp:
+            raise CommandError("No NPSSO token configured - run setup_psnawp first")
+        
+        output_dir = options['output_dir'] or settings.PSN_REPLAY_FIXTURES_DIR
+        recorder = RecordingPSNAWP(live_service.psnawp, output_dir)
+        service = PSNAWPService(client=recorder)
+        
+        for psn_id in options['psn_ids']:
+            self.stdout.write(f"📼 Recording {psn_id}...")
+            try:
+                self.record_user(service, psn_id, options['max_titles'])
+            except PSNCircuitOpenError as e:
+                self.stdout.write(self.style.WARNING(f"⏸️  {e} - stopping"))
+                break
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"❌ {psn_id}: {e}"))
+        
+        for path in recorder.save():
+            self.stdout.write(self.style.SUCCESS(f"✅ Wrote {path}"))
+    
+    def record_user(self, service, psn_id, max_titles):
+        """Make the same PSNAWP calls a validation plus full sync would"""
+        psn_user = service.call_psn('validate_user', 'user', service.psnawp.user, psn_id=psn_id, online_id=psn_id)
+        service.call_psn('psnawp_profile', 'profile', psn_user.profile, psn_id=psn_id)
+        service.call_psn('trophy_summary', 'trophy_summary', psn_user.trophy_summary, psn_id=psn_id)
+        
+        titles = service.call_psn('psnawp_titles', 'trophy_titles', psn_user.trophy_titles, psn_id=psn_id)
+        if max_titles:
+            titles = titles[:max_titles]
+            psn_user.fixture['titles'] = psn_user.fixture['titles'][:max_titles]
+        
+        for index, title in enumerate(titles, start=1):
+            game_info = service.extract_game_info(title)
+            if not game_info:
+                continue
+            
+            self.stdout.write(f"  [{index}/{len(titles)}] {game_info['title']}")
+            service.call_psn(
+                'game_trophies', 'title_trophies', psn_user.title_trophies,
+                psn_id=psn_id,
+                np_communication_id=game_info['np_communication_id'],
+                platform=title.title_platform
+            )
+            service.call_psn(
+                'user_trophies', 'title_trophies_earned_for_title',
+                psn_user.title_trophies_earned_for_title,
+                psn_id=psn_id,
+                np_communication_id=game_info['np_communication_id'],
+                platform=title.title_platform
+            )
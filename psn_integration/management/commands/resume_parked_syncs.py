@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from psn_integration.models import PSNSyncJob, PSNCircuitBreaker
+
+
+class Command(BaseCommand):
+    help = 'Resume trophy sync jobs that were parked while the PSN circuit breaker was open'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Maximum number of parked jobs to resume (default: 0 for all due jobs)'
+        )
+    
+    def handle(self, *args, **options):
+        breaker = PSNCircuitBreaker.get_default()
+        due = PSNSyncJob.objects.filter(status='parked', resume_after__lte=timezone.now()).count()
+        
+        self.stdout.write(f"Circuit breaker: {breaker.get_state_display()} ({breaker.trip_count} trips)")
+        self.stdout.write(f"Parked jobs due: {due}")
+        
+        if not due:
+            return
+        
+        if breaker.state == 'open' and breaker.retry_at and breaker.retry_at > timezone.now():
+            self.stdout.write(self.style.WARNING(f"⏸️  Breaker open until {breaker.retry_at} - nothing resumed"))
+            return
+        
+        from psn_integration.services import PSNAWPService
+        service = PSNAWPService()
+        resumed = service.resume_parked_jobs(limit=options['limit'] or None)
+        
+        for job in resumed:
+            self.stdout.write(f"  {job.user.username}: {job.get_status_display()}")
+        
+        self.stdout.write(self.style.SUCCESS(f"✅ Resumed {len(resumed)} parked sync jobs"))
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from datetime import timedelta
+from psn_integration.rollups import purge_raw_calls, rollup_hours, truncate_hour
+
+
+class Command(BaseCommand):
+    help = 'Roll PSN API calls up into hourly buckets and purge (or archive) raw calls past the retention horizon'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retain-days',
+            type=int,
+            default=settings.PSN_API_CALL_RETENTION_DAYS,
+            help=f'Days of raw calls to keep (default: {settings.PSN_API_CALL_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--rebuild-hours',
+            type=int,
+            default=0,
+            help='Re-roll this many recent hours even if already rolled up'
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Raw rows deleted per transaction')
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            default=settings.PSN_API_CALL_ARCHIVE_DIR or None,
+            help='Write purged calls to per-day .ndjson.gz files here before deleting them'
+        )
+        parser.add_argument('--skip-purge', action='store_true', help='Only roll up, never delete raw calls')
+        parser.add_argument('--dry-run', action='store_true', help='Report how many raw calls would be purged')
+    
+    def handle(self, *args, **options):
+        if options['retain_days'] < 1:
+            raise CommandError('--retain-days must be at least 1')
+        
+        since = None
+        if options['rebuild_hours']:
+            since = truncate_hour(timezone.now()) - timedelta(hours=options['rebuild_hours'])
+        
+        result = rollup_hours(since=since)
+        self.stdout.write(f"📊 Rolled up {result['hours']} hour(s) into {result['rows']} rollup rows")
+        
+        if options['skip_purge']:
+            return
+        
+        purged = purge_raw_calls(
+            options['retain_days'],
+            chunk_size=options['chunk_size'],
+            archive_dir=options['archive_dir'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f"Would purge {purged} raw calls older than {options['retain_days']} days")
+            return
+        
+        archived = f" (archived to {options['archive_dir']})" if options['archive_dir'] and purged else ''
+        self.stdout.write(self.style.SUCCESS(f"✅ Purged {purged} raw calls older than {options['retain_days']} days{archived}"))
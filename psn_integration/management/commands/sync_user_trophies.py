@@ -5,6 +5,7 @@ from django.db import transaction
 from psn_integration.models import PSNToken, PSNSyncJob, PSNUserValidation
 from games.models import Game
 from trophies.models import Trophy, UserTrophy, UserGameProgress
+from trophies.events import record_earned
 from users.models import User
 import time
 
@@ -451,15 +452,18 @@ class Command(BaseCommand):
                                 }
                             )
                             
-                            # Create user trophy record
-                            user_trophy, ut_created = UserTrophy.objects.get_or_create(
-                                user=user,
-                                trophy=trophy,
-                                defaults={
-                                    'earned': True,
-                                    'earned_datetime': timezone.now()  # We don't have exact times
-                                }
-                            )
+                            # Create user trophy record (and its earned event, atomically)
+                            with transaction.atomic():
+                                user_trophy, ut_created = UserTrophy.objects.get_or_create(
+                                    user=user,
+                                    trophy=trophy,
+                                    defaults={
+                                        'earned': True,
+                                        'earned_datetime': timezone.now()  # We don't have exact times
+                                    }
+                                )
+                                if ut_created:
+                                    record_earned([user_trophy])
                             
                             trophies_processed += 1
                         
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('psn_integration', '0003_remove_psnsyncjob_api_calls_made_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PSNCircuitBreaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='psnawp', help_text='Breaker identifier (one per upstream service)', max_length=50, unique=True)),
+                ('state', models.CharField(choices=[('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half-Open')], default='closed', max_length=10)),
+                ('consecutive_failures', models.IntegerField(default=0, help_text='Failed calls since the last success')),
+                ('consecutive_trips', models.IntegerField(default=0, help_text='Trips since the breaker last closed; drives the backoff exponent')),
+                ('trip_count', models.IntegerField(default=0, help_text='Total number of times the breaker has opened')),
+                ('last_error', models.TextField(blank=True)),
+                ('opened_at', models.DateTimeField(blank=True, null=True)),
+                ('retry_at', models.DateTimeField(blank=True, help_text='When the breaker lets a half-open probe through', null=True)),
+                ('last_failure_at', models.DateTimeField(blank=True, null=True)),
+                ('last_success_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'psn_integration_circuitbreaker',
+            },
+        ),
+        migrations.AddField(
+            model_name='psnsyncjob',
+            name='resume_after',
+            field=models.DateTimeField(blank=True, help_text='When a parked job may be resumed', null=True),
+        ),
+        migrations.AddField(
+            model_name='psnsyncjob',
+            name='resume_from_index',
+            field=models.IntegerField(default=0, help_text='Number of trophy titles already processed before parking'),
+        ),
+        migrations.AlterField(
+            model_name='psnsyncjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('parked', 'Parked (PSN unavailable)'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('psn_integration', '0004_psncircuitbreaker_psnsyncjob_resume'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='psnsyncjob',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict, help_text='Time and call counts per sync stage (see psn_integration.instrumentation)'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('psn_integration', '0005_psnsyncjob_stage_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PSNApiCallHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the hour (UTC)')),
+                ('call_type', models.CharField(choices=[('validate_user', 'User Validation'), ('trophy_summary', 'Trophy Summary'), ('game_list', 'Game List'), ('game_trophies', 'Game Trophies'), ('user_trophies', 'User Game Trophies'), ('trophy_groups', 'Trophy Groups'), ('psnawp_profile', 'PSNAWP Profile'), ('psnawp_titles', 'PSNAWP Trophy Titles')], max_length=20)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('error', 'Error'), ('rate_limited', 'Rate Limited'), ('timeout', 'Timeout')], max_length=20)),
+                ('call_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0, help_text='Calls that failed or returned an HTTP error status')),
+                ('total_response_ms', models.BigIntegerField(default=0)),
+                ('min_response_ms', models.IntegerField(default=0)),
+                ('max_response_ms', models.IntegerField(default=0)),
+                ('p50_response_ms', models.IntegerField(default=0)),
+                ('p95_response_ms', models.IntegerField(default=0)),
+                ('p99_response_ms', models.IntegerField(default=0)),
+                ('total_bytes', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'psn_integration_apicall_hourly',
+                'ordering': ['-hour', 'call_type', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'call_type', 'status'), name='psn_apicall_hourly_unique')],
+            },
+        ),
+    ]
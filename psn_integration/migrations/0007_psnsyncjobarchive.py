@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('psn_integration', '0006_psnapicallhourly'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PSNSyncJobArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(editable=False, unique=True)),
+                ('sync_type', models.CharField(max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('normal', 'Normal'), ('high', 'High'), ('urgent', 'Urgent')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('parked', 'Parked (PSN unavailable)'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('games_found', models.IntegerField(default=0)),
+                ('games_created', models.IntegerField(default=0)),
+                ('games_updated', models.IntegerField(default=0)),
+                ('trophies_synced', models.IntegerField(default=0)),
+                ('trophies_new', models.IntegerField(default=0)),
+                ('score_before', models.IntegerField(default=0)),
+                ('score_after', models.IntegerField(default=0)),
+                ('level_before', models.IntegerField(default=1)),
+                ('level_after', models.IntegerField(default=1)),
+                ('errors_count', models.IntegerField(default=0)),
+                ('error_summary', models.CharField(blank=True, help_text="First 255 characters of the job's error message", max_length=255)),
+                ('psnawp_calls_made', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_sync_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'psn_integration_syncjob_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='psn_integra_user_id_50067f_idx')],
+            },
+        ),
+    ]
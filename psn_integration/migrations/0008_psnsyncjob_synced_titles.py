@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('psn_integration', '0007_psnsyncjobarchive'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='psnsyncjob',
+            name='resume_from_index',
+        ),
+        migrations.AddField(
+            model_name='psnsyncjob',
+            name='synced_titles',
+            field=models.JSONField(blank=True, default=list, help_text='np_communication_ids of the trophy titles already processed before parking'),
+        ),
+    ]
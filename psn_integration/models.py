@@ -4,10 +4,17 @@ Complete models for PSNAWP integration including all admin-referenced models
 """
 
 from django.db import models
+from django.db.models import F, OuterRef, Subquery
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import transaction
+from datetime import timedelta
+import hashlib
+import random
 import uuid
+from trophy_tracker import metrics
 
 User = get_user_model()
 
@@ -124,6 +131,7 @@ class PSNSyncJob(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('running', 'Running'),
+        ('parked', 'Parked (PSN unavailable)'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
         ('cancelled', 'Cancelled'),
@@ -244,12 +252,37 @@ class PSNSyncJob(models.Model):
         blank=True,
         help_text="PSNAWP specific errors encountered"
     )
+    stage_timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Time and call counts per sync stage (see psn_integration.instrumentation)"
+    )
+    
+    # Parking (circuit breaker open)
+    resume_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a parked job may be resumed"
+    )
+    synced_titles = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="np_communication_ids of the trophy titles already processed before parking"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    # Fields the progress endpoints report - any change invalidates their ETag
+    PROGRESS_ETAG_FIELDS = (
+        'status', 'progress_percentage', 'current_task', 'games_found', 'games_created',
+        'games_updated', 'trophies_synced', 'trophies_new', 'errors_count', 'error_message',
+        'score_before', 'score_after', 'level_before', 'level_after',
+        'resume_after', 'started_at', 'completed_at'
+    )
+    
     class Meta:
         db_table = 'psn_integration_syncjob'
         ordering = ['-created_at']
@@ -284,17 +317,65 @@ class PSNSyncJob(models.Model):
         return self.level_after - self.level_before
     
     def mark_started(self):
-        """Mark job as started"""
+        """Mark job as started (keeps the original start time when resuming)"""
         self.status = 'running'
-        self.started_at = timezone.now()
-        self.save(update_fields=['status', 'started_at'])
+        if not self.started_at:
+            self.started_at = timezone.now()
+            if self.created_at:
+                metrics.observe(
+                    'sync_queue_wait_seconds',
+                    (self.started_at - self.created_at).total_seconds(),
+                    buckets=metrics.LONG_BUCKETS,
+                )
+        self.resume_after = None
+        self.save(update_fields=['status', 'started_at', 'resume_after'])
+    
+    def park(self, resume_after, synced_titles=None):
+        """Park the job until PSN is reachable again instead of failing it"""
+        self.status = 'parked'
+        self.resume_after = resume_after
+        if synced_titles is not None:
+            self.synced_titles = sorted(synced_titles)
+        self.current_task = f"Waiting for PSN to recover (resumes after {resume_after:%H:%M:%S})"
+        self.save(update_fields=[
+            'status', 'resume_after', 'synced_titles', 'current_task',
+            'stage_timings', 'psnawp_calls_made'
+        ])
+    
+    def can_resume(self):
+        """Check if a parked job is due to be resumed"""
+        return (self.status == 'parked' and
+                (self.resume_after is None or timezone.now() >= self.resume_after))
     
     def mark_completed(self, success=True):
         """Mark job as completed"""
         self.status = 'completed' if success else 'failed'
         self.completed_at = timezone.now()
         self.progress_percentage = 100 if success else self.progress_percentage
-        self.save(update_fields=['status', 'completed_at', 'progress_percentage'])
+        self.save(update_fields=[
+            'status', 'completed_at', 'progress_percentage',
+            'stage_timings', 'psnawp_calls_made'
+        ])
+        metrics.increment('sync_jobs_finished', status=self.status)
+        if self.started_at:
+            metrics.observe(
+                'sync_duration_seconds',
+                (self.completed_at - self.started_at).total_seconds(),
+                buckets=metrics.LONG_BUCKETS,
+                status=self.status,
+            )
+        
+        if success:
+            from psn_integration.signals import sync_completed
+            sync_completed.send(sender=PSNSyncJob, sync_job=self)
+    
+    @classmethod
+    def progress_etag(cls, job_id, user):
+        """ETag over a job's progress fields (None if the user has no such job)"""
+        state = cls.objects.filter(job_id=job_id, user=user).values_list(*cls.PROGRESS_ETAG_FIELDS).first()
+        if state is None:
+            return None
+        return f"sync-{job_id}-{hashlib.md5(repr(state).encode()).hexdigest()[:16]}"
     
     def update_progress(self, percentage, task=None):
         """Update job progress"""
@@ -304,6 +385,78 @@ class PSNSyncJob(models.Model):
         self.save(update_fields=['progress_percentage', 'current_task'])
 
 
+class PSNSyncJobArchive(models.Model):
+    """
+    Compact copy of a finished PSNSyncJob moved out of the hot table by
+    archive_sync_jobs - counters and outcome only, no progress or JSON detail
+    """
+    
+    ARCHIVED_STATUSES = ['completed', 'failed', 'cancelled']
+    
+    # Fields copied as-is from PSNSyncJob
+    COPIED_FIELDS = [
+        'job_id', 'user_id', 'sync_type', 'priority', 'status',
+        'games_found', 'games_created', 'games_updated', 'trophies_synced', 'trophies_new',
+        'score_before', 'score_after', 'level_before', 'level_after',
+        'errors_count', 'psnawp_calls_made', 'created_at', 'started_at', 'completed_at',
+    ]
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_sync_jobs'
+    )
+    job_id = models.UUIDField(unique=True, editable=False)
+    sync_type = models.CharField(max_length=20)
+    priority = models.CharField(max_length=10, choices=PSNSyncJob.PRIORITY_CHOICES)
+    status = models.CharField(max_length=20, choices=PSNSyncJob.STATUS_CHOICES)
+    
+    # Results
+    games_found = models.IntegerField(default=0)
+    games_created = models.IntegerField(default=0)
+    games_updated = models.IntegerField(default=0)
+    trophies_synced = models.IntegerField(default=0)
+    trophies_new = models.IntegerField(default=0)
+    score_before = models.IntegerField(default=0)
+    score_after = models.IntegerField(default=0)
+    level_before = models.IntegerField(default=1)
+    level_after = models.IntegerField(default=1)
+    errors_count = models.IntegerField(default=0)
+    error_summary = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="First 255 characters of the job's error message"
+    )
+    psnawp_calls_made = models.IntegerField(default=0)
+    
+    # Timestamps
+    created_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'psn_integration_syncjob_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Archived Sync Job {self.job_id} ({self.status})"
+    
+    @classmethod
+    def from_job(cls, job):
+        archived = cls(**{field: getattr(job, field) for field in cls.COPIED_FIELDS})
+        archived.error_summary = (job.error_message or '')[:255]
+        return archived
+    
+    def duration(self):
+        if self.started_at and self.completed_at:
+            return self.completed_at - self.started_at
+        return None
+
+
 class PSNUserValidation(models.Model):
     """Track PSN ID validation results and cache them - PSNAWP compatible"""
     
@@ -531,9 +684,9 @@ class PSNApiCall(models.Model):
     @classmethod
     def log_call(cls, call_type, endpoint, status, response_time_ms, 
                  psn_id=None, parameters=None, http_status=None, 
-                 error_message=None, response_size=None, psnawp_method=None):
-        """Utility method to log an API call"""
-        return cls.objects.create(
+                 error_message=None, response_size=None, psnawp_method=None, breaker=None):
+        """Utility method to log an API call and feed the circuit breaker (the shared one unless given)"""
+        call = cls.objects.create(
             call_type=call_type,
             endpoint=endpoint,
             psn_id=psn_id or '',
@@ -545,6 +698,239 @@ class PSNApiCall(models.Model):
             error_message=error_message or '',
             psnawp_method=psnawp_method or ''
         )
+        (breaker or PSNCircuitBreaker.get_default()).record_outcome(call)
+        return call
+
+
+class PSNApiCallHourly(models.Model):
+    """Hourly rollup of PSNApiCall rows per call type and status"""
+    
+    hour = models.DateTimeField(help_text="Start of the hour (UTC)")
+    call_type = models.CharField(max_length=20, choices=PSNApiCall.CALL_TYPES)
+    status = models.CharField(max_length=20, choices=PSNApiCall.STATUS_CHOICES)
+    
+    # Volume
+    call_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(
+        default=0,
+        help_text="Calls that failed or returned an HTTP error status"
+    )
+    
+    # Latency (milliseconds)
+    total_response_ms = models.BigIntegerField(default=0)
+    min_response_ms = models.IntegerField(default=0)
+    max_response_ms = models.IntegerField(default=0)
+    p50_response_ms = models.IntegerField(default=0)
+    p95_response_ms = models.IntegerField(default=0)
+    p99_response_ms = models.IntegerField(default=0)
+    
+    # Payload
+    total_bytes = models.BigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'psn_integration_apicall_hourly'
+        ordering = ['-hour', 'call_type', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'call_type', 'status'], name='psn_apicall_hourly_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.call_type} {self.status}: {self.call_count} calls"
+    
+    @property
+    def avg_response_ms(self):
+        return round(self.total_response_ms / self.call_count) if self.call_count else 0
+    
+    @classmethod
+    def summary(cls, hours=24):
+        """
+        Per call type totals over the last hours: calls, errors, error rate,
+        average latency and the worst hourly p95
+        """
+        since = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours)
+        rows = cls.objects.filter(hour__gte=since).values('call_type').annotate(
+            calls=models.Sum('call_count'),
+            errors=models.Sum('error_count'),
+            total_ms=models.Sum('total_response_ms'),
+            worst_p95_ms=models.Max('p95_response_ms'),
+            total_bytes=models.Sum('total_bytes'),
+        ).order_by('-calls')
+        
+        summary = []
+        for row in rows:
+            row['avg_ms'] = round(row.pop('total_ms') / row['calls']) if row['calls'] else 0
+            row['error_rate'] = round(row['errors'] * 100 / row['calls'], 1) if row['calls'] else 0.0
+            summary.append(row)
+        return summary
+
+
+class PSNCircuitBreaker(models.Model):
+    """Shared circuit breaker guarding PSNAWP calls across all sync workers"""
+    
+    STATE_CHOICES = [
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half-Open'),
+    ]
+    
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        default='psnawp',
+        help_text="Breaker identifier (one per upstream service)"
+    )
+    state = models.CharField(
+        max_length=10,
+        choices=STATE_CHOICES,
+        default='closed'
+    )
+    
+    # Failure tracking
+    consecutive_failures = models.IntegerField(
+        default=0,
+        help_text="Failed calls since the last success"
+    )
+    consecutive_trips = models.IntegerField(
+        default=0,
+        help_text="Trips since the breaker last closed; drives the backoff exponent"
+    )
+    trip_count = models.IntegerField(
+        default=0,
+        help_text="Total number of times the breaker has opened"
+    )
+    last_error = models.TextField(blank=True)
+    
+    # Timing
+    opened_at = models.DateTimeField(null=True, blank=True)
+    retry_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the breaker lets a half-open probe through"
+    )
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'psn_integration_circuitbreaker'
+    
+    def __str__(self):
+        return f"Circuit Breaker {self.name}: {self.get_state_display()} ({self.trip_count} trips)"
+    
+    @classmethod
+    def get_default(cls):
+        """Return the shared PSNAWP breaker, creating it on first use"""
+        breaker, _ = cls.objects.get_or_create(name='psnawp')
+        return breaker
+    
+    @staticmethod
+    def backoff_delay(attempt):
+        """Exponential backoff with jitter, in seconds"""
+        base = getattr(settings, 'PSN_BREAKER_BASE_DELAY', 30)
+        cap = getattr(settings, 'PSN_BREAKER_MAX_DELAY', 900)
+        delay = min(cap, base * (2 ** max(attempt - 1, 0)))
+        # Equal jitter: never less than half the delay, so parked jobs spread out
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def allow_request(self):
+        """Check whether a PSN call may be made right now"""
+        now = timezone.now()
+        
+        if self.state == 'closed':
+            return True
+        
+        if self.state == 'open':
+            if self.retry_at and now < self.retry_at:
+                return False
+            # Only one worker wins the transition and gets to send the probe
+            won = PSNCircuitBreaker.objects.filter(
+                pk=self.pk, state='open'
+            ).update(state='half_open', updated_at=now)
+            self.refresh_from_db()
+            return bool(won)
+        
+        # Half-open: a probe is in flight. Allow a new one if it never reported back.
+        probe_timeout = getattr(settings, 'PSN_BREAKER_PROBE_TIMEOUT', 120)
+        stale = now - timedelta(seconds=probe_timeout)
+        won = PSNCircuitBreaker.objects.filter(
+            pk=self.pk, state='half_open', updated_at__lt=stale
+        ).update(updated_at=now)
+        return bool(won)
+    
+    def record_outcome(self, api_call):
+        """Feed a logged PSNApiCall into the breaker"""
+        # Client errors (unknown PSN ID, private profile) mean PSN answered, so
+        # they count as successes - and close the breaker when they're the probe
+        http_status = api_call.http_status_code
+        client_error = api_call.status == 'error' and http_status and 400 <= http_status < 500
+        if api_call.status == 'success' or client_error:
+            self.record_success()
+            return
+        
+        self.record_failure(
+            api_call.error_message,
+            trip_now=(api_call.status == 'rate_limited')
+        )
+    
+    def record_success(self):
+        """
+        Close a half-open breaker after its probe succeeds, or reset the
+        failure count while closed. Successes while open are ignored - they
+        come from calls that started before the breaker tripped.
+        """
+        if self.state == 'closed' and self.consecutive_failures == 0:
+            return  # Nothing to change - keep the hot path write-free
+        
+        now = timezone.now()
+        PSNCircuitBreaker.objects.filter(
+            pk=self.pk, state__in=['closed', 'half_open']
+        ).update(
+            state='closed',
+            consecutive_failures=0,
+            consecutive_trips=0,
+            retry_at=None,
+            last_success_at=now,
+            updated_at=now,
+        )
+        self.refresh_from_db()
+    
+    def record_failure(self, error_message='', trip_now=False):
+        """Count a failed call and trip the breaker if needed"""
+        threshold = getattr(settings, 'PSN_BREAKER_FAILURE_THRESHOLD', 5)
+        
+        with transaction.atomic():
+            breaker = PSNCircuitBreaker.objects.select_for_update().get(pk=self.pk)
+            breaker.consecutive_failures += 1
+            breaker.last_failure_at = timezone.now()
+            breaker.last_error = error_message or ''
+            
+            if (trip_now or breaker.state == 'half_open' or
+                    breaker.consecutive_failures >= threshold):
+                if breaker.state != 'open':
+                    breaker._trip()
+            
+            breaker.save()
+        
+        self.refresh_from_db()
+    
+    def _trip(self):
+        """Open the breaker and schedule the next probe"""
+        now = timezone.now()
+        self.state = 'open'
+        self.trip_count += 1
+        self.consecutive_trips += 1
+        self.opened_at = now
+        self.retry_at = now + timedelta(seconds=self.backoff_delay(self.consecutive_trips))
+    
+    def reset(self):
+        """Force the breaker closed"""
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.consecutive_trips = 0
+        self.retry_at = None
+        self.save()
 
 
 class PSNRateLimit(models.Model):
@@ -670,6 +1056,33 @@ class PSNGameDifficultyHint(models.Model):
     def __str__(self):
         return f"{self.game_title} - Suggested: {self.suggested_multiplier}x"
     
+    @classmethod
+    def apply_to_games(cls, hint_ids) -> int:
+        """
+        Copy the given hints' suggested multipliers onto their games in one
+        UPDATE (the newest hint wins when several cover a game). Returns the
+        number of games whose multiplier changed.
+        """
+        from games.models import Game
+        from games.signals import difficulty_multipliers_changed
+        
+        hints = cls.objects.filter(pk__in=list(hint_ids))
+        suggested = Subquery(
+            hints.filter(np_communication_id=OuterRef('np_communication_id'))
+            .order_by('-updated_at').values('suggested_multiplier')[:1]
+        )
+        changed = list(
+            Game.objects.filter(np_communication_id__in=hints.values('np_communication_id'))
+            .annotate(suggested=suggested).exclude(difficulty_multiplier=F('suggested'))
+            .values_list('pk', flat=True)
+        )
+        if not changed:
+            return 0
+        
+        Game.objects.filter(pk__in=changed).update(difficulty_multiplier=suggested)
+        difficulty_multipliers_changed.send(sender=Game, game_ids=changed)
+        return len(changed)
+    
     def update_from_psnawp_data(self, user_progress_data):
         """Update difficulty hint based on new PSNAWP user data"""
         self.psnawp_user_count += 1
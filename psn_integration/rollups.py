@@ -0,0 +1,163 @@
+# psn_integration/rollups.py
+"""
+Hourly rollups and retention for PSNApiCall
+
+rollup_hours() folds raw calls into PSNApiCallHourly buckets (one row per
+hour, call type and status) and purge_raw_calls() then deletes - or first
+archives to gzipped NDJSON - raw rows older than the retention horizon,
+a chunk at a time. Raw rows are only purged once their hour is rolled up.
+"""
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from datetime import timedelta
+import gzip
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Iterable, List, Optional
+from .models import PSNApiCall, PSNApiCallHourly
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+ARCHIVE_FIELDS = [
+    'id', 'timestamp', 'call_type', 'endpoint', 'psn_id', 'parameters', 'status', 'http_status_code',
+    'response_time_ms', 'response_size_bytes', 'error_message', 'error_code', 'psnawp_method',
+]
+
+
+def truncate_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def percentile(sorted_values: List[int], fraction: float) -> int:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def rollup_hour(hour) -> int:
+    """(Re)build the rollup rows for one hour from the raw calls. Returns rows written."""
+    buckets = {}
+    calls = PSNApiCall.objects.filter(timestamp__gte=hour, timestamp__lt=hour + HOUR).order_by().values_list(
+        'call_type', 'status', 'http_status_code', 'response_time_ms', 'response_size_bytes'
+    )
+    for call_type, status, http_status, response_ms, size in calls.iterator(chunk_size=5000):
+        bucket = buckets.setdefault((call_type, status), {'latencies': [], 'errors': 0, 'bytes': 0})
+        bucket['latencies'].append(response_ms or 0)
+        bucket['bytes'] += size or 0
+        if status != 'success' or (http_status or 0) >= 400:
+            bucket['errors'] += 1
+    
+    rows = []
+    for (call_type, status), bucket in buckets.items():
+        latencies = sorted(bucket['latencies'])
+        rows.append(PSNApiCallHourly(
+            hour=hour,
+            call_type=call_type,
+            status=status,
+            call_count=len(latencies),
+            error_count=bucket['errors'],
+            total_response_ms=sum(latencies),
+            min_response_ms=latencies[0],
+            max_response_ms=latencies[-1],
+            p50_response_ms=percentile(latencies, 0.50),
+            p95_response_ms=percentile(latencies, 0.95),
+            p99_response_ms=percentile(latencies, 0.99),
+            total_bytes=bucket['bytes'],
+        ))
+    
+    # Rebuilding replaces the whole hour, so re-running a rollup is safe
+    with transaction.atomic():
+        PSNApiCallHourly.objects.filter(hour=hour).delete()
+        PSNApiCallHourly.objects.bulk_create(rows)
+    return len(rows)
+
+
+def pending_hours(since=None, until=None) -> Iterable:
+    """
+    Complete hours that still need rolling up: from the hour after the
+    latest rollup (or the oldest raw call, or since) up to the last full hour
+    """
+    until = truncate_hour(until or timezone.now())
+    if since is None:
+        latest = PSNApiCallHourly.objects.aggregate(latest=Max('hour'))['latest']
+        if latest is not None:
+            since = latest + HOUR
+        else:
+            oldest = PSNApiCall.objects.aggregate(oldest=Min('timestamp'))['oldest']
+            if oldest is None:
+                return
+            since = oldest
+    hour = truncate_hour(since)
+    while hour < until:
+        yield hour
+        hour += HOUR
+
+
+def rollup_hours(since=None, until=None) -> dict:
+    """Roll up every pending hour; returns hours processed and rows written"""
+    hours = rows = 0
+    for hour in pending_hours(since=since, until=until):
+        rows += rollup_hour(hour)
+        hours += 1
+    if hours:
+        logger.info(f"📊 Rolled up {hours} hour(s) of PSN API calls into {rows} rows")
+    return {'hours': hours, 'rows': rows}
+
+
+def rolled_up_until():
+    """End of the latest rolled-up hour (raw rows before it are safe to purge)"""
+    latest = PSNApiCallHourly.objects.aggregate(latest=Max('hour'))['latest']
+    return latest + HOUR if latest is not None else None
+
+
+def purge_raw_calls(retain_days: int, chunk_size: int = 5000, archive_dir: Optional[str] = None,
+                    dry_run: bool = False) -> int:
+    """
+    Delete raw calls older than retain_days (and already rolled up) in
+    chunks of chunk_size, each in its own short transaction. With
+    archive_dir each chunk is appended to a per-day .ndjson.gz file first.
+    Returns the number of rows deleted (or that would be, with dry_run).
+    """
+    cutoff = timezone.now() - timedelta(days=retain_days)
+    rolled_until = rolled_up_until()
+    if rolled_until is None:
+        return 0
+    cutoff = min(cutoff, rolled_until)
+    expired = PSNApiCall.objects.filter(timestamp__lt=cutoff)
+    
+    if dry_run:
+        return expired.count()
+    
+    deleted = 0
+    while True:
+        chunk = list(expired.order_by('timestamp').values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        with transaction.atomic():
+            if archive_dir:
+                archive_calls(PSNApiCall.objects.filter(pk__in=chunk).order_by('timestamp'), archive_dir)
+            deleted += PSNApiCall.objects.filter(pk__in=chunk).delete()[0]
+    if deleted:
+        logger.info(f"🧹 Purged {deleted} PSN API calls older than {cutoff:%Y-%m-%d %H:%M}")
+    return deleted
+
+
+def archive_calls(calls, archive_dir: str):
+    """Append calls to psn_api_calls_<day>.ndjson.gz files (one gzip member per chunk)"""
+    directory = Path(archive_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    by_day = {}
+    for call in calls.values(*ARCHIVE_FIELDS):
+        call['timestamp'] = call['timestamp'].isoformat()
+        by_day.setdefault(call['timestamp'][:10], []).append(json.dumps(call, default=str))
+    for day, lines in by_day.items():
+        with gzip.open(directory / f"psn_api_calls_{day}.ndjson.gz", 'at', encoding='utf-8') as handle:
+            handle.write('\n'.join(lines) + '\n')
@@ -12,30 +12,75 @@ except ImportError:
     TitleStats = None
     TrophyTitles = None
 
+try:
+    from psnawp_api.core.psnawp_exceptions import (
+        PSNAWPClientError,
+        PSNAWPNotFoundError,
+        PSNAWPTooManyRequestsError,
+        PSNAWPServerError,
+    )
+except ImportError:
+    PSNAWPClientError = None
+    PSNAWPNotFoundError = None
+    PSNAWPTooManyRequestsError = None
+    PSNAWPServerError = None
+
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import logging
+import time
 from typing import Optional, List, Dict, Any
-from psn_integration.models import PSNToken, PSNApiCall, PSNSyncJob
-from games.models import Game
+from psn_integration.models import PSNToken, PSNApiCall, PSNSyncJob, PSNCircuitBreaker
+from psn_integration.instrumentation import SyncStageTimer
+from games.models import Game, difficulty_for_completion_rate
 from trophies.models import Trophy as TrophyModel, UserTrophy, UserGameProgress
+from trophies.events import record_earned
+from trophies.trophy_sets import apply_to_trophy_sets
 from users.models import User
+from trophy_tracker import metrics
 
 logger = logging.getLogger(__name__)
 
+class PSNCircuitOpenError(Exception):
+    """Raised when the PSN circuit breaker is open and calls are held back"""
+    
+    def __init__(self, retry_at):
+        self.retry_at = retry_at
+        super().__init__(f"PSN circuit breaker is open until {retry_at}")
+
 class PSNAWPService:
     """
     PlayStation Network service using PSNAWP library
     Corrected version that adapts to actual API structure
     """
     
-    def __init__(self, npsso_token: str = None):
-        """Initialize PSNAWP client"""
-        self.npsso_token = npsso_token or self.get_stored_npsso()
-        self.psnawp = None
+    # Most trophy titles synced per run
+    MAX_TITLES = 800
+    
+    def __init__(self, npsso_token: str = None, client=None):
+        """
+        Initialize PSNAWP client
+        
+        Pass client to use a ready-made PSNAWP-compatible client; with
+        PSN_BACKEND = 'replay' the offline simulator is used instead of PSN.
+        """
+        self.psnawp = client
         self.me = None
         
+        if self.psnawp is None and getattr(settings, 'PSN_BACKEND', 'live') == 'replay':
+            from psn_integration.simulator import ReplayPSNAWP
+            self.psnawp = ReplayPSNAWP.from_settings()
+            logger.info(f"🎭 Using replayed PSN fixtures from {self.psnawp.fixtures_dir}")
+        
+        if self.psnawp is not None:
+            self.npsso_token = npsso_token
+            self.me = self.psnawp.me()
+            return
+        
+        self.npsso_token = npsso_token or self.get_stored_npsso()
+        
         if self.npsso_token:
             try:
                 self.psnawp = PSNAWP(self.npsso_token)
@@ -55,19 +100,96 @@ class PSNAWPService:
         except:
             return None
     
-    def validate_psn_user(self, psn_id: str) -> Dict[str, Any]:
+    def call_psn(self, call_type: str, psnawp_method: str, func, *args, psn_id: str = None, **kwargs):
+        """
+        Run a PSNAWP call through the shared circuit breaker and log it
+        as a PSNApiCall (which in turn feeds the breaker)
+        """
+        breaker = PSNCircuitBreaker.get_default()
+        if not breaker.allow_request():
+            raise PSNCircuitOpenError(breaker.retry_at or timezone.now())
+        
+        endpoint = f"{settings.PSN_API_BASE_URL}/{psnawp_method}"
+        parameters = {key: str(value) for key, value in kwargs.items()}
+        started = time.monotonic()
+        
+        try:
+            result = func(*args, **kwargs)
+        except (TypeError, AttributeError):
+            # API shape mismatch on our side, not a PSN outcome
+            raise
+        except Exception as e:
+            status, http_status = self.classify_error(e)
+            elapsed = time.monotonic() - started
+            metrics.observe('psn_call_seconds', elapsed, call_type=call_type, status=status)
+            PSNApiCall.log_call(
+                call_type=call_type,
+                endpoint=endpoint,
+                status=status,
+                response_time_ms=int(elapsed * 1000),
+                psn_id=psn_id,
+                parameters=parameters,
+                http_status=http_status,
+                error_message=str(e),
+                psnawp_method=psnawp_method,
+                breaker=breaker
+            )
+            raise
+        
+        elapsed = time.monotonic() - started
+        metrics.observe('psn_call_seconds', elapsed, call_type=call_type, status='success')
+        PSNApiCall.log_call(
+            call_type=call_type,
+            endpoint=endpoint,
+            status='success',
+            response_time_ms=int(elapsed * 1000),
+            psn_id=psn_id,
+            parameters=parameters,
+            http_status=200,
+            psnawp_method=psnawp_method,
+            breaker=breaker
+        )
+        return result
+    
+    def classify_error(self, error: Exception):
+        """Map a PSNAWP exception to a PSNApiCall status and HTTP status code"""
+        if PSNAWPTooManyRequestsError and isinstance(error, PSNAWPTooManyRequestsError):
+            return 'rate_limited', 429
+        if PSNAWPClientError and isinstance(error, PSNAWPClientError):
+            return 'error', getattr(getattr(error, 'response', None), 'status_code', None) or 400
+        if PSNAWPServerError and isinstance(error, PSNAWPServerError):
+            return 'error', 500
+        if isinstance(error, TimeoutError) or 'timed out' in str(error).lower():
+            return 'timeout', None
+        return 'error', None
+    
+    def validate_psn_user(self, psn_id: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Validate a PSN user and get their basic info
+        
+        Results are served from the validation cache (per-process LRU in
+        front of PSNUserValidation); use_cache=False forces a PSN lookup
+        and refreshes both cache tiers.
+        """
+        from psn_integration.validation_cache import validation_cache
+        return validation_cache.lookup(psn_id, self.fetch_psn_user, force=not use_cache)
+    
+    def fetch_psn_user(self, psn_id: str) -> Dict[str, Any]:
+        """
+        Fetch a PSN user's basic info directly from PSN (uncached)
+        
+        An unknown PSN ID gives a result with valid=False and not_found=True;
+        any other failure is raised, since it says nothing about the ID.
         """
         try:
             # Search for the user
-            user = self.psnawp.user(online_id=psn_id)
+            user = self.call_psn('validate_user', 'user', self.psnawp.user, psn_id=psn_id, online_id=psn_id)
             
             # Get basic profile info
-            profile = user.profile()
+            profile = self.call_psn('psnawp_profile', 'profile', user.profile, psn_id=psn_id)
             
             # Get trophy summary
-            trophy_summary = user.trophy_summary()
+            trophy_summary = self.call_psn('trophy_summary', 'trophy_summary', user.trophy_summary, psn_id=psn_id)
             
             # Extract data safely (since we don't know exact structure)
             result = {
@@ -110,43 +232,69 @@ class PSNAWPService:
             
             return result
             
+        except PSNCircuitOpenError:
+            raise
         except Exception as e:
-            logger.error(f"PSN user validation failed for {psn_id}: {e}")
+            if not (PSNAWPNotFoundError and isinstance(e, PSNAWPNotFoundError)):
+                # Outage, rate limit, timeout or no client - says nothing about the PSN ID
+                logger.error(f"PSN user validation failed for {psn_id}: {e}")
+                raise
+            logger.info(f"PSN ID {psn_id} not found: {e}")
             return {
                 'valid': False,
+                'not_found': True,
                 'psn_id': psn_id,
                 'error': str(e),
                 'last_seen': timezone.now()
             }
     
-    def sync_user_trophies(self, user: User, psn_id: str) -> PSNSyncJob:
+    def sync_user_trophies(self, user: User, psn_id: str, sync_job: PSNSyncJob = None) -> PSNSyncJob:
         """
         Sync all trophies for a user
+        
+        Pass an existing (pending or parked) sync job to run or resume it.
+        If PSN is unavailable the job is parked rather than failed.
         """
-        sync_job = PSNSyncJob.objects.create(
-            user=user,
-            sync_type='full',
-            status='running'
-        )
+        if sync_job is None:
+            sync_job = PSNSyncJob.objects.create(
+                user=user,
+                sync_type='full',
+                status='running'
+            )
+        
+        # Titles are re-fetched in recent-activity order on resume, so they're tracked by id rather than position
+        synced_titles = set(sync_job.synced_titles) if sync_job.status == 'parked' else set()
+        timer = SyncStageTimer(sync_job)
         
         try:
             sync_job.mark_started()
             sync_job.update_progress(10, "Connecting to PSN...")
             
             # Get PSN user
-            psn_user = self.psnawp.user(online_id=psn_id)
+            with timer.stage('title_fetch', psn_calls=1):
+                psn_user = self.call_psn('validate_user', 'user', self.psnawp.user, psn_id=psn_id, online_id=psn_id)
             
             sync_job.update_progress(20, "Fetching game list...")
             
             # Get trophy titles - adapt to actual API
             try:
-                trophy_titles = psn_user.trophy_titles(limit=800)
+                with timer.stage('title_fetch', psn_calls=1):
+                    trophy_titles = self.call_psn(
+                        'psnawp_titles', 'trophy_titles',
+                        lambda **kw: list(psn_user.trophy_titles(**kw)),
+                        psn_id=psn_id, limit=self.MAX_TITLES
+                    )
             except TypeError:
                 # If limit parameter doesn't work, try without it
-                trophy_titles = psn_user.trophy_titles()
-                # Take first 800 if we get too many
-                if isinstance(trophy_titles, list) and len(trophy_titles) > 800:
-                    trophy_titles = trophy_titles[:800]
+                with timer.stage('title_fetch', psn_calls=1):
+                    trophy_titles = self.call_psn(
+                        'psnawp_titles', 'trophy_titles',
+                        lambda: list(psn_user.trophy_titles()),
+                        psn_id=psn_id
+                    )
+                # Take first MAX_TITLES if we get too many
+                if len(trophy_titles) > self.MAX_TITLES:
+                    trophy_titles = trophy_titles[:self.MAX_TITLES]
             
             total_games = len(trophy_titles) if isinstance(trophy_titles, list) else 0
             sync_job.games_found = total_games
@@ -157,32 +305,37 @@ class PSNAWPService:
                 sync_job.mark_completed(success=False)
                 return sync_job
             
-            games_processed = 0
-            
-            for title_data in trophy_titles:
+            for title_index, title_data in enumerate(trophy_titles):
+                np_communication_id = getattr(title_data, 'np_communication_id', None)
+                if np_communication_id in synced_titles:
+                    continue
+                
                 try:
-                    progress = 20 + (games_processed / total_games) * 60
+                    progress = 20 + (title_index / total_games) * 60
                     
                     # Get game name safely
                     game_name = getattr(title_data, 'title_name', 'Unknown Game')
                     sync_job.update_progress(
                         progress, 
-                        f"Processing game {games_processed + 1}/{total_games}: {game_name}"
+                        f"Processing game {title_index + 1}/{total_games}: {game_name}"
                     )
                     
                     # Process this game
                     self.process_game_trophies(user, psn_user, title_data, sync_job)
                     
-                    games_processed += 1
-                    
+                except PSNCircuitOpenError:
+                    raise
                 except Exception as e:
                     logger.error(f"Error processing game: {e}")
                     sync_job.errors_count += 1
                     sync_job.save()
-                    continue
+                
+                if np_communication_id:
+                    synced_titles.add(np_communication_id)
             
             sync_job.update_progress(85, "Calculating final scores...")
-            self.recalculate_user_scores(user, sync_job)
+            with timer.stage('score_recompute'):
+                self.recalculate_user_scores(user, sync_job)
             
             sync_job.update_progress(100, "Sync completed!")
             sync_job.mark_completed(success=True)
@@ -190,12 +343,43 @@ class PSNAWPService:
             logger.info(f"✅ Trophy sync completed for {user.username}")
             return sync_job
             
+        except PSNCircuitOpenError as e:
+            logger.warning(f"⏸️ PSN unavailable, parking sync for {user.username} until {e.retry_at}")
+            sync_job.park(e.retry_at, synced_titles=synced_titles)
+            return sync_job
+            
         except Exception as e:
             logger.error(f"❌ Trophy sync failed for {user.username}: {e}")
             sync_job.error_message = str(e)
             sync_job.mark_completed(success=False)
             return sync_job
     
+    def resume_parked_jobs(self, limit: int = None) -> List[PSNSyncJob]:
+        """Resume parked sync jobs that are due, oldest first"""
+        resumed = []
+        parked_jobs = PSNSyncJob.objects.filter(
+            status='parked',
+            resume_after__lte=timezone.now()
+        ).select_related('user').order_by('resume_after')
+        
+        if limit:
+            parked_jobs = parked_jobs[:limit]
+        
+        for sync_job in parked_jobs:
+            if not sync_job.user.psn_id:
+                sync_job.status = 'cancelled'
+                sync_job.save(update_fields=['status'])
+                continue
+            
+            sync_job = self.sync_user_trophies(sync_job.user, sync_job.user.psn_id, sync_job)
+            resumed.append(sync_job)
+            
+            # Breaker re-opened - the remaining jobs would only park again
+            if sync_job.status == 'parked':
+                break
+        
+        return resumed
+    
     def process_game_trophies(self, user: User, psn_user, title_data, sync_job: PSNSyncJob):
         """Process trophies for a single game - adaptive to actual API structure"""
         
@@ -209,29 +393,47 @@ class PSNAWPService:
         if not game:
             return
         
+        timer = SyncStageTimer(sync_job)
+        
         try:
             # Get detailed trophy information for this game
-            title_trophies = psn_user.title_trophies(
-                np_communication_id=game_info['np_communication_id'],
-                platform=game_info['platform']
-            )
-            
-            # Get user's earned trophies for this game
-            try:
-                earned_trophies = psn_user.title_trophies_earned_for_title(
+            with timer.stage('definition_fetch', psn_calls=1):
+                # Materialized inside the guarded call - the iterator is lazy, so
+                # 429s and 5xx would otherwise surface after call_psn returned
+                title_trophies = self.call_psn(
+                    'game_trophies', 'title_trophies',
+                    lambda **kw: list(psn_user.title_trophies(**kw)),
+                    psn_id=getattr(psn_user, 'online_id', None),
                     np_communication_id=game_info['np_communication_id'],
                     platform=game_info['platform']
                 )
+            
+            # Get user's earned trophies for this game
+            try:
+                with timer.stage('earned_fetch', psn_calls=1):
+                    earned_trophies = self.call_psn(
+                        'user_trophies', 'title_trophies_earned_for_title',
+                        lambda **kw: list(psn_user.title_trophies_earned_for_title(**kw)),
+                        psn_id=getattr(psn_user, 'online_id', None),
+                        np_communication_id=game_info['np_communication_id'],
+                        platform=game_info['platform']
+                    )
+            except PSNCircuitOpenError:
+                raise
             except:
                 # If this method doesn't exist, we'll work with what we have
                 earned_trophies = None
             
             # Process the trophies
-            self.sync_game_trophies(user, game, title_trophies, earned_trophies, sync_job)
+            with timer.stage('trophy_upsert'):
+                self.sync_game_trophies(user, game, title_trophies, earned_trophies, sync_job)
             
             # Update progress
-            self.update_game_progress(user, game, game_info, sync_job)
+            with timer.stage('progress_recompute'):
+                self.update_game_progress(user, game, game_info, sync_job)
             
+        except PSNCircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Error processing trophies for {game_info.get('title', 'Unknown')}: {e}")
             sync_job.errors_count += 1
@@ -322,24 +524,7 @@ class PSNAWPService:
     
     def auto_assign_difficulty(self, game: Game, completion_rate: float):
         """Auto-assign difficulty multiplier based on completion rate"""
-        if completion_rate >= 70:
-            game.difficulty_multiplier = 1.2
-        elif completion_rate >= 50:
-            game.difficulty_multiplier = 1.5
-        elif completion_rate >= 35:
-            game.difficulty_multiplier = 2.0
-        elif completion_rate >= 25:
-            game.difficulty_multiplier = 3.0
-        elif completion_rate >= 15:
-            game.difficulty_multiplier = 4.0
-        elif completion_rate >= 10:
-            game.difficulty_multiplier = 5.0
-        elif completion_rate >= 5:
-            game.difficulty_multiplier = 6.0
-        elif completion_rate >= 2:
-            game.difficulty_multiplier = 8.0
-        else:
-            game.difficulty_multiplier = 10.0
+        game.difficulty_multiplier = difficulty_for_completion_rate(completion_rate)
         
         game.save()
         logger.info(f"🎯 Auto-assigned {game.difficulty_multiplier}x difficulty to {game.title}")
@@ -362,6 +547,13 @@ class PSNAWPService:
             elif isinstance(earned_trophies, list):
                 earned_lookup = {getattr(t, 'trophy_id', 0): t for t in earned_trophies}
         
+        # Earned or in-progress trophies get a UserTrophy row; unearned ones
+        # are derived from Trophy (see trophies.queries). Earned rows are final.
+        already_earned = set(UserTrophy.objects.filter(
+            user=user, trophy__game=game, earned=True
+        ).values_list('trophy_id', flat=True))
+        user_trophies = []
+        
         # Process each trophy
         for trophy_data in trophies_list:
             try:
@@ -387,27 +579,44 @@ class PSNAWPService:
                 if created:
                     sync_job.trophies_synced += 1
                 
-                # Handle user earning status
+                # Handle user earning status and progress
                 earned_trophy = earned_lookup.get(trophy_id)
+                if earned_trophy is None or trophy.pk in already_earned:
+                    continue
+                earned = bool(getattr(earned_trophy, 'earned', False))
+                progress_value = getattr(earned_trophy, 'progress', None)
+                if not earned and progress_value is None:
+                    continue
                 
-                user_trophy, ut_created = UserTrophy.objects.get_or_create(
+                user_trophies.append(UserTrophy(
                     user=user,
                     trophy=trophy,
-                    defaults={'earned': False}
-                )
-                
-                # Update earned status
-                if earned_trophy and getattr(earned_trophy, 'earned', False):
-                    if not user_trophy.earned:
-                        user_trophy.earned = True
-                        user_trophy.earned_datetime = getattr(earned_trophy, 'earned_date_time', timezone.now())
-                        user_trophy.save()
-                        sync_job.trophies_new += 1
+                    earned=earned,
+                    earned_datetime=getattr(earned_trophy, 'earned_date_time', timezone.now()) if earned else None,
+                    progress_value=progress_value,
+                    progress_rate=getattr(earned_trophy, 'progress_rate', None),
+                    progress_datetime=getattr(earned_trophy, 'progressed_date_time', None),
+                ))
                 
             except Exception as e:
                 logger.error(f"Error processing trophy {trophy_name}: {e}")
                 continue
         
+        # One upsert for the game, written with the real values
+        if user_trophies:
+            newly_earned = [user_trophy for user_trophy in user_trophies if user_trophy.earned]
+            with transaction.atomic():
+                UserTrophy.objects.bulk_create(
+                    user_trophies,
+                    update_conflicts=True,
+                    unique_fields=['user', 'trophy'],
+                    update_fields=['earned', 'earned_datetime', 'progress_value', 'progress_rate',
+                                   'progress_datetime', 'synced_at'],
+                )
+                record_earned(newly_earned)
+                apply_to_trophy_sets(user_trophies)
+            sync_job.trophies_new += len(newly_earned)
+        
         sync_job.save()
     
     def update_game_progress(self, user: User, game: Game, game_info: Dict[str, Any], sync_job: PSNSyncJob):
@@ -0,0 +1,5 @@
+# psn_integration/signals.py
+from django.dispatch import Signal
+
+# Sent when a sync job completes successfully (sync_job)
+sync_completed = Signal()
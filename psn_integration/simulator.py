@@ -0,0 +1,399 @@
+# psn_integration/simulator.py
+"""
+Offline PSN stand-in for benchmarking and load-testing trophy sync
+
+ReplayPSNAWP serves recorded (or generated) JSON fixtures through the
+same surface PSNAWPService uses on a real PSNAWP client, with optional
+latency and error injection. RecordingPSNAWP wraps a real client and
+captures its responses to disk in the fixture format.
+
+Fixture layout - one file per PSN ID, <fixtures_dir>/<online_id>.json:
+
+    {
+        "online_id": "...",
+        "profile": {...},
+        "trophy_summary": {"trophyLevel": .., "trophyPoint": .., "earnedTrophies": {...}},
+        "titles": [
+            {
+                "np_communication_id": "NPWR00001_00",
+                "title_name": "...",
+                "title_platform": "PS5",
+                "title_icon_url": "...",
+                "progress": 42,
+                "defined_trophies": {"bronze": .., "silver": .., "gold": .., "platinum": ..},
+                "earned_trophies": {...},
+                "trophies": [{"trophy_id": 0, "trophy_name": "...", "trophy_type": "bronze", ...}],
+                "earned": [{"trophy_id": 0, "earned": true, "earned_date_time": "2024-01-01T00:00:00+00:00"}]
+            }
+        ]
+    }
+"""
+
+from django.conf import settings
+from datetime import datetime, timedelta, timezone as dt_timezone
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    from psnawp_api.core.psnawp_exceptions import (
+        PSNAWPNotFoundError,
+        PSNAWPServerError,
+        PSNAWPTooManyRequestsError,
+    )
+except ImportError:
+    PSNAWPNotFoundError = None
+    PSNAWPServerError = None
+    PSNAWPTooManyRequestsError = None
+
+logger = logging.getLogger(__name__)
+
+TROPHY_TYPES = ['bronze', 'silver', 'gold', 'platinum']
+
+
+class SimulatedPSNError(Exception):
+    """Injected PSN failure (used when PSNAWP exception classes are unavailable)"""
+
+
+def _psn_error(error_class, code: int, message: str) -> Exception:
+    """Build a PSNAWP-style exception so the service classifies it like the real thing"""
+    if error_class is None:
+        return SimulatedPSNError(message)
+    return error_class(json.dumps({'error': {'code': code, 'message': message}}))
+
+
+class FaultInjector:
+    """Seeded latency and error injection shared by all replay users"""
+
+    def __init__(self, latency_ms: int = 0, jitter_ms: int = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.injected_errors = 0
+        self._lock = threading.Lock()
+
+    def before_call(self, method: str):
+        """Sleep for the configured latency, then maybe raise an injected error"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_ms + (self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            roll = self.random.random()
+
+        if delay:
+            time.sleep(delay / 1000)
+
+        if roll < self.rate_limit_rate:
+            self.injected_errors += 1
+            raise _psn_error(PSNAWPTooManyRequestsError, 429, f"Simulated rate limit on {method}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.injected_errors += 1
+            raise _psn_error(PSNAWPServerError, 503, f"Simulated server error on {method}")
+
+
+def _namespace(data: Dict[str, Any]) -> SimpleNamespace:
+    """Turn a fixture dict into an object with PSNAWP-like attribute access"""
+    values = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = _namespace(value)
+        elif key.endswith('_date_time') and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        values[key] = value
+    return SimpleNamespace(**values)
+
+
+class ReplayUser:
+    """Replays one PSN user's fixture through the PSNAWP User API surface"""
+
+    def __init__(self, fixture: Dict[str, Any], faults: FaultInjector):
+        self.fixture = fixture
+        self.faults = faults
+        self.online_id = fixture['online_id']
+        self.account_id = fixture.get('profile', {}).get('accountId', '')
+        self._titles = {title['np_communication_id']: title for title in fixture.get('titles', [])}
+
+    def profile(self) -> Dict[str, Any]:
+        self.faults.before_call('profile')
+        return dict(self.fixture.get('profile', {}))
+
+    def trophy_summary(self) -> Dict[str, Any]:
+        self.faults.before_call('trophy_summary')
+        return dict(self.fixture.get('trophy_summary', {}))
+
+    def trophy_titles(self, limit: Optional[int] = None):
+        self.faults.before_call('trophy_titles')
+        titles = self.fixture.get('titles', [])
+        if limit is not None:
+            titles = titles[:limit]
+        for title in titles:
+            yield _namespace({key: value for key, value in title.items() if key not in ('trophies', 'earned')})
+
+    def title_trophies(self, np_communication_id: str, platform=None, **kwargs) -> List[SimpleNamespace]:
+        self.faults.before_call('title_trophies')
+        title = self._get_title(np_communication_id)
+        return [_namespace(trophy) for trophy in title.get('trophies', [])]
+
+    def title_trophies_earned_for_title(self, np_communication_id: str, platform=None, **kwargs) -> List[SimpleNamespace]:
+        self.faults.before_call('title_trophies_earned_for_title')
+        title = self._get_title(np_communication_id)
+        return [_namespace(earned) for earned in title.get('earned', [])]
+
+    def _get_title(self, np_communication_id: str) -> Dict[str, Any]:
+        title = self._titles.get(np_communication_id)
+        if title is None:
+            raise _psn_error(PSNAWPNotFoundError, 404, f"Title {np_communication_id} not found")
+        return title
+
+
+class ReplayPSNAWP:
+    """Drop-in for psnawp_api.PSNAWP that serves fixtures from disk"""
+
+    def __init__(self, fixtures_dir, latency_ms: int = 0, jitter_ms: int = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = None):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.faults = FaultInjector(latency_ms, jitter_ms, error_rate, rate_limit_rate, seed)
+        self._fixtures = {}
+        self._lock = threading.Lock()
+
+    def me(self) -> SimpleNamespace:
+        return SimpleNamespace(online_id='replay', account_id='0')
+
+    def user(self, online_id: str = None, account_id: str = None) -> ReplayUser:
+        self.faults.before_call('user')
+        fixture = self.load_fixture(online_id)
+        if fixture is None:
+            raise _psn_error(PSNAWPNotFoundError, 404, f"User {online_id} not found")
+        return ReplayUser(fixture, self.faults)
+
+    def load_fixture(self, online_id: str) -> Optional[Dict[str, Any]]:
+        """Load (and keep) the fixture for online_id, None if there is none"""
+        with self._lock:
+            if online_id not in self._fixtures:
+                path = self.fixtures_dir / f"{online_id}.json"
+                self._fixtures[online_id] = json.loads(path.read_text()) if path.exists() else None
+            return self._fixtures[online_id]
+
+    @classmethod
+    def from_settings(cls) -> 'ReplayPSNAWP':
+        """Build a replay client from the PSN_REPLAY_* settings"""
+        return cls(
+            settings.PSN_REPLAY_FIXTURES_DIR,
+            latency_ms=settings.PSN_REPLAY_LATENCY_MS,
+            jitter_ms=settings.PSN_REPLAY_JITTER_MS,
+            error_rate=settings.PSN_REPLAY_ERROR_RATE,
+            rate_limit_rate=settings.PSN_REPLAY_RATE_LIMIT_RATE,
+            seed=settings.PSN_REPLAY_SEED,
+        )
+
+
+# Recording
+
+def _to_fixture_value(value: Any) -> Any:
+    """Convert PSNAWP model objects into plain JSON-serialisable values"""
+    if isinstance(value, Enum):
+        return _to_fixture_value(value.value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(key): _to_fixture_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_fixture_value(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        # Multi-platform titles come back as a set of platforms - keep the first
+        values = sorted(_to_fixture_value(item) for item in value)
+        return values[0] if values else ''
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if hasattr(value, '__dict__'):
+        return {
+            key: _to_fixture_value(item)
+            for key, item in vars(value).items()
+            if not key.startswith('_') and not callable(item)
+        }
+    return value
+
+
+def _trophy_summary_fixture(summary: Any) -> Dict[str, Any]:
+    """Store the trophy summary in the camelCase shape fetch_psn_user() reads"""
+    if isinstance(summary, dict):
+        return _to_fixture_value(summary)
+    earned = getattr(summary, 'earned_trophies', None)
+    return {
+        'trophyLevel': getattr(summary, 'trophy_level', 1),
+        'trophyPoint': getattr(summary, 'progress', 0),
+        'earnedTrophies': {
+            trophy_type: getattr(earned, trophy_type, 0) for trophy_type in TROPHY_TYPES
+        },
+    }
+
+
+class RecordingUser:
+    """Proxies a real PSNAWP User and records every response into a fixture"""
+
+    def __init__(self, user, fixture: Dict[str, Any]):
+        self._user = user
+        self.fixture = fixture
+        self.online_id = getattr(user, 'online_id', fixture['online_id'])
+        self.account_id = getattr(user, 'account_id', '')
+
+    def profile(self):
+        profile = self._user.profile()
+        self.fixture['profile'] = _to_fixture_value(profile)
+        return profile
+
+    def trophy_summary(self):
+        summary = self._user.trophy_summary()
+        self.fixture['trophy_summary'] = _trophy_summary_fixture(summary)
+        return summary
+
+    def trophy_titles(self, *args, **kwargs):
+        titles = list(self._user.trophy_titles(*args, **kwargs))
+        for title in titles:
+            recorded = _to_fixture_value(title)
+            self._title_entry(recorded.get('np_communication_id', '')).update(recorded)
+        return titles
+
+    def title_trophies(self, np_communication_id: str, *args, **kwargs):
+        trophies = list(self._user.title_trophies(np_communication_id, *args, **kwargs))
+        self._title_entry(np_communication_id)['trophies'] = _to_fixture_value(trophies)
+        return trophies
+
+    def title_trophies_earned_for_title(self, np_communication_id: str, *args, **kwargs):
+        earned = list(self._user.title_trophies_earned_for_title(np_communication_id, *args, **kwargs))
+        self._title_entry(np_communication_id)['earned'] = _to_fixture_value(earned)
+        return earned
+
+    def __getattr__(self, name):
+        return getattr(self._user, name)
+
+    def _title_entry(self, np_communication_id: str) -> Dict[str, Any]:
+        for title in self.fixture['titles']:
+            if title.get('np_communication_id') == np_communication_id:
+                return title
+        title = {'np_communication_id': np_communication_id}
+        self.fixture['titles'].append(title)
+        return title
+
+
+class RecordingPSNAWP:
+    """Wraps a real PSNAWP client and records responses as replay fixtures"""
+
+    def __init__(self, psnawp, fixtures_dir):
+        self._psnawp = psnawp
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures = {}
+
+    def me(self):
+        return self._psnawp.me()
+
+    def user(self, online_id: str = None, account_id: str = None, **kwargs) -> RecordingUser:
+        if online_id is not None:
+            kwargs['online_id'] = online_id
+        if account_id is not None:
+            kwargs['account_id'] = account_id
+        user = self._psnawp.user(**kwargs)
+        key = online_id or getattr(user, 'online_id', account_id)
+        fixture = self.fixtures.setdefault(key, {'online_id': key, 'profile': {}, 'trophy_summary': {}, 'titles': []})
+        return RecordingUser(user, fixture)
+
+    def __getattr__(self, name):
+        return getattr(self._psnawp, name)
+
+    def save(self) -> List[Path]:
+        """Write every recorded user to <fixtures_dir>/<online_id>.json"""
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for online_id, fixture in self.fixtures.items():
+            path = self.fixtures_dir / f"{online_id}.json"
+            path.write_text(json.dumps(fixture, indent=2, default=str))
+            paths.append(path)
+        return paths
+
+
+# Synthetic fixtures
+
+def generate_fixture(online_id: str, titles: int = 50, trophies_per_title: int = 40,
+                     earned_ratio: float = 0.5, seed: int = None) -> Dict[str, Any]:
+    """Build a synthetic, deterministic (for a given seed) user fixture"""
+    rng = random.Random(seed)
+    now = datetime.now(dt_timezone.utc).replace(microsecond=0)
+    totals = dict.fromkeys(TROPHY_TYPES, 0)
+    title_fixtures = []
+
+    for index in range(titles):
+        np_communication_id = f"NPWR{index + 1:05d}_00"
+        types = ['platinum'] + rng.choices(['bronze', 'silver', 'gold'], weights=[70, 22, 8], k=trophies_per_title - 1)
+        completion = min(1.0, max(0.0, rng.gauss(earned_ratio, 0.25)))
+
+        trophies, earned = [], []
+        defined = dict.fromkeys(TROPHY_TYPES, 0)
+        earned_counts = dict.fromkeys(TROPHY_TYPES, 0)
+        for trophy_id, trophy_type in enumerate(types):
+            defined[trophy_type] += 1
+            trophies.append({
+                'trophy_id': trophy_id,
+                'trophy_name': f"Trophy {trophy_id + 1}",
+                'trophy_type': trophy_type,
+                'trophy_detail': f"Synthetic {trophy_type} trophy",
+                'trophy_icon_url': '',
+                'trophy_hidden': rng.random() < 0.1,
+                'trophy_group_id': 'default',
+            })
+            is_earned = rng.random() < completion and trophy_type != 'platinum'
+            if is_earned:
+                earned_counts[trophy_type] += 1
+                earned.append({
+                    'trophy_id': trophy_id,
+                    'earned': True,
+                    'earned_date_time': (now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))).isoformat(),
+                })
+
+        earnable = len(types) - 1
+        if earnable and len(earned) == earnable:
+            earned_counts['platinum'] = 1
+            earned.append({'trophy_id': 0, 'earned': True, 'earned_date_time': now.isoformat()})
+
+        for trophy_type in TROPHY_TYPES:
+            totals[trophy_type] += earned_counts[trophy_type]
+
+        title_fixtures.append({
+            'np_communication_id': np_communication_id,
+            'title_name': f"Synthetic Game {index + 1}",
+            'title_platform': rng.choice(['PS4', 'PS5']),
+            'title_icon_url': '',
+            'progress': int(len(earned) * 100 / len(types)),
+            'defined_trophies': defined,
+            'earned_trophies': earned_counts,
+            'trophies': trophies,
+            'earned': earned,
+        })
+
+    return {
+        'online_id': online_id,
+        'profile': {'accountId': str(rng.randint(10 ** 17, 10 ** 18)), 'onlineId': online_id, 'avatarUrls': []},
+        'trophy_summary': {
+            'trophyLevel': min(999, 1 + sum(totals.values()) // 20),
+            'trophyPoint': totals['bronze'] * 15 + totals['silver'] * 30 + totals['gold'] * 90 + totals['platinum'] * 300,
+            'earnedTrophies': totals,
+        },
+        'titles': title_fixtures,
+    }
+
+
+def write_fixture(fixtures_dir, fixture: Dict[str, Any]) -> Path:
+    """Write a fixture to <fixtures_dir>/<online_id>.json"""
+    fixtures_dir = Path(fixtures_dir)
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    path = fixtures_dir / f"{fixture['online_id']}.json"
+    path.write_text(json.dumps(fixture, indent=2))
+    return path
@@ -9,6 +9,8 @@ from .models import PSNToken, PSNSyncLog
 from .services import PSNAPIService, PSNAuthenticationService
 from games.models import Game
 from trophies.models import Trophy, UserTrophy, UserGameProgress
+from trophies.events import record_earned
+from trophies.trophy_sets import apply_to_trophy_sets
 from users.models import User
 from datetime import timedelta
 import logging
@@ -199,16 +201,15 @@ def process_single_game_trophies(user, api_service, title_data):
                 defaults=trophy_defaults
             )
             
-            # Get or create user trophy record
-            user_trophy, ut_created = UserTrophy.objects.get_or_create(
-                user=user,
-                trophy=trophy,
-                defaults={'earned': False}
-            )
-            
-            # Update earning status from API data
+            # Update earning status from API data - only earned or in-progress
+            # trophies get a user trophy record, unearned ones are derived from Trophy
             earned_data = earned_trophies.get(trophy_id)
-            if earned_data:
+            if earned_data and (earned_data.get('earned') or 'progress' in earned_data):
+                user_trophy, ut_created = UserTrophy.objects.get_or_create(
+                    user=user,
+                    trophy=trophy,
+                    defaults={'earned': False}
+                )
                 old_earned = user_trophy.earned
                 user_trophy.earned = earned_data.get('earned', False)
                 
@@ -230,11 +231,16 @@ def process_single_game_trophies(user, api_service, title_data):
                         except Exception as e:
                             logger.warning(f"Failed to parse progress datetime: {e}")
                 
-                user_trophy.save()
+                newly_earned = user_trophy.earned and not old_earned
+                with transaction.atomic():
+                    user_trophy.save()
+                    if newly_earned:
+                        record_earned([user_trophy])
+                    apply_to_trophy_sets([user_trophy])
                 trophies_updated += 1
                 
                 # Count new trophies
-                if user_trophy.earned and not old_earned:
+                if newly_earned:
                     new_trophies_earned += 1
                     logger.info(f"New trophy earned: {trophy.name} ({trophy.trophy_type})")
         
@@ -1,3 +1,268 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from games.models import Game
+from trophy_tracker import metrics
+from trophies.models import TrophyEvent, UserTrophy, UserTrophySet
+from .models import PSNApiCall, PSNCircuitBreaker, PSNSyncJob, PSNUserValidation
+from .services import PSNAWPService, PSNCircuitOpenError
+from .simulator import PSNAWPNotFoundError, PSNAWPServerError, _psn_error
+from .validation_cache import PSNValidationCache, validation_cache
+
+User = get_user_model()
+
+
+@override_settings(PSN_BREAKER_FAILURE_THRESHOLD=3, PSN_BREAKER_BASE_DELAY=30, PSN_BREAKER_MAX_DELAY=60)
+class CircuitBreakerTests(TestCase):
+    """State transitions of the shared PSNAWP breaker"""
+    
+    def setUp(self):
+        self.breaker = PSNCircuitBreaker.get_default()
+    
+    def trip(self):
+        for _ in range(3):
+            self.breaker.record_failure('HTTP 503')
+    
+    def test_failures_open_the_breaker(self):
+        self.breaker.record_failure('HTTP 503')
+        self.breaker.record_failure('HTTP 503')
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow_request())
+        
+        self.breaker.record_failure('HTTP 503')
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.breaker.trip_count, 1)
+        self.assertFalse(self.breaker.allow_request())
+    
+    def test_rate_limit_trips_immediately(self):
+        self.breaker.record_failure('HTTP 429', trip_now=True)
+        self.assertEqual(self.breaker.state, 'open')
+    
+    def test_client_errors_are_ignored(self):
+        self.breaker.record_outcome(PSNApiCall(status='error', http_status_code=404))
+        self.breaker.refresh_from_db()
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+    
+    def test_half_open_probe_success_closes(self):
+        self.trip()
+        PSNCircuitBreaker.objects.filter(pk=self.breaker.pk).update(retry_at=timezone.now() - timedelta(seconds=1))
+        self.breaker.refresh_from_db()
+        
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, 'half_open')
+        # Only one probe at a time
+        self.assertFalse(PSNCircuitBreaker.get_default().allow_request())
+        
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+        self.assertEqual(self.breaker.consecutive_trips, 0)
+        self.assertIsNone(self.breaker.retry_at)
+    
+    def test_half_open_probe_failure_reopens(self):
+        self.trip()
+        PSNCircuitBreaker.objects.filter(pk=self.breaker.pk).update(retry_at=timezone.now() - timedelta(seconds=1))
+        self.breaker.refresh_from_db()
+        self.assertTrue(self.breaker.allow_request())
+        
+        self.breaker.record_failure('HTTP 503')
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.breaker.consecutive_trips, 2)
+    
+    def test_half_open_probe_client_error_closes(self):
+        # PSN answered the probe, if only to say the PSN ID doesn't exist
+        self.trip()
+        PSNCircuitBreaker.objects.filter(pk=self.breaker.pk).update(retry_at=timezone.now() - timedelta(seconds=1))
+        self.breaker.refresh_from_db()
+        self.assertTrue(self.breaker.allow_request())
+        
+        self.breaker.record_outcome(PSNApiCall(status='error', http_status_code=404))
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow_request())
+    
+    def test_stale_success_does_not_close_open_breaker(self):
+        # A slow call that started before the trip reports back afterwards
+        self.trip()
+        PSNCircuitBreaker.get_default().record_success()
+        
+        self.breaker.refresh_from_db()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertIsNotNone(self.breaker.retry_at)
+        self.assertFalse(self.breaker.allow_request())
+    
+    def test_success_while_closed_resets_failures(self):
+        self.breaker.record_failure('HTTP 503')
+        self.breaker.record_failure('HTTP 503')
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+        
+        self.breaker.record_failure('HTTP 503')
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+class ParkedSyncTests(TestCase):
+    """A parked sync resumes by title id, whatever order PSN lists the titles in"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('parker', psn_id='parker')
+        self.client_mock = mock.Mock()
+        self.service = PSNAWPService(client=self.client_mock)
+    
+    def run_sync(self, np_communication_ids, sync_job=None, park_at=None):
+        titles = [SimpleNamespace(np_communication_id=np_id, title_name=np_id) for np_id in np_communication_ids]
+        self.client_mock.user.return_value.trophy_titles.return_value = titles
+        processed = []
+        
+        def process_game_trophies(user, psn_user, title_data, sync_job):
+            if title_data.np_communication_id == park_at:
+                raise PSNCircuitOpenError(timezone.now())
+            processed.append(title_data.np_communication_id)
+        
+        with mock.patch.object(self.service, 'process_game_trophies', side_effect=process_game_trophies), \
+                mock.patch.object(self.service, 'recalculate_user_scores'):
+            sync_job = self.service.sync_user_trophies(self.user, 'parker', sync_job)
+        return sync_job, processed
+    
+    def test_resume_skips_synced_titles_after_reordering(self):
+        sync_job, processed = self.run_sync(['NPWR1', 'NPWR2', 'NPWR3'], park_at='NPWR2')
+        self.assertEqual((sync_job.status, processed), ('parked', ['NPWR1']))
+        self.assertEqual(sync_job.synced_titles, ['NPWR1'])
+        
+        # Played while parked: a new title and NPWR1 jump to the front of the list
+        sync_job, processed = self.run_sync(['NPWR4', 'NPWR1', 'NPWR2', 'NPWR3'], sync_job)
+        self.assertEqual((sync_job.status, processed), ('completed', ['NPWR4', 'NPWR2', 'NPWR3']))
+    
+    def test_breaker_is_read_once_per_call(self):
+        PSNCircuitBreaker.get_default()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.service.call_psn('validate_user', 'user', lambda **kw: 'ok', psn_id='parker'), 'ok')
+        breaker_queries = [query for query in queries if 'psn_integration_circuitbreaker' in query['sql']]
+        self.assertEqual(len(breaker_queries), 1)
+
+
+class LazyTrophyFetchTests(TestCase):
+    """PSN errors raised while iterating psnawp results still reach the breaker"""
+    
+    def test_iteration_errors_are_logged_and_counted(self):
+        user = User.objects.create_user('lazy', psn_id='lazy')
+        sync_job = PSNSyncJob.objects.create(user=user)
+        game = Game.objects.create(np_communication_id='NPWR00001_00', title='Lazy Game')
+        
+        def title_trophies(**kwargs):
+            # psnawp returns a lazy iterator: the request happens on first next()
+            raise TimeoutError('Read timed out')
+            yield
+        
+        psn_user = SimpleNamespace(online_id='lazy', title_trophies=title_trophies)
+        service = PSNAWPService(client=mock.Mock())
+        game_info = {'np_communication_id': game.np_communication_id, 'platform': 'PS5', 'title': game.title}
+        with mock.patch.object(service, 'extract_game_info', return_value=game_info), \
+                mock.patch.object(service, 'get_or_create_game', return_value=game):
+            service.process_game_trophies(user, psn_user, object(), sync_job)
+        
+        call = PSNApiCall.objects.get(call_type='game_trophies')
+        self.assertEqual(call.status, 'timeout')
+        self.assertEqual(PSNCircuitBreaker.get_default().consecutive_failures, 1)
+        self.assertEqual(sync_job.errors_count, 1)
+
+
+class ValidationCacheTests(TestCase):
+    """Only definitive PSN answers are cached and stored"""
+    
+    def setUp(self):
+        self.client_mock = mock.Mock()
+        self.service = PSNAWPService(client=self.client_mock)
+        self.cache = PSNValidationCache(max_entries=10, ttl=3600, negative_ttl=600)
+    
+    def test_not_found_is_cached_and_stored(self):
+        self.client_mock.user.side_effect = _psn_error(PSNAWPNotFoundError, 404, 'User GhostUser not found')
+        
+        result = self.cache.lookup('GhostUser', self.service.fetch_psn_user)
+        self.assertFalse(result['valid'])
+        self.assertEqual(PSNUserValidation.objects.get(psn_id='GhostUser').validation_status, 'not_found')
+        
+        self.assertFalse(self.cache.lookup('GhostUser', self.service.fetch_psn_user)['valid'])
+        self.assertEqual(self.client_mock.user.call_count, 1)
+    
+    def test_transient_errors_are_not_cached(self):
+        self.client_mock.user.side_effect = _psn_error(PSNAWPServerError, 503, 'Service Unavailable')
+        
+        with self.assertRaises(Exception):
+            self.cache.lookup('RealPlayer', self.service.fetch_psn_user)
+        self.assertFalse(PSNUserValidation.objects.filter(psn_id='RealPlayer').exists())
+        
+        with self.assertRaises(Exception):
+            self.cache.lookup('RealPlayer', self.service.fetch_psn_user)
+        self.assertEqual(self.client_mock.user.call_count, 2)
+    
+    def test_stored_error_is_not_served(self):
+        validation = PSNUserValidation.objects.create(psn_id='RealPlayer')
+        validation.mark_validation_error('Read timed out')
+        calls = []
+        
+        def fetch(psn_id):
+            calls.append(psn_id)
+            return {'valid': True, 'psn_id': psn_id, 'is_public': True}
+        
+        self.assertTrue(self.cache.lookup('RealPlayer', fetch)['valid'])
+        self.assertEqual(calls, ['RealPlayer'])
+
+
+class ValidationCacheMetricsTests(TestCase):
+    """Cache totals are exported as Prometheus counters"""
+    
+    def test_totals_are_counters(self):
+        with mock.patch.multiple(validation_cache, hits=7, db_hits=2, misses=3):
+            exposition = metrics.render_prometheus()
+        
+        self.assertIn('# TYPE trophy_tracker_psn_validation_cache_hits_total counter', exposition)
+        self.assertIn('trophy_tracker_psn_validation_cache_hits_total 7', exposition.splitlines())
+        self.assertIn('trophy_tracker_psn_validation_cache_misses_total 3', exposition.splitlines())
+        self.assertIn('# TYPE trophy_tracker_psn_validation_cache_entries gauge', exposition)
+        self.assertNotIn('trophy_tracker_psn_validation_cache_hits 7', exposition)
+
+
+class SyncGameTrophiesTests(TestCase):
+    """Earned and in-progress trophies are upserted with their real values"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('syncer', psn_id='syncer')
+        self.game = Game.objects.create(np_communication_id='NPWR00002_00', title='Sync Game')
+        self.sync_job = PSNSyncJob.objects.create(user=self.user)
+        self.service = PSNAWPService(client=mock.Mock())
+        self.title_trophies = [
+            SimpleNamespace(trophy_id=trophy_id, trophy_name=f'Trophy {trophy_id}', trophy_type='bronze')
+            for trophy_id in range(3)
+        ]
+    
+    def sync(self, *earned_trophies):
+        self.service.sync_game_trophies(self.user, self.game, self.title_trophies, list(earned_trophies), self.sync_job)
+        return {
+            user_trophy.trophy.trophy_id: (user_trophy.earned, user_trophy.progress_value)
+            for user_trophy in UserTrophy.objects.filter(user=self.user).select_related('trophy')
+        }
+    
+    def psn_trophy(self, trophy_id, earned=False, progress=None):
+        return SimpleNamespace(
+            trophy_id=trophy_id, earned=earned, earned_date_time=timezone.now() if earned else None,
+            progress=progress, progress_rate=progress, progressed_date_time=timezone.now() if progress else None,
+        )
+    
+    def test_earned_and_in_progress_rows_are_kept(self):
+        rows = self.sync(self.psn_trophy(0, earned=True), self.psn_trophy(1, progress=40), self.psn_trophy(2))
+        self.assertEqual(rows, {0: (True, None), 1: (False, 40)})
+        self.assertEqual((self.sync_job.trophies_new, TrophyEvent.objects.count()), (1, 1))
+        
+        rows = self.sync(self.psn_trophy(0, earned=True), self.psn_trophy(1, progress=80), self.psn_trophy(2, earned=True))
+        self.assertEqual(rows, {0: (True, None), 1: (False, 80), 2: (True, None)})
+        self.assertEqual((self.sync_job.trophies_new, TrophyEvent.objects.count()), (2, 2))
+        
+        trophy_set = UserTrophySet.objects.get(user=self.user, game=self.game)
+        self.assertEqual(trophy_set.earned_trophy_ids(), [0, 2])
+        self.assertEqual(trophy_set.entries.get(trophy_id=1).progress_value, 80)
 
-# Create your tests here.
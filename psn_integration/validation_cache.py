@@ -0,0 +1,224 @@
+# psn_integration/validation_cache.py
+"""
+Two-tier cache for PSN ID validation lookups
+
+Tier 1 is a per-process LRU with a TTL, tier 2 is the PSNUserValidation
+table. Only when both miss (or are stale) do we ask PSN, and concurrent
+lookups of the same PSN ID share that single request. Only definitive
+answers are cached - a valid profile or a not-found ID; PSN outages,
+rate limits and timeouts propagate and are asked again next time.
+"""
+
+from collections import OrderedDict
+from django.conf import settings
+from django.utils import timezone
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from psn_integration.models import PSNUserValidation
+
+logger = logging.getLogger(__name__)
+
+PSN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{3,16}$')
+
+
+def is_well_formed_psn_id(psn_id: str) -> bool:
+    """Check PSN ID format (3-16 letters, numbers, hyphens, underscores)"""
+    return bool(psn_id and PSN_ID_PATTERN.match(psn_id))
+
+
+class _InFlight:
+    """A PSN lookup that other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PSNValidationCache:
+    """Per-process LRU in front of the PSNUserValidation table"""
+
+    def __init__(self, max_entries: int = None, ttl: int = None, negative_ttl: int = None):
+        self.max_entries = max_entries or getattr(settings, 'PSN_VALIDATION_CACHE_SIZE', 1024)
+        self.ttl = ttl or getattr(settings, 'PSN_VALIDATION_CACHE_TTL', 24 * 3600)
+        self.negative_ttl = negative_ttl or getattr(settings, 'PSN_VALIDATION_NEGATIVE_TTL', 600)
+
+        self._entries = OrderedDict()  # psn_id -> (expires_at, result)
+        self._in_flight = {}  # psn_id -> _InFlight
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def lookup(self, psn_id: str, fetch: Callable[[str], Dict[str, Any]], force: bool = False) -> Dict[str, Any]:
+        """
+        Return a validation result for psn_id, calling fetch(psn_id)
+        only when no fresh cached result exists
+        """
+        if not is_well_formed_psn_id(psn_id):
+            return self._result_for_malformed(psn_id)
+
+        if not force:
+            cached = self._get_local(psn_id)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        with self._lock:
+            in_flight = self._in_flight.get(psn_id)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[psn_id] = _InFlight()
+
+        if not leader:
+            # Someone else is already asking PSN about this ID
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            result = None if force else self._get_stored(psn_id)
+            if result is not None:
+                self.db_hits += 1
+            else:
+                self.misses += 1
+                result = fetch(psn_id)
+                result.setdefault('is_valid', result.get('valid', False))
+                if not (result.get('valid') or result.get('not_found')):
+                    # Not a definitive answer - don't let it stick for the negative TTL
+                    in_flight.result = result
+                    return result
+                self._store(psn_id, result)
+
+            self._set_local(psn_id, result)
+            in_flight.result = result
+            return result
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(psn_id, None)
+            in_flight.done.set()
+
+    def invalidate(self, psn_id: str = None):
+        """Drop one PSN ID (or everything) from the local tier"""
+        with self._lock:
+            if psn_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(psn_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+        }
+
+    # Local (LRU) tier
+
+    def _get_local(self, psn_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(psn_id)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[psn_id]
+                return None
+            self._entries.move_to_end(psn_id)
+            return result
+
+    def _set_local(self, psn_id: str, result: Dict[str, Any]):
+        ttl = self.ttl if result.get('valid') else self.negative_ttl
+        with self._lock:
+            self._entries[psn_id] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(psn_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Database (PSNUserValidation) tier
+
+    def _get_stored(self, psn_id: str) -> Optional[Dict[str, Any]]:
+        validation = PSNUserValidation.objects.filter(psn_id=psn_id).first()
+        if validation is None:
+            return None
+
+        if not validation.is_valid and validation.validation_status != 'not_found':
+            return None  # A failed check, not an answer - ask PSN again
+
+        ttl = self.ttl if validation.is_valid else self.negative_ttl
+        if validation.needs_revalidation(hours=ttl / 3600):
+            return None
+
+        return self.result_from_validation(validation)
+
+    def _store(self, psn_id: str, result: Dict[str, Any]):
+        validation, created = PSNUserValidation.objects.get_or_create(psn_id=psn_id)
+        if created:
+            validation.check_count = 0
+
+        if result.get('valid'):
+            validation.mark_validation_success(result)
+        else:
+            validation.mark_validation_error(result.get('error', 'PSN ID not found'), status='not_found')
+
+    @staticmethod
+    def result_from_validation(validation: PSNUserValidation) -> Dict[str, Any]:
+        """Build a validate_psn_user() style result from a stored validation"""
+        result = {
+            'valid': validation.is_valid,
+            'is_valid': validation.is_valid,
+            'psn_id': validation.psn_id,
+            'last_seen': validation.last_checked,
+            'cached': True,
+        }
+
+        if validation.is_valid:
+            result.update({
+                'account_id': validation.psn_account_id or '',
+                'display_name': validation.display_name or validation.psn_id,
+                'avatar_url': validation.avatar_url,
+                'trophy_level': validation.trophy_level or 1,
+                'total_trophies': validation.total_trophies or {},
+                'trophy_points': validation.trophy_points or 0,
+                'is_public': validation.is_public,
+            })
+        else:
+            result['error'] = validation.last_error or 'PSN ID not found or not accessible'
+
+        return result
+
+    @staticmethod
+    def _result_for_malformed(psn_id: str) -> Dict[str, Any]:
+        return {
+            'valid': False,
+            'is_valid': False,
+            'psn_id': psn_id,
+            'error': 'PSN ID must be 3-16 letters, numbers, hyphens or underscores',
+            'last_seen': timezone.now(),
+        }
+
+
+# Shared per-process instance
+validation_cache = PSNValidationCache()
+
+
+def validate_psn_id(psn_id: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Validate a PSN ID through the cache, only connecting to PSN
+    (which itself costs an authentication round trip) on a miss
+    """
+    def fetch(lookup_id):
+        from psn_integration.services import PSNAWPService
+        return PSNAWPService().fetch_psn_user(lookup_id)
+
+    return validation_cache.lookup(psn_id, fetch, force=force)
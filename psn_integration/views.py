@@ -18,12 +18,14 @@ import logging
 import json
 
 # Import models
-from .models import PSNToken, PSNSyncJob, PSNUserValidation, PSNApiCall
+from .models import PSNToken, PSNSyncJob, PSNSyncJobArchive, PSNUserValidation, PSNApiCall, PSNApiCallHourly
 from users.models import User
+from trophy_tracker.conditional import conditional_view
 
 # Try to import PSN services
 try:
     from .services import PSNAWPService
+    from .validation_cache import validate_psn_id as validate_psn_id_cached
     PSNAWP_AVAILABLE = True
 except ImportError:
     PSNAWP_AVAILABLE = False
@@ -67,8 +69,7 @@ def psn_connect(request):
     try:
         # Validate PSN ID if service is available
         if PSNAWP_AVAILABLE:
-            psn_service = PSNAWPService()
-            validation_result = psn_service.validate_psn_user(psn_id)
+            validation_result = validate_psn_id_cached(psn_id)
             
             if not validation_result['is_valid']:
                 messages.error(request, f"PlayStation Network ID '{psn_id}' not found or not accessible.")
@@ -188,7 +189,7 @@ def sync_trophies(request):
     # Check if user has a sync job already running
     active_sync = PSNSyncJob.objects.filter(
         user=request.user,
-        status__in=['pending', 'running']
+        status__in=['pending', 'running', 'parked']
     ).first()
     
     if active_sync:
@@ -235,6 +236,7 @@ def sync_trophies(request):
     return redirect('psn_integration:status')
 
 @login_required
+@conditional_view('sync_progress', lambda request, job_id: (PSNSyncJob.progress_etag(job_id, request.user), None))
 def sync_progress(request, job_id):
     """Get sync progress via AJAX"""
     
@@ -251,6 +253,10 @@ def sync_progress(request, job_id):
             'duration': sync_job.duration_seconds() if sync_job.completed_at else 0,
         }
         
+        # Parked jobs resume on their own once PSN recovers
+        if sync_job.status == 'parked':
+            response_data['resume_after'] = sync_job.resume_after.isoformat() if sync_job.resume_after else None
+        
         # Add results if completed
         if sync_job.status == 'completed':
             response_data.update({
@@ -292,9 +298,8 @@ def validate_psn_id(request):
                 'is_public': True
             })
         
-        # Validate using PSN service
-        psn_service = PSNAWPService()
-        result = psn_service.validate_psn_user(psn_id)
+        # Validate using PSN service (cached)
+        result = validate_psn_id_cached(psn_id)
         
         response_data = {
             'valid': result['is_valid'],
@@ -342,7 +347,7 @@ def psn_disconnect(request):
         # Cancel any pending sync jobs
         PSNSyncJob.objects.filter(
             user=request.user,
-            status__in=['pending', 'running']
+            status__in=['pending', 'running', 'parked']
         ).update(
             status='cancelled',
             completed_at=timezone.now()
@@ -378,18 +383,14 @@ def psn_settings(request):
     context = {
         'user': request.user,
         'psn_connected': bool(request.user.psn_id),
-        'recent_api_calls': [],
+        'api_call_summary': [],
     }
     
-    # Get recent API calls for debugging
+    # PSN API health over the last day, from the hourly rollups
     try:
-        if request.user.psn_id:
-            recent_calls = PSNApiCall.objects.filter(
-                psn_id=request.user.psn_id
-            ).order_by('-timestamp')[:10]
-            context['recent_api_calls'] = recent_calls
+        context['api_call_summary'] = PSNApiCallHourly.summary(hours=24)
     except Exception as e:
-        logger.error(f"Error fetching API calls: {e}")
+        logger.error(f"Error fetching API call rollups: {e}")
     
     return render(request, 'psn_integration/settings.html', context)
 
@@ -401,14 +402,22 @@ def psn_settings(request):
 def sync_history(request):
     """Show detailed sync history for the user"""
     
-    sync_jobs = PSNSyncJob.objects.filter(
+    sync_jobs = list(PSNSyncJob.objects.filter(
         user=request.user
-    ).order_by('-created_at')
+    ).order_by('-created_at')[:50])  # Show last 50 syncs
+    
+    # Older syncs live in the archive once archive_sync_jobs has run
+    archived_jobs = []
+    if len(sync_jobs) < 50:
+        archived_jobs = PSNSyncJobArchive.objects.filter(
+            user=request.user
+        ).order_by('-created_at')[:50 - len(sync_jobs)]
     
     # Pagination could be added here
     context = {
         'user': request.user,
-        'sync_jobs': sync_jobs[:50],  # Show last 50 syncs
+        'sync_jobs': sync_jobs,
+        'archived_jobs': archived_jobs,
     }
     
     return render(request, 'psn_integration/sync_history.html', context)
@@ -434,7 +443,7 @@ def cancel_sync(request, job_id):
         try:
             sync_job = get_object_or_404(PSNSyncJob, job_id=job_id, user=request.user)
             
-            if sync_job.status in ['pending', 'running']:
+            if sync_job.status in ['pending', 'running', 'parked']:
                 sync_job.status = 'cancelled'
                 sync_job.completed_at = timezone.now()
                 sync_job.save()
@@ -464,6 +473,8 @@ def debug_psn_token(request):
     context = {
         'tokens': PSNToken.objects.all(),
         'recent_api_calls': PSNApiCall.objects.all().order_by('-timestamp')[:20],
+        'api_call_summary': PSNApiCallHourly.summary(hours=24),
+        'api_call_hours': PSNApiCallHourly.objects.all()[:48],
         'recent_validations': PSNUserValidation.objects.all().order_by('-last_checked')[:20],
     }
     
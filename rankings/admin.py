@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
+from .milestones import backfill_milestones
 from .models import RankingPeriod, UserRanking, TrophyMilestone
 
 @admin.register(RankingPeriod)
@@ -124,7 +125,7 @@ class TrophyMilestoneAdmin(admin.ModelAdmin):
         )
     get_milestone_display.short_description = 'Milestone'
     
-    actions = ['mark_achieved', 'create_custom_milestones']
+    actions = ['mark_achieved', 'award_rule_milestones', 'create_custom_milestones']
     
     def mark_achieved(self, request, queryset):
         """Mark selected milestones as achieved"""
@@ -134,3 +135,10 @@ class TrophyMilestoneAdmin(admin.ModelAdmin):
         )
         self.message_user(request, f"Marked {updated} milestones as achieved.")
     mark_achieved.short_description = "Mark as achieved"
+    
+    def award_rule_milestones(self, request, queryset):
+        """Evaluate every milestone rule for the selected milestones' users"""
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        awarded = backfill_milestones(user_ids)
+        self.message_user(request, f"🏅 Awarded {len(awarded)} new milestones to {len(user_ids)} users.")
+    award_rule_milestones.short_description = "🏅 Award rule milestones for these users"
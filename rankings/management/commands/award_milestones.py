@@ -0,0 +1,95 @@
+# rankings/management/commands/award_milestones.py
+"""
+Award rule-based trophy milestones
+
+By default consumes the trophy event stream since the last run (see
+rankings.milestones). --backfill evaluates every rule for every user
+with a trophy score instead, in chunks spread over worker processes.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+import multiprocessing
+import time
+
+
+def worker_init():
+    """Worker process: set Django up with its own database connection"""
+    import django
+    django.setup()
+    connections.close_all()  # never share the parent's connection
+
+
+def backfill_chunk(user_ids):
+    from rankings.milestones import backfill_milestones
+    return len(user_ids), len(backfill_milestones(user_ids))
+
+
+class Command(BaseCommand):
+    help = 'Award trophy milestones from newly earned trophies (or backfill them for all users)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true', help='Evaluate every rule for every user with a score')
+        parser.add_argument('--user', type=str, help='Backfill a single user (username)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=max(1, min(4, multiprocessing.cpu_count())),
+            help='Backfill worker processes (SQLite always uses 1)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help='Users per backfill chunk')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Events per consumer batch')
+    
+    def handle(self, *args, **options):
+        from rankings.milestones import CONSUMER, backfill_milestones, process_events
+        from trophies.events import consumer_lag
+        from users.models import User
+        
+        started = time.perf_counter()
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+            awarded = backfill_milestones([user.pk])
+            for milestone in awarded:
+                self.stdout.write(f"  🏅 {milestone.title}: {milestone.description}")
+            self.stdout.write(self.style.SUCCESS(f"✅ Awarded {len(awarded)} milestones to {user.username}"))
+            return
+        
+        if not options['backfill']:
+            self.stdout.write(f"📬 {consumer_lag(CONSUMER)} trophy events waiting")
+            consumed = process_events(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Evaluated milestones for {consumed} trophy events in {time.perf_counter() - started:.1f}s"
+            ))
+            return
+        
+        user_ids = list(User.objects.filter(total_trophy_score__gt=0).order_by('pk').values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+        chunks = [user_ids[start:start + chunk_size] for start in range(0, len(user_ids), chunk_size)]
+        workers = min(options['workers'], len(chunks)) or 1
+        if connection.vendor == 'sqlite' and workers > 1:
+            self.stdout.write(self.style.WARNING('⚠️ SQLite allows a single writer - backfilling with 1 worker'))
+            workers = 1
+        self.stdout.write(f"🏅 Backfilling milestones for {len(user_ids)} users with {workers} worker(s)...")
+        
+        if workers == 1:
+            results = map(backfill_chunk, chunks)
+            pool = None
+        else:
+            connections.close_all()
+            pool = multiprocessing.get_context().Pool(workers, initializer=worker_init)
+            results = pool.imap_unordered(backfill_chunk, chunks)
+        
+        users_done = awarded = 0
+        try:
+            for chunk_users, chunk_awarded in results:
+                users_done += chunk_users
+                awarded += chunk_awarded
+                self.stdout.write(f"  ... {users_done}/{len(user_ids)} users, {awarded} milestones")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Awarded {awarded} milestones to {len(user_ids)} users in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rankings', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userranking',
+            index=models.Index(fields=['ranking_period', 'global_rank', 'id'], name='rankings_period_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:38
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_milestones(apps, schema_editor):
+    """Keep the oldest of any duplicated (user, type, threshold) milestone the constraint covers"""
+    TrophyMilestone = apps.get_model('rankings', 'TrophyMilestone')
+    covered = TrophyMilestone.objects.filter(achieved=True, score_threshold__isnull=False).exclude(milestone_type='custom')
+    duplicates = covered.values('user_id', 'milestone_type', 'score_threshold').annotate(
+        keep=Min('pk'), copies=Count('pk')
+    ).filter(copies__gt=1)
+    for duplicate in duplicates.iterator():
+        covered.filter(
+            user_id=duplicate['user_id'],
+            milestone_type=duplicate['milestone_type'],
+            score_threshold=duplicate['score_threshold'],
+        ).exclude(pk=duplicate['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_alter_gamedifficultyrating_unique_together_and_more'),
+        ('rankings', '0002_leaderboard_indexes'),
+        ('trophies', '0006_trophy_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_milestones, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='trophymilestone',
+            constraint=models.UniqueConstraint(condition=models.Q(('achieved', True), ('score_threshold__isnull', False), models.Q(('milestone_type', 'custom'), _negated=True)), fields=('user', 'milestone_type', 'score_threshold'), name='rankings_milestone_unique_threshold'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rankings', '0003_milestone_unique_threshold'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilestoneCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platinums', models.IntegerField(default=0)),
+                ('souls_like_platinums', models.IntegerField(default=0)),
+                ('ultra_rares', models.IntegerField(default=0)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='milestone_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'rankings_milestonecounter',
+            },
+        ),
+    ]
@@ -0,0 +1,317 @@
+# rankings/milestones.py
+"""
+Rule-based milestone detection
+
+Each MilestoneRule awards a TrophyMilestone whenever one of the user's
+counters reaches a threshold. Rules are driven by the trophy event
+stream (trophies.events): for a batch of newly earned trophies only the
+rules whose inputs the batch touched are evaluated - a bronze in an
+easy game never looks at platinum or souls-like counts.
+
+Counts live in MilestoneCounter, one row per user, and each event steps
+them once: the row records the newest event it has counted, and only
+the event consumer saves what a batch added. A user's row is counted
+from their trophies the first time they're evaluated, and again by
+backfill_milestones(). The milestone is dated by the event that took
+the count over the threshold; the user's Nth trophy is only looked up
+when the batch didn't include it. New milestones go out in one
+bulk_create per batch, with the users' counters locked so two
+evaluations of the same user take turns; the
+rankings_milestone_unique_threshold constraint makes re-evaluating the
+same events harmless.
+
+- evaluate_events() is the 'milestones' consumer of the event stream.
+- evaluate_user() runs right after a sync, ahead of the settle window.
+- backfill_milestones() recounts and evaluates every rule for the given users.
+
+speed_demon and custom milestones are still awarded by hand.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+from games.models import Game
+from trophies.events import consume, get_cursor
+from trophies.models import Trophy, TrophyEvent, UserTrophy
+from trophy_tracker import metrics
+from users.models import User
+from .models import MilestoneCounter, TrophyMilestone
+
+logger = logging.getLogger(__name__)
+
+CONSUMER = 'milestones'
+CHUNK_SIZE = 500
+ULTRA_RARE = 4
+
+USER_FIELDS = ['id', 'current_trophy_level']
+
+# Rule inputs counted in MilestoneCounter: the field, and the earned trophies it counts
+COUNTERS = {
+    'platinum': ('platinums', Q(trophy__trophy_type='platinum')),
+    'souls_like_platinum': (
+        'souls_like_platinums', Q(trophy__trophy_type='platinum', trophy__game__difficulty_category='souls_like'),
+    ),
+    'ultra_rare': ('ultra_rares', Q(trophy__rarity_level=ULTRA_RARE)),
+}
+
+
+class MilestoneRule:
+    """
+    A milestone awarded each time the user's count of input reaches one
+    of thresholds - a MilestoneCounter field, or counter(user) for inputs
+    that aren't counted there
+    """
+    
+    def __init__(self, milestone_type, input, thresholds, title, description, icon_class='fas fa-trophy',
+                 counter=None):
+        self.milestone_type = milestone_type
+        self.input = input
+        self.thresholds = thresholds
+        self.title = title
+        self.description = description
+        self.icon_class = icon_class
+        self.counter = counter
+    
+    def count(self, user, counts: MilestoneCounter) -> int:
+        if self.input in COUNTERS:
+            return getattr(counts, COUNTERS[self.input][0])
+        return self.counter(user)
+    
+    def milestone(self, user, threshold: int, event: TrophyEvent = None, latest=None) -> TrophyMilestone:
+        """The milestone for threshold, dated by the event that reached it when there is one"""
+        achieved_date, trophy_id, game_id = latest or timezone.now(), None, None
+        if event is not None:
+            achieved_date, trophy_id, game_id = event.earned_datetime, event.trophy_id, event.game_id
+        elif self.input in COUNTERS:
+            # The user's Nth counted trophy
+            rows = list(UserTrophy.objects.filter(user=user, earned=True).filter(COUNTERS[self.input][1]).order_by(
+                'earned_datetime', 'pk'
+            ).values_list('earned_datetime', 'trophy_id', 'trophy__game_id')[threshold - 1:threshold])
+            if rows:
+                achieved_date, trophy_id, game_id = rows[0]
+                achieved_date = achieved_date or latest or timezone.now()
+        
+        text = {'threshold': threshold, 's': '' if threshold == 1 else 's'}
+        return TrophyMilestone(
+            user_id=user.pk,
+            milestone_type=self.milestone_type,
+            title=self.title.format(**text),
+            description=self.description.format(**text),
+            icon_class=self.icon_class,
+            related_game_id=game_id,
+            related_trophy_id=trophy_id,
+            score_threshold=threshold,
+            achieved=True,
+            achieved_date=achieved_date,
+        )
+
+
+RULES = [
+    MilestoneRule(
+        'first_platinum', 'platinum', [1],
+        'First Platinum Trophy', 'Earned your very first platinum trophy!',
+    ),
+    MilestoneRule(
+        '100_platinums', 'platinum', [100],
+        '{threshold} Platinum Trophies', 'Earned {threshold} platinum trophies!', 'fas fa-crown',
+    ),
+    MilestoneRule(
+        'souls_master', 'souls_like_platinum', [1, 5, 10],
+        'Souls-like Master', 'Platinumed {threshold} souls-like game{s}!', 'fas fa-skull',
+    ),
+    MilestoneRule(
+        'rarity_hunter', 'ultra_rare', [1, 10, 50],
+        'Ultra Rare Hunter', 'Ultra rare trophies earned: {threshold}', 'fas fa-gem',
+    ),
+    MilestoneRule(
+        'level_milestone', 'points', [5, 10, 15, 20],
+        'Level {threshold} Achieved', 'Reached Trophy Level {threshold}!', 'fas fa-level-up-alt',
+        counter=lambda user: user.current_trophy_level,
+    ),
+]
+
+ALL_INPUTS = frozenset(rule.input for rule in RULES)
+
+
+def classify_events(events: Iterable[TrophyEvent]) -> List[Tuple[TrophyEvent, Set[str]]]:
+    """Each event with the rule inputs it changed"""
+    events = list(events)
+    categories = dict(Game.objects.filter(
+        pk__in={event.game_id for event in events if event.trophy_type == 'platinum'}
+    ).values_list('pk', 'difficulty_category'))
+    ultra_rare = set(Trophy.objects.filter(
+        pk__in={event.trophy_id for event in events}, rarity_level=ULTRA_RARE
+    ).values_list('pk', flat=True))
+    
+    classified = []
+    for event in events:
+        changed = set()
+        if event.points:
+            changed.add('points')
+        if event.trophy_type == 'platinum':
+            changed.add('platinum')
+            if categories.get(event.game_id) == 'souls_like':
+                changed.add('souls_like_platinum')
+        if event.trophy_id in ultra_rare:
+            changed.add('ultra_rare')
+        classified.append((event, changed))
+    return classified
+
+
+def count_trophies(user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """MilestoneCounter values worked out from the users' earned trophies"""
+    counts = {
+        row.pop('user_id'): row
+        for row in UserTrophy.objects.filter(user_id__in=user_ids, earned=True).order_by().values('user_id').annotate(
+            **{field: Count('pk', filter=trophies) for field, trophies in COUNTERS.values()}
+        )
+    }
+    # Read after the counts: an event landing in between goes uncounted rather than counted twice
+    last_events = dict(TrophyEvent.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(
+        last=Max('pk')
+    ).values_list('user_id', 'last'))
+    return {
+        user_id: {**counts.get(user_id, {}), 'last_event_id': last_events.get(user_id, 0)}
+        for user_id in user_ids
+    }
+
+
+def lock_counters(user_ids: List[int], recount: bool = False) -> Dict[int, MilestoneCounter]:
+    """
+    The users' MilestoneCounter rows, locked until the transaction ends.
+    Missing rows are counted from the users' trophies first; with
+    recount every row is.
+    """
+    missing = set(user_ids) - set(MilestoneCounter.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    if missing:
+        MilestoneCounter.objects.bulk_create([
+            MilestoneCounter(user_id=user_id, **counts) for user_id, counts in count_trophies(sorted(missing)).items()
+        ], ignore_conflicts=True)
+    
+    # In user order, so evaluations with overlapping users lock without deadlocking
+    counters = {
+        counter.user_id: counter
+        for counter in MilestoneCounter.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id')
+    }
+    if recount:
+        for user_id, counts in count_trophies(user_ids).items():
+            for field, value in counts.items():
+                setattr(counters[user_id], field, value)
+        MilestoneCounter.objects.bulk_update(counters.values(), ['last_event_id', *(f for f, _ in COUNTERS.values())])
+    return counters
+
+
+def award(inputs: Dict[int, Set[str]], latest: Dict[int, object] = None,
+          steps: Dict[int, List[Tuple[TrophyEvent, Set[str]]]] = None, save_counts: bool = False,
+          recount: bool = False) -> List[TrophyMilestone]:
+    """
+    Evaluate the rules whose inputs changed for each user and bulk-create
+    the milestones they've newly reached. latest maps user id to the
+    newest earned date in the batch (the date for undated milestones);
+    steps maps user id to the batch's classified events in id order,
+    which step the user's counters and date what they reach. The stepped
+    counts are saved with save_counts, and recounted from scratch first
+    with recount. Returns the milestones inserted.
+    """
+    latest = latest or {}
+    steps = steps or {}
+    awarded = []
+    user_ids = sorted(user_id for user_id, changed in inputs.items() if changed)
+    for start in range(0, len(user_ids), CHUNK_SIZE):
+        chunk = user_ids[start:start + CHUNK_SIZE]
+        with transaction.atomic():
+            counters = lock_counters(chunk, recount)
+            # Read under the counter locks, so no other evaluation adds to it before the insert
+            existing = set(TrophyMilestone.objects.filter(
+                user_id__in=chunk, achieved=True, score_threshold__isnull=False
+            ).exclude(milestone_type='custom').values_list('user_id', 'milestone_type', 'score_threshold'))
+            
+            milestones = []
+            stepped = []
+            for user in User.objects.filter(pk__in=chunk).only(*USER_FIELDS):
+                counts = counters[user.pk]
+                counted = counts.last_event_id
+                reached = {}
+                for event, changed in steps.get(user.pk, []):
+                    if event.pk <= counts.last_event_id:
+                        continue
+                    for name in changed & COUNTERS.keys():
+                        field = COUNTERS[name][0]
+                        setattr(counts, field, getattr(counts, field) + 1)
+                        reached[name, getattr(counts, field)] = event
+                    counts.last_event_id = event.pk
+                if counts.last_event_id != counted:
+                    stepped.append(counts)
+                
+                for rule in RULES:
+                    if rule.input not in inputs[user.pk]:
+                        continue
+                    pending = [
+                        threshold for threshold in rule.thresholds
+                        if (user.pk, rule.milestone_type, threshold) not in existing
+                    ]
+                    if not pending:
+                        continue
+                    count = rule.count(user, counts)
+                    milestones.extend(
+                        rule.milestone(user, threshold, reached.get((rule.input, threshold)), latest.get(user.pk))
+                        for threshold in pending if count >= threshold
+                    )
+            
+            if save_counts and stepped:
+                MilestoneCounter.objects.bulk_update(
+                    stepped, ['last_event_id', *(field for field, _ in COUNTERS.values())], batch_size=CHUNK_SIZE
+                )
+            TrophyMilestone.objects.bulk_create(milestones, batch_size=CHUNK_SIZE, ignore_conflicts=True)
+        awarded.extend(milestones)
+    
+    if awarded:
+        metrics.increment('milestones_awarded', len(awarded))
+        logger.info(f"🏅 Awarded {len(awarded)} milestones to {len({m.user_id for m in awarded})} users")
+    return awarded
+
+
+def evaluate_events(events: List[TrophyEvent], save_counts: bool = True) -> List[TrophyMilestone]:
+    """Event stream handler: award what a batch of newly earned trophies unlocked"""
+    inputs, latest, steps = {}, {}, {}
+    for event, changed in classify_events(events):
+        inputs.setdefault(event.user_id, set()).update(changed)
+        steps.setdefault(event.user_id, []).append((event, changed))
+        if event.user_id not in latest or event.earned_datetime > latest[event.user_id]:
+            latest[event.user_id] = event.earned_datetime
+    return award(inputs, latest, steps, save_counts)
+
+
+def process_events(batch_size: int = 1000, max_batches: int = None) -> int:
+    """Consume settled events since the last run; returns events handled"""
+    return consume(CONSUMER, evaluate_events, batch_size=batch_size, max_batches=max_batches)
+
+
+def evaluate_user(user_id: int) -> List[TrophyMilestone]:
+    """
+    Evaluate the user's events the consumer hasn't reached yet, including
+    ones still inside the settle window - so milestones show up as soon
+    as a sync finishes. The counts they add aren't saved: the consumer
+    steps the counters when it reaches these events, and finds nothing
+    left to award.
+    """
+    events = list(TrophyEvent.objects.filter(user_id=user_id, pk__gt=get_cursor(CONSUMER).position))
+    if not events:
+        return []
+    return evaluate_events(events, save_counts=False)
+
+
+def backfill_milestones(user_ids: Iterable[int]) -> List[TrophyMilestone]:
+    """Recount and evaluate every rule for the users, dating undated milestones by their last trophy"""
+    user_ids = sorted(set(user_ids))
+    latest = {}
+    for start in range(0, len(user_ids), CHUNK_SIZE):
+        latest.update(UserTrophy.objects.filter(
+            user_id__in=user_ids[start:start + CHUNK_SIZE], earned=True
+        ).values('user_id').annotate(latest=Max('earned_datetime')).values_list('user_id', 'latest'))
+    return award({user_id: set(ALL_INPUTS) for user_id in user_ids}, latest, recount=True)
+
+
+metrics.describe('milestones_awarded', 'counter', 'Trophy milestones awarded by the rule engine')
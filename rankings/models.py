@@ -65,6 +65,9 @@ class UserRanking(models.Model):
         db_table = 'rankings_userranking'
         unique_together = ['user', 'ranking_period']
         ordering = ['global_rank']
+        indexes = [
+            models.Index(fields=['ranking_period', 'global_rank', 'id'], name='rankings_period_rank_idx'),
+        ]
 
 class TrophyMilestone(models.Model):
     """Track special achievements and milestones"""
@@ -106,3 +109,30 @@ class TrophyMilestone(models.Model):
     class Meta:
         db_table = 'rankings_trophymilestone'
         ordering = ['-achieved_date', '-created_at']
+        constraints = [
+            # One rule milestone per user, type and threshold (see rankings.milestones)
+            models.UniqueConstraint(
+                fields=['user', 'milestone_type', 'score_threshold'],
+                condition=models.Q(achieved=True, score_threshold__isnull=False) & ~models.Q(milestone_type='custom'),
+                name='rankings_milestone_unique_threshold',
+            ),
+        ]
+
+class MilestoneCounter(models.Model):
+    """
+    Per-user counts the milestone rules compare with their thresholds,
+    stepped by the trophy event stream (see rankings.milestones) so a
+    batch of events never recounts the user's trophies
+    """
+    
+    user = models.OneToOneField('users.User', on_delete=models.CASCADE, related_name='milestone_counter')
+    platinums = models.IntegerField(default=0)
+    souls_like_platinums = models.IntegerField(default=0)
+    ultra_rares = models.IntegerField(default=0)
+    last_event_id = models.BigIntegerField(default=0)  # newest TrophyEvent counted
+    
+    def __str__(self):
+        return f"Milestone counters for user {self.user_id} @ {self.last_event_id}"
+    
+    class Meta:
+        db_table = 'rankings_milestonecounter'
@@ -0,0 +1,17 @@
+# rankings/signals.py
+from django.dispatch import receiver
+import logging
+from psn_integration.signals import sync_completed
+from .milestones import evaluate_user
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(sync_completed)
+def award_milestones_after_sync(sender, sync_job, **kwargs):
+    """Counters are fresh once a sync completes, so milestones can be awarded straight away"""
+    try:
+        evaluate_user(sync_job.user_id)
+    except Exception as e:
+        # The 'milestones' event consumer picks these events up again later
+        logger.error(f"❌ Milestone evaluation failed for user {sync_job.user_id}: {e}")
@@ -1,3 +1,115 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from games.models import Game
+from psn_integration.models import PSNSyncJob
+from trophies.events import get_cursor, record_earned
+from trophies.models import Trophy, TrophyEvent, UserGameProgress, UserTrophy
+from trophies.scoring import recompute_scores
+from .milestones import CONSUMER, ULTRA_RARE, backfill_milestones, evaluate_user, process_events
+from .models import MilestoneCounter, TrophyMilestone
 
-# Create your tests here.
+User = get_user_model()
+
+
+class MilestoneEngineTests(TestCase):
+    """Trophy events drive milestone awards, each awarded once"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(
+            np_communication_id='NPWR00400_00', title='Souls', difficulty_category='souls_like', difficulty_multiplier=6.0
+        )
+        cls.platinum = Trophy.objects.create(
+            game=cls.game, trophy_id=0, name='Platinum', trophy_type='platinum', rarity_level=ULTRA_RARE
+        )
+        cls.bronze = Trophy.objects.create(game=cls.game, trophy_id=1, name='Bronze', trophy_type='bronze')
+        cls.user = User.objects.create_user('milestones', psn_id='milestones')
+        UserGameProgress.objects.create(user=cls.user, game=cls.game)
+    
+    def sync(self, trophies, earned_datetime=None):
+        """What a sync does: save earned trophies with their events, refresh counters, complete the job"""
+        user_trophies = []
+        for trophy in trophies:
+            user_trophy, _ = UserTrophy.objects.update_or_create(
+                user=self.user, trophy=trophy,
+                defaults={'earned': True, 'earned_datetime': earned_datetime or timezone.now()},
+            )
+            user_trophies.append(user_trophy)
+        record_earned(user_trophies)
+        recompute_scores([self.user.pk])
+        PSNSyncJob.objects.create(user=self.user).mark_completed()
+    
+    def awarded(self):
+        return sorted(TrophyMilestone.objects.filter(user=self.user).values_list('milestone_type', 'score_threshold'))
+    
+    def test_sync_awards_milestones(self):
+        self.sync([self.bronze])
+        self.assertEqual(self.awarded(), [])
+        
+        earned = timezone.now() - timedelta(days=1)
+        self.sync([self.platinum], earned_datetime=earned)
+        self.assertEqual(self.awarded(), [('first_platinum', 1), ('rarity_hunter', 1), ('souls_master', 1)])
+        
+        milestone = TrophyMilestone.objects.get(user=self.user, milestone_type='first_platinum')
+        self.assertTrue(milestone.achieved)
+        self.assertEqual((milestone.related_trophy, milestone.related_game), (self.platinum, self.game))
+        self.assertEqual(milestone.achieved_date, earned)
+    
+    @override_settings(TROPHY_EVENT_SETTLE_SECONDS=0)
+    def test_resync_adds_no_duplicates(self):
+        self.sync([self.platinum, self.bronze])
+        awarded = self.awarded()
+        self.assertEqual(len(awarded), 3)
+        
+        # The same trophies again, then the consumer catching up on every event
+        self.sync([self.platinum, self.bronze])
+        self.assertEqual(evaluate_user(self.user.pk), [])
+        self.assertEqual(process_events(), 4)
+        self.assertEqual(process_events(), 0)
+        
+        self.assertEqual(self.awarded(), awarded)
+        self.assertEqual(evaluate_user(self.user.pk), [])
+        self.assertGreater(get_cursor(CONSUMER).position, 0)
+    
+    @override_settings(TROPHY_EVENT_SETTLE_SECONDS=0)
+    def test_counters_step_once_per_event(self):
+        rares = [
+            Trophy.objects.create(game=self.game, trophy_id=10 + i, name=f'Rare {i}', trophy_type='gold', rarity_level=ULTRA_RARE)
+            for i in range(10)
+        ]
+        self.sync(rares[:9])
+        self.assertEqual(self.awarded(), [('rarity_hunter', 1)])
+        
+        # The tenth is counted from its event, without recounting the user's trophies
+        earned = timezone.now() - timedelta(hours=2)
+        record_earned([UserTrophy.objects.create(user=self.user, trophy=rares[9], earned=True, earned_datetime=earned)])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(evaluate_user(self.user.pk)), 1)
+        self.assertFalse([query['sql'] for query in queries if 'trophies_usertrophy' in query['sql']])
+        self.assertEqual(self.awarded(), [('rarity_hunter', 1), ('rarity_hunter', 10)])
+        milestone = TrophyMilestone.objects.get(user=self.user, milestone_type='rarity_hunter', score_threshold=10)
+        self.assertEqual((milestone.achieved_date, milestone.related_trophy), (earned, rares[9]))
+        
+        # evaluate_user leaves the step to the consumer, which takes it once
+        self.assertEqual(MilestoneCounter.objects.get(user=self.user).ultra_rares, 9)
+        process_events()
+        process_events()
+        counter = MilestoneCounter.objects.get(user=self.user)
+        self.assertEqual(counter.ultra_rares, 10)
+        self.assertEqual(counter.last_event_id, TrophyEvent.objects.latest('pk').pk)
+    
+    def test_backfill_evaluates_every_rule(self):
+        UserTrophy.objects.create(user=self.user, trophy=self.platinum, earned=True, earned_datetime=timezone.now())
+        recompute_scores([self.user.pk])
+        User.objects.filter(pk=self.user.pk).update(current_trophy_level=11)
+        
+        backfill_milestones([self.user.pk])
+        self.assertEqual(self.awarded(), [
+            ('first_platinum', 1), ('level_milestone', 5), ('level_milestone', 10),
+            ('rarity_hunter', 1), ('souls_master', 1),
+        ])
+        self.assertEqual(backfill_milestones([self.user.pk]), [])
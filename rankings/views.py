@@ -1,8 +1,23 @@
 from django.shortcuts import render
 from django.http import HttpResponse
+from django.db.models import Max
+from trophy_tracker.conditional import conditional_view, timestamp_token
+from trophy_tracker.db_router import replica_reads
+from .models import RankingPeriod
 
+def rankings_validators(request, *args, **kwargs):
+    """Rankings only change when a ranking period is (re)calculated"""
+    last_calculated = RankingPeriod.objects.aggregate(last=Max('calculation_date'))['last']
+    if last_calculated is None:
+        return None
+    return f"rankings-{timestamp_token(last_calculated)}", last_calculated
+
+@replica_reads
+@conditional_view('global_rankings', rankings_validators)
 def global_rankings(request):
     return HttpResponse("Global rankings - Coming soon!")
 
+@replica_reads
+@conditional_view('leaderboards_overview', rankings_validators)
 def leaderboards_overview(request):
-    return HttpResponse("Leaderboards - Coming soon!")
\ No newline at end of file
+    return HttpResponse("Leaderboards - Coming soon!")
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+    
+    def ready(self):
+        from .backends import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self)
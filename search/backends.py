@@ -0,0 +1,175 @@
+# search/backends.py
+"""
+Ranked search and prefix autocomplete over games and trophies
+
+Each function returns ids in rank order, using the vendor's index
+(tsvector/trigram GIN on PostgreSQL, FTS5 on SQLite) and falling back
+to icontains where neither exists. Queries run on the connection the
+router picks for reads, so replica_reads views search a replica.
+"""
+
+from django.db import connections, router
+from django.db.models import Q
+import re
+from typing import List, Tuple
+from games.models import Game
+from trophies.models import Trophy
+from search import schema
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Cap on ids fed into admin changelist filters
+ADMIN_RESULT_LIMIT = 1000
+
+# kind -> (model, table, tsvector expression, fts table, autocomplete column, fallback fields)
+TARGETS = {
+    'games': (
+        Game, 'games_game',
+        "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(publisher, ''))",
+        'search_game_fts', 'title', ['title', 'publisher'],
+    ),
+    'trophies': (
+        Trophy, 'trophies_trophy',
+        "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))",
+        'search_trophy_fts', 'name', ['name', 'description'],
+    ),
+}
+
+_fts5_available = {}
+
+
+def read_connection(model):
+    """Connection the database router picks for reading model"""
+    return connections[router.db_for_read(model)]
+
+
+def tokenize(query: str) -> List[str]:
+    """Words of a user query (punctuation and FTS syntax dropped)"""
+    return TOKEN_PATTERN.findall(query or '')[:10]
+
+
+def use_fts5(connection) -> bool:
+    """SQLite with FTS5 tables in place"""
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _fts5_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_game_fts'")
+            _fts5_available[connection.alias] = cursor.fetchone() is not None
+    return _fts5_available[connection.alias]
+
+
+def search_ids(kind: str, query: str, limit: int = 20, prefix: bool = False) -> List[Tuple[int, float]]:
+    """
+    (id, rank) pairs of the best matches, best first; every word must
+    match, and with prefix=True the last word may be a prefix
+    """
+    model, table, tsvector, fts_table, _, fallback_fields = TARGETS[kind]
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    connection = read_connection(model)
+    
+    if connection.vendor == 'postgresql':
+        terms = [f"{token}:*" if prefix and index == len(tokens) - 1 else token for index, token in enumerate(tokens)]
+        sql = (
+            f"SELECT id, ts_rank({tsvector}, query) AS rank "
+            f"FROM {table}, to_tsquery('english', %s) query "
+            f"WHERE {tsvector} @@ query ORDER BY rank DESC, id LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [' & '.join(terms), limit])
+            return cursor.fetchall()
+    
+    if use_fts5(connection):
+        terms = ['"' + token.replace('"', '""') + '"' for token in tokens]
+        if prefix:
+            terms[-1] += '*'
+        # bm25() is lower-is-better; negate so higher rank means better everywhere
+        sql = (
+            f"SELECT rowid, -bm25({fts_table}) AS rank FROM {fts_table} "
+            f"WHERE {fts_table} MATCH %s ORDER BY bm25({fts_table}), rowid LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [' '.join(terms), limit])
+            return cursor.fetchall()
+    
+    # No search index on this database - table scan
+    condition = Q()
+    for token in tokens:
+        token_condition = Q()
+        for field in fallback_fields:
+            token_condition |= Q(**{f"{field}__icontains": token})
+        condition &= token_condition
+    return [(pk, 0.0) for pk in model.objects.filter(condition).values_list('pk', flat=True)[:limit]]
+
+
+def autocomplete_ids(kind: str, prefix: str, limit: int = 10) -> List[int]:
+    """Ids whose title/name starts with (or contains a word starting with) prefix"""
+    model, table, _, fts_table, column, _ = TARGETS[kind]
+    prefix = (prefix or '').strip()
+    if len(prefix) < 2:
+        return []
+    connection = read_connection(model)
+    
+    if connection.vendor == 'postgresql':
+        # ILIKE 'prefix%' is served by the trigram GIN index
+        sql = (
+            f"SELECT id FROM {table} WHERE {column} ILIKE %s "
+            f"ORDER BY similarity({column}, %s) DESC, length({column}), id LIMIT %s"
+        )
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [f"{escaped}%", prefix, limit])
+            ids = [row[0] for row in cursor.fetchall()]
+        if len(ids) >= limit:
+            return ids
+        # Top up with word-prefix matches anywhere in the title/name
+        more = [pk for pk, _ in search_ids(kind, prefix, limit=limit * 2, prefix=True) if pk not in ids]
+        return ids + more[:limit - len(ids)]
+    
+    if use_fts5(connection):
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        terms = ['"' + token.replace('"', '""') + '"' for token in tokens]
+        terms[-1] += '*'
+        sql = (
+            f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s "
+            f"ORDER BY bm25({fts_table}), rowid LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [f"{column} : ({' '.join(terms)})", limit])
+            return [row[0] for row in cursor.fetchall()]
+    
+    return list(model.objects.filter(**{f"{column}__istartswith": prefix}).values_list('pk', flat=True)[:limit])
+
+
+def load_in_order(kind: str, ids: List[int], queryset=None) -> list:
+    """Fetch objects for ids in one query, keeping the rank order"""
+    model = TARGETS[kind][0]
+    objects = (queryset if queryset is not None else model.objects.all()).in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def search(kind: str, query: str, limit: int = 20) -> list:
+    """Ranked objects matching query"""
+    ids = [pk for pk, _ in search_ids(kind, query, limit=limit, prefix=True)]
+    queryset = Trophy.objects.select_related('game') if kind == 'trophies' else None
+    return load_in_order(kind, ids, queryset)
+
+
+def ensure_search_index(using=None, **kwargs):
+    """
+    post_migrate hook: recreate the SQLite FTS triggers (and rebuild the
+    FTS tables) if a table rebuild in a later migration dropped them
+    """
+    db = connections[using or 'default']
+    if db.vendor != 'sqlite' or not schema.sqlite_has_fts5(db):
+        return
+    if not schema.sqlite_triggers_missing(db):
+        return
+    with db.cursor() as cursor:
+        for statement in schema.sqlite_forward_statements():
+            cursor.execute(statement)
+    _fts5_available.pop(db.alias, None)
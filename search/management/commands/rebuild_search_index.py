@@ -0,0 +1,33 @@
+# search/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+from search import schema
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recreate the search index triggers and rebuild the full-text index'
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        
+        if connection.vendor == 'postgresql':
+            # GIN expression indexes are maintained by PostgreSQL itself
+            with connection.cursor() as cursor:
+                for statement in schema.POSTGRES_FORWARD:
+                    cursor.execute(statement)
+                cursor.execute("REINDEX INDEX search_game_tsv_idx")
+                cursor.execute("REINDEX INDEX search_trophy_tsv_idx")
+        elif connection.vendor == 'sqlite' and schema.sqlite_has_fts5(connection):
+            with connection.cursor() as cursor:
+                for statement in schema.sqlite_forward_statements():
+                    cursor.execute(statement)
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ No search index support on {connection.vendor}; search uses icontains"
+            ))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Search index rebuilt on {connection.vendor} in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,33 @@
+# Full-text and trigram search indexes over games and trophies (see search.schema)
+
+from django.db import migrations
+from search import schema
+
+
+def run_for_vendor(postgres_statements, sqlite_statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            statements = postgres_statements
+        elif vendor == 'sqlite' and schema.sqlite_has_fts5(schema_editor.connection):
+            statements = sqlite_statements
+        else:
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_alter_gamedifficultyrating_unique_together_and_more'),
+        ('trophies', '0001_initial'),
+    ]
+    
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(schema.POSTGRES_FORWARD, schema.sqlite_forward_statements()),
+            run_for_vendor(schema.POSTGRES_BACKWARD, schema.sqlite_backward_statements()),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# search/schema.py
+"""
+Database-side search index definitions, per vendor
+
+PostgreSQL: GIN indexes on tsvector expressions (ranked search, prefix
+matching) and pg_trgm GIN indexes on titles/names (autocomplete).
+SQLite: external-content FTS5 tables kept in sync by triggers.
+Other databases get nothing and search falls back to icontains.
+"""
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS search_game_tsv_idx ON games_game USING GIN "
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(publisher, '')))",
+    "CREATE INDEX IF NOT EXISTS search_trophy_tsv_idx ON trophies_trophy USING GIN "
+    "(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))",
+    "CREATE INDEX IF NOT EXISTS search_game_title_trgm_idx ON games_game USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS search_trophy_name_trgm_idx ON trophies_trophy USING GIN (name gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS search_game_tsv_idx",
+    "DROP INDEX IF EXISTS search_trophy_tsv_idx",
+    "DROP INDEX IF EXISTS search_game_title_trgm_idx",
+    "DROP INDEX IF EXISTS search_trophy_name_trgm_idx",
+]
+
+# (fts table, content table, indexed columns)
+SQLITE_FTS_TABLES = [
+    ('search_game_fts', 'games_game', ['title', 'publisher']),
+    ('search_trophy_fts', 'trophies_trophy', ['name', 'description']),
+]
+
+
+def sqlite_forward_statements():
+    statements = []
+    for fts_table, content_table, columns in SQLITE_FTS_TABLES:
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        statements += [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+            f"{column_list}, content='{content_table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {content_table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+            f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+        ]
+    return statements
+
+
+def sqlite_backward_statements():
+    statements = []
+    for fts_table, content_table, columns in SQLITE_FTS_TABLES:
+        statements += [
+            f"DROP TRIGGER IF EXISTS {fts_table}_ai",
+            f"DROP TRIGGER IF EXISTS {fts_table}_ad",
+            f"DROP TRIGGER IF EXISTS {fts_table}_au",
+            f"DROP TABLE IF EXISTS {fts_table}",
+        ]
+    return statements
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Some builds ship FTS5 as a loadable default without the compile option
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.search_fts5_probe USING fts5(probe)")
+            cursor.execute("DROP TABLE temp.search_fts5_probe")
+            return True
+        except Exception:
+            return False
+
+
+def sqlite_triggers_missing(connection):
+    """
+    True if any FTS sync trigger is gone - SQLite table rebuilds in later
+    migrations drop the triggers of the rebuilt table
+    """
+    expected = {f"{fts_table}_{suffix}" for fts_table, _, _ in SQLITE_FTS_TABLES for suffix in ('ai', 'ad', 'au')}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+    return not expected <= existing
+
@@ -0,0 +1,67 @@
+# search/views.py
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from trophy_tracker.db_router import replica_reads
+from . import backends
+
+MAX_LIMIT = 50
+
+
+def _limit(request, default):
+    try:
+        return max(1, min(int(request.GET.get('limit', default)), MAX_LIMIT))
+    except ValueError:
+        return default
+
+
+def _serialize(kind, obj):
+    if kind == 'games':
+        return {
+            'id': obj.pk,
+            'title': obj.title,
+            'publisher': obj.publisher,
+            'platform': obj.platform,
+            'icon_url': obj.icon_url,
+        }
+    return {
+        'id': obj.pk,
+        'name': obj.name,
+        'description': obj.description,
+        'trophy_type': obj.trophy_type,
+        'game_id': obj.game_id,
+        'game_title': obj.game.title,
+    }
+
+
+@replica_reads
+@require_GET
+def search(request):
+    """Ranked search: ?q=<words>&type=games|trophies&limit=<n>"""
+    kind = request.GET.get('type', 'games')
+    if kind not in backends.TARGETS:
+        return JsonResponse({'error': 'type must be games or trophies'}, status=400)
+    
+    query = request.GET.get('q', '')
+    results = backends.search(kind, query, limit=_limit(request, 20))
+    return JsonResponse({
+        'query': query,
+        'type': kind,
+        'results': [_serialize(kind, obj) for obj in results],
+    })
+
+
+@replica_reads
+@require_GET
+def autocomplete(request):
+    """Title/name suggestions for a prefix: ?q=<prefix>&type=games|trophies"""
+    kind = request.GET.get('type', 'games')
+    if kind not in backends.TARGETS:
+        return JsonResponse({'error': 'type must be games or trophies'}, status=400)
+    
+    column = backends.TARGETS[kind][4]
+    ids = backends.autocomplete_ids(kind, request.GET.get('q', ''), limit=_limit(request, 10))
+    model = backends.TARGETS[kind][0]
+    labels = dict(model.objects.filter(pk__in=ids).values_list('pk', column))
+    return JsonResponse({
+        'suggestions': [{'id': pk, 'label': labels[pk]} for pk in ids if pk in labels],
+    })
@@ -1,7 +1,12 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, Q, Value, When
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Trophy, UserTrophy, UserGameProgress
+from .models import BulkAdminJob, EventCursor, Trophy, UserTrophy, UserGameProgress
+from .admin_jobs import queued_message, run_or_queue
+from .events import lag_expression
+from search.backends import ADMIN_RESULT_LIMIT, search_ids
 
 class UserTrophyInline(admin.TabularInline):
     """Inline admin for user trophies"""
@@ -9,6 +14,10 @@ class UserTrophyInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['calculate_points_display', 'synced_at']
     fields = ['user', 'earned', 'earned_datetime', 'progress_value', 'calculate_points_display']
+    raw_id_fields = ['user']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'trophy')
     
     def calculate_points_display(self, obj):
         """Display points for this trophy"""
@@ -33,6 +42,7 @@ class TrophyAdmin(admin.ModelAdmin):
     ]
     
     search_fields = ['name', 'description', 'game__title']
+    list_select_related = ['game']
     
     readonly_fields = [
         'trophy_id', 'get_score_display', 'created_at', 'updated_at'
@@ -68,6 +78,14 @@ class TrophyAdmin(admin.ModelAdmin):
     
     inlines = [UserTrophyInline]
     
+    def get_search_results(self, request, queryset, search_term):
+        """Search trophy text and game titles through the full-text index"""
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        trophy_ids = [pk for pk, _ in search_ids('trophies', search_term, limit=ADMIN_RESULT_LIMIT, prefix=True)]
+        game_ids = [pk for pk, _ in search_ids('games', search_term, limit=ADMIN_RESULT_LIMIT, prefix=True)]
+        return queryset.filter(Q(pk__in=trophy_ids) | Q(game_id__in=game_ids)), False
+    
     def get_trophy_type_display(self, obj):
         """Display trophy type with icon"""
         icons = {
@@ -87,8 +105,8 @@ class TrophyAdmin(admin.ModelAdmin):
         multiplier = obj.game.difficulty_multiplier
         
         return format_html(
-            '<span title="Base: {} × Multiplier: {:.1f}">{} points</span>',
-            base_points, multiplier, total_score
+            '<span title="Base: {} × Multiplier: {}">{} points</span>',
+            base_points, f"{multiplier:.1f}", total_score
         )
     get_score_display.short_description = 'Score'
     
@@ -106,8 +124,8 @@ class TrophyAdmin(admin.ModelAdmin):
         
         if obj.earn_rate:
             return format_html(
-                '<span style="color: {}; font-weight: bold;">{} ({:.1f}%)</span>',
-                color, rarity_name, obj.earn_rate
+                '<span style="color: {}; font-weight: bold;">{} ({}%)</span>',
+                color, rarity_name, f"{obj.earn_rate:.1f}"
             )
         return format_html(
             '<span style="color: {}; font-weight: bold;">{}</span>',
@@ -134,6 +152,17 @@ class UserTrophyAdmin(admin.ModelAdmin):
     ]
     
     readonly_fields = ['get_points_display', 'synced_at', 'created_at']
+    raw_id_fields = ['user', 'trophy']
+    # __str__ (the action checkbox label) needs the user and trophy names
+    list_select_related = ['user', 'trophy']
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Game title and points come with each row, without loading the game"""
+        return super().get_queryset(request).annotate(
+            game_title=F('trophy__game__title'),
+            points_earned=Case(When(earned=True, then=F('trophy__points')), default=Value(0)),
+        )
     
     def get_trophy_info(self, obj):
         """Display trophy and game information"""
@@ -142,13 +171,13 @@ class UserTrophyAdmin(admin.ModelAdmin):
         
         return format_html(
             '{} {} - <small>{}</small>',
-            icon, obj.trophy.name, obj.trophy.game.title
+            icon, obj.trophy.name, obj.game_title
         )
     get_trophy_info.short_description = 'Trophy'
     
     def get_points_display(self, obj):
         """Display points earned"""
-        points = obj.calculate_points_earned()
+        points = obj.points_earned
         if points > 0:
             return format_html('<span style="color: #28a745; font-weight: bold;">{} pts</span>', points)
         return format_html('<span style="color: #6c757d;">0 pts</span>')
@@ -169,6 +198,8 @@ class UserGameProgressAdmin(admin.ModelAdmin):
     ]
     
     search_fields = ['user__username', 'game__title']
+    list_select_related = ['user', 'game']
+    show_full_result_count = False
     
     readonly_fields = [
         'total_score_earned', 'max_possible_score', 'started_date',
@@ -225,10 +256,74 @@ class UserGameProgressAdmin(admin.ModelAdmin):
     
     def update_progress(self, request, queryset):
         """Recalculate progress for selected records"""
-        count = 0
-        for progress in queryset:
-            progress.update_progress()
-            count += 1
-        
+        count, changed, job = run_or_queue(request, queryset, 'recalculate_progress')
+        if job:
+            self.message_user(request, queued_message(job))
+            return
         self.message_user(request, f"Updated progress for {count} records.")
     update_progress.short_description = "Recalculate progress statistics"
+    
+    def recalculate_scores(self, request, queryset):
+        """Recalculate total scores and levels of the selected records' users"""
+        users = get_user_model().objects.filter(game_progress__in=queryset).distinct()
+        count, changed, job = run_or_queue(request, users, 'recalculate_user_scores')
+        if job:
+            self.message_user(request, queued_message(job))
+            return
+        self.message_user(request, f"♻️ Recalculated trophy data for {count} users.")
+    recalculate_scores.short_description = "♻️ Recalculate users' trophy scores and levels"
+
+@admin.register(BulkAdminJob)
+class BulkAdminJobAdmin(admin.ModelAdmin):
+    """Progress page for bulk admin actions queued for run_admin_jobs (read-only)"""
+    
+    list_display = [
+        'id', 'action', 'status', 'get_progress_display', 'total', 'changed',
+        'requested_by', 'created_at', 'completed_at'
+    ]
+    list_filter = ['status', 'action', 'created_at']
+    list_select_related = ['requested_by']
+    exclude = ['model_label', 'last_pk']
+    readonly_fields = [
+        'action', 'status', 'get_progress_display', 'total', 'processed', 'changed',
+        'error_message', 'requested_by', 'created_at', 'started_at', 'completed_at'
+    ]
+    actions = ['retry_jobs']
+    
+    def get_progress_display(self, obj):
+        """Display progress as a bar"""
+        percentage = obj.progress_percentage()
+        filled = percentage // 10
+        return format_html(
+            '<span style="font-family: monospace;">{}</span> {}% ({} / {})',
+            '█' * filled + '░' * (10 - filled), percentage, obj.processed, obj.total
+        )
+    get_progress_display.short_description = 'Progress'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def retry_jobs(self, request, queryset):
+        """Queue failed jobs again; they resume after the last finished chunk"""
+        count = queryset.filter(status='failed').update(status='pending', error_message='')
+        self.message_user(request, f"🔁 Re-queued {count} failed jobs.")
+    retry_jobs.short_description = "🔁 Retry failed jobs"
+
+@admin.register(EventCursor)
+class EventCursorAdmin(admin.ModelAdmin):
+    """Where each trophy event consumer is up to (read-only)"""
+    
+    list_display = ['consumer', 'position', 'events_consumed', 'get_lag_display', 'updated_at']
+    readonly_fields = ['consumer', 'position', 'events_consumed', 'get_lag_display', 'updated_at']
+    
+    def get_queryset(self, request):
+        """Lag computed in the list query"""
+        return super().get_queryset(request).annotate(lag=lag_expression())
+    
+    def get_lag_display(self, obj):
+        return obj.lag
+    get_lag_display.short_description = 'Unconsumed events'
+    get_lag_display.admin_order_field = 'lag'
+    
+    def has_add_permission(self, request):
+        return False
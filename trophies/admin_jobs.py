@@ -0,0 +1,140 @@
+# trophies/admin_jobs.py
+"""
+Set-based admin bulk actions
+
+Each action takes a list of primary keys and works through them with a
+few UPDATE ... SELECT statements per chunk (see trophies.scoring)
+instead of a model method per row. Selections up to
+BULK_ADMIN_INLINE_LIMIT run inside the admin request; larger ones
+(e.g. "select all") become a BulkAdminJob whose pks are staged in
+BulkAdminJobItem rows by one INSERT ... SELECT, never passing through
+the web process. The run_admin_jobs command reads them back in keyset
+batches, recording progress (and the last pk, to resume from) as it goes.
+"""
+
+from django.conf import settings
+from django.db import connection, connections, router, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+from .models import BulkAdminJob, BulkAdminJobItem
+from .scoring import CHUNK_SIZE, recompute_progress_rows, recompute_user_scores
+
+logger = logging.getLogger(__name__)
+
+
+def apply_difficulty_hints(hint_ids: List[int]) -> int:
+    from psn_integration.models import PSNGameDifficultyHint
+    return PSNGameDifficultyHint.apply_to_games(hint_ids)
+
+
+# action name -> function(pks) returning the number of rows it changed
+ACTIONS: Dict[str, Callable[[List[int]], int]] = {
+    'recalculate_user_scores': recompute_user_scores,
+    'recalculate_progress': recompute_progress_rows,
+    'apply_difficulty_hints': apply_difficulty_hints,
+}
+
+
+def run_action(action: str, ids: List[int]) -> int:
+    return ACTIONS[action](ids)
+
+
+def run_or_queue(request, queryset, action: str) -> Tuple[int, Optional[int], Optional[BulkAdminJob]]:
+    """
+    Run action over the selection now, or queue it when the selection is
+    larger than BULK_ADMIN_INLINE_LIMIT. Returns (selected, changed, job);
+    changed is None when queued, job is None when run inline. request is
+    None outside the admin.
+    """
+    limit = settings.BULK_ADMIN_INLINE_LIMIT
+    ids = list(queryset.order_by().values_list('pk', flat=True)[:limit + 1])
+    if len(ids) <= limit:
+        return len(ids), run_action(action, ids), None
+    
+    using = router.db_for_write(BulkAdminJob)
+    with transaction.atomic(using=using):
+        job = BulkAdminJob.objects.using(using).create(
+            action=action,
+            model_label=queryset.model._meta.label,
+            requested_by=request.user if request and request.user.is_authenticated else None,
+        )
+        job.total = stage_selection(job, queryset.using(using))
+        job.save(update_fields=['total'])
+    logger.info(f"⏳ Queued bulk admin job #{job.pk}: {action} over {job.total} objects")
+    return job.total, None, job
+
+
+def stage_selection(job: BulkAdminJob, queryset) -> int:
+    """Copy the selection's pks into the job's items with one INSERT ... SELECT; returns rows staged"""
+    select_sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    db = connections[queryset.db]
+    table = db.ops.quote_name(BulkAdminJobItem._meta.db_table)
+    with db.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (job_id, object_pk) SELECT %s, selection.* FROM ({select_sql}) selection",
+            [job.pk, *params]
+        )
+        return cursor.rowcount
+
+
+def queued_message(job: BulkAdminJob):
+    """Admin message linking to the job's progress page"""
+    url = reverse('admin:trophies_bulkadminjob_change', args=[job.pk])
+    return format_html(
+        '⏳ {} objects queued as <a href="{}">background job #{}</a> - run_admin_jobs will process them.',
+        job.total, url, job.pk
+    )
+
+
+def claim_next_job() -> Optional[BulkAdminJob]:
+    """Mark the oldest pending job running and return it (None when the queue is empty)"""
+    with transaction.atomic():
+        pending = BulkAdminJob.objects.filter(status='pending').order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            # Several runners can work the queue side by side
+            pending = pending.select_for_update(skip_locked=True)
+        job = pending.first()
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_job(job: BulkAdminJob, chunk_size: int = CHUNK_SIZE) -> BulkAdminJob:
+    """Work through the job's selection a chunk at a time in pk order, resuming after the last recorded chunk"""
+    try:
+        selection = job.items.order_by('object_pk').values_list('object_pk', flat=True)
+        while True:
+            chunk = list(selection.filter(object_pk__gt=job.last_pk)[:chunk_size])
+            if not chunk:
+                break
+            job.changed += run_action(job.action, chunk)
+            job.processed += len(chunk)
+            job.last_pk = chunk[-1]
+            job.save(update_fields=['processed', 'changed', 'last_pk'])
+        job.items.all().delete()
+        job.status = 'completed'
+        logger.info(f"✅ Bulk admin job #{job.pk} ({job.action}) done: {job.changed} of {job.processed} changed")
+    except Exception as e:
+        job.status = 'failed'
+        job.error_message = str(e)
+        logger.error(f"❌ Bulk admin job #{job.pk} ({job.action}) failed at {job.processed}/{job.total}: {e}")
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'completed_at'])
+    return job
+
+
+def run_pending_jobs(limit: int = None, chunk_size: int = CHUNK_SIZE) -> List[BulkAdminJob]:
+    """Run queued jobs oldest first until the queue is empty (or limit jobs have run)"""
+    finished = []
+    while limit is None or len(finished) < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        finished.append(run_job(job, chunk_size))
+    return finished
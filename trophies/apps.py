@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrophiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trophies'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,324 @@
+# trophies/bulk.py
+"""
+Batched upserts for offline trophy imports
+
+import_user_record() writes one user's dump record (the fixture shape
+psn_integration.simulator records from PSNAWP) with a few bulk INSERT ...
+ON CONFLICT statements per table instead of get_or_create() per trophy.
+Scores and levels are left to trophies.scoring, run once at the end.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+from games.models import Game, difficulty_for_completion_rate
+from .events import record_earned
+from .models import Trophy, UserGameProgress, UserTrophy
+from .scoring import refresh_trophy_points
+from .trophy_sets import rebuild_trophy_sets
+
+User = get_user_model()
+
+TROPHY_TYPES = ['bronze', 'silver', 'gold', 'platinum']
+
+READ_SIZE = 1024 * 1024
+
+
+class DumpFormatError(Exception):
+    """A dump file is not valid JSON / NDJSON or a record is malformed"""
+    pass
+
+
+def iter_dump_records(path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield user records from a dump file one at a time: a single JSON
+    object, a JSON array of objects, or NDJSON / concatenated objects.
+    Files ending in .gz are decompressed on the fly. Only the record
+    being decoded is held in memory.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == '.gz' else open
+    decoder = json.JSONDecoder()
+    
+    with opener(path, 'rt', encoding='utf-8') as handle:
+        buffer = ''
+        position = 0
+        eof = False
+        in_array = None
+        
+        def fill():
+            nonlocal buffer, position, eof
+            chunk = handle.read(READ_SIZE)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+        
+        while True:
+            # Skip whitespace (and array punctuation), refilling as needed
+            while True:
+                while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ',')):
+                    position += 1
+                if position < len(buffer) or eof:
+                    break
+                fill()
+            
+            if position >= len(buffer):
+                if in_array:
+                    raise DumpFormatError(f"{path}: unterminated JSON array")
+                return
+            
+            if in_array is None:
+                in_array = buffer[position] == '['
+                if in_array:
+                    position += 1
+                    continue
+            
+            if in_array and buffer[position] == ']':
+                return
+            
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError as error:
+                    if eof:
+                        raise DumpFormatError(f"{path}: {error}") from error
+                    fill()
+            
+            position = end
+            if not isinstance(record, dict):
+                raise DumpFormatError(f"{path}: expected JSON objects, got {type(record).__name__}")
+            yield record
+
+
+def insert_rows(model, columns: List[str], rows: Iterable[Sequence], batch_size: int = 5000) -> int:
+    """
+    Insert plain value tuples straight into model's table, skipping model
+    instances and the ORM's per-value preparation - for generated data at
+    millions of rows. Values must already be database-ready (datetimes as
+    naive UTC, None for NULL). PostgreSQL uses COPY, other databases
+    executemany(). No ON CONFLICT handling.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ', '.join(connection.ops.quote_name(model._meta.get_field(column).column) for column in columns)
+    written = 0
+    
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        use_copy = connection.vendor == 'postgresql' and hasattr(raw_cursor, 'copy_expert')
+        sql = f"INSERT INTO {table} ({column_list}) VALUES ({', '.join(['%s'] * len(columns))})"
+        
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                written += _write_batch(cursor, raw_cursor, use_copy, table, column_list, sql, batch)
+                batch = []
+        if batch:
+            written += _write_batch(cursor, raw_cursor, use_copy, table, column_list, sql, batch)
+    return written
+
+
+def _write_batch(cursor, raw_cursor, use_copy, table, column_list, sql, batch):
+    if use_copy:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow(['t' if value is True else 'f' if value is False else value for value in row])
+        buffer.seek(0)
+        raw_cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        cursor.executemany(sql, batch)
+    return len(batch)
+
+
+def _get_or_create_user(online_id: str, account_id: str = None):
+    user = User.objects.filter(psn_id=online_id).first()
+    if user:
+        return user, False
+    
+    username = online_id
+    if User.objects.filter(username=username).exists():
+        username = f"{online_id}_psn"
+    user = User(username=username, psn_id=online_id, psn_account_id=account_id or None)
+    user.set_unusable_password()
+    user.save()
+    return user, True
+
+
+def _trophy_row_defaults(trophy: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'name': (trophy.get('trophy_name') or 'Unknown Trophy')[:200],
+        'description': trophy.get('trophy_detail') or '',
+        'trophy_type': (trophy.get('trophy_type') or 'bronze').lower(),
+        'icon_url': trophy.get('trophy_icon_url') or '',
+        'hidden': bool(trophy.get('trophy_hidden', False)),
+        'trophy_group_id': trophy.get('trophy_group_id') or 'default',
+    }
+
+
+def _ordered(rows, *fields):
+    """
+    Drop duplicate keys (ON CONFLICT cannot touch a row twice in one
+    statement) and sort - a consistent row order keeps concurrent workers
+    from deadlocking on shared games and trophies
+    """
+    unique = {tuple(getattr(row, field) for field in fields): row for row in rows}
+    return [unique[key] for key in sorted(unique)]
+
+
+def import_user_record(record: Dict[str, Any], batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Upsert one user's games, trophies, earned trophies and per-game
+    progress from a dump record. Returns counters for the import.
+    """
+    online_id = record.get('online_id') or (record.get('profile') or {}).get('onlineId')
+    if not online_id:
+        raise DumpFormatError('Record has no online_id')
+    titles = [title for title in record.get('titles') or [] if title.get('np_communication_id')]
+    now = timezone.now()
+    
+    with transaction.atomic():
+        user, user_created = _get_or_create_user(online_id, (record.get('profile') or {}).get('accountId'))
+        User.objects.filter(pk=user.pk).update(last_trophy_sync=now)
+        earned_before = UserTrophy.objects.filter(user=user, earned=True).count()
+        
+        # Games - shared between users, so only catalogue fields are refreshed
+        games = [
+            Game(
+                np_communication_id=title['np_communication_id'],
+                title=(title.get('title_name') or 'Unknown Game')[:200],
+                platform=title.get('title_platform') or 'PS4',
+                icon_url=title.get('title_icon_url') or '',
+                bronze_count=(title.get('defined_trophies') or {}).get('bronze', 0),
+                silver_count=(title.get('defined_trophies') or {}).get('silver', 0),
+                gold_count=(title.get('defined_trophies') or {}).get('gold', 0),
+                platinum_count=(title.get('defined_trophies') or {}).get('platinum', 0),
+                difficulty_multiplier=(
+                    difficulty_for_completion_rate(title['progress']) if title.get('progress') else 3.0
+                ),
+                last_synced=now,
+            )
+            for title in titles
+        ]
+        Game.objects.bulk_create(
+            _ordered(games, 'np_communication_id'),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['np_communication_id'],
+            update_fields=['title', 'icon_url', 'bronze_count', 'silver_count', 'gold_count', 'platinum_count',
+                           'last_synced', 'updated_at'],
+        )
+        game_ids = dict(Game.objects.filter(
+            np_communication_id__in=[title['np_communication_id'] for title in titles]
+        ).values_list('np_communication_id', 'pk'))
+        
+        # Trophy definitions
+        trophies = []
+        for title in titles:
+            game_id = game_ids[title['np_communication_id']]
+            for trophy in title.get('trophies') or []:
+                trophies.append(Trophy(game_id=game_id, trophy_id=trophy.get('trophy_id', 0), **_trophy_row_defaults(trophy)))
+        Trophy.objects.bulk_create(
+            _ordered(trophies, 'game_id', 'trophy_id'),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['game', 'trophy_id'],
+            update_fields=['name', 'description', 'trophy_type', 'icon_url', 'hidden', 'trophy_group_id', 'updated_at'],
+        )
+        # bulk_create skips Trophy.save(), so fill in points here
+        refresh_trophy_points(game_ids.values())
+        trophy_lookup = {
+            (game_id, trophy_id): (pk, trophy_type)
+            for pk, game_id, trophy_id, trophy_type in Trophy.objects.filter(
+                game_id__in=game_ids.values()
+            ).values_list('pk', 'game_id', 'trophy_id', 'trophy_type').iterator(chunk_size=batch_size)
+        }
+        
+        already_earned = set(UserTrophy.objects.filter(
+            user=user, earned=True, trophy__game_id__in=game_ids.values()
+        ).values_list('trophy_id', flat=True))
+        
+        # User trophies and per-game progress
+        earned_rows, progress_rows = [], []
+        for title in titles:
+            game_id = game_ids[title['np_communication_id']]
+            earned_by_id = {
+                entry.get('trophy_id', 0): entry
+                for entry in title.get('earned') or [] if entry.get('earned', True)
+            }
+            earned_counts = dict.fromkeys(TROPHY_TYPES, 0)
+            last_trophy_date = None
+            
+            for trophy in title.get('trophies') or []:
+                trophy_pk, trophy_type = trophy_lookup[(game_id, trophy.get('trophy_id', 0))]
+                entry = earned_by_id.get(trophy.get('trophy_id', 0))
+                if entry is None:
+                    continue  # unearned trophies get no row
+                
+                earned_at = parse_datetime(entry['earned_date_time']) if entry.get('earned_date_time') else now
+                earned_rows.append(UserTrophy(
+                    user=user,
+                    trophy_id=trophy_pk,
+                    earned=True,
+                    earned_datetime=earned_at,
+                    progress_value=entry.get('progress'),
+                    progress_rate=entry.get('progress_rate'),
+                ))
+                earned_counts[trophy_type] = earned_counts.get(trophy_type, 0) + 1
+                if last_trophy_date is None or earned_at > last_trophy_date:
+                    last_trophy_date = earned_at
+            
+            total_available = sum((title.get('defined_trophies') or {}).get(trophy_type, 0) for trophy_type in TROPHY_TYPES)
+            total_available = total_available or len(title.get('trophies') or [])
+            percentage = int(sum(earned_counts.values()) * 100 / total_available) if total_available else 0
+            progress_rows.append(UserGameProgress(
+                user=user,
+                game_id=game_id,
+                progress_percentage=min(percentage, 100),
+                bronze_earned=earned_counts['bronze'],
+                silver_earned=earned_counts['silver'],
+                gold_earned=earned_counts['gold'],
+                platinum_earned=earned_counts['platinum'],
+                completed=percentage >= 100,
+                completion_date=now if percentage >= 100 else None,
+                last_trophy_date=last_trophy_date,
+            ))
+        
+        UserTrophy.objects.bulk_create(
+            _ordered(earned_rows, 'trophy_id'),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user', 'trophy'],
+            update_fields=['earned', 'earned_datetime', 'progress_value', 'progress_rate', 'synced_at'],
+        )
+        record_earned(row for row in earned_rows if row.trophy_id not in already_earned)
+        UserGameProgress.objects.bulk_create(
+            _ordered(progress_rows, 'game_id'),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user', 'game'],
+            update_fields=['progress_percentage', 'bronze_earned', 'silver_earned', 'gold_earned', 'platinum_earned',
+                           'completed', 'last_trophy_date', 'last_updated'],
+        )
+        rebuild_trophy_sets([user.pk], game_ids.values())
+        
+        earned_after = UserTrophy.objects.filter(user=user, earned=True).count()
+    
+    return {
+        'user_id': user.pk,
+        'online_id': online_id,
+        'user_created': user_created,
+        'games': len(games),
+        'trophies': len(trophies),
+        'user_trophies': len(earned_rows),
+        'trophies_new': earned_after - earned_before,
+    }
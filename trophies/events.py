@@ -0,0 +1,179 @@
+# trophies/events.py
+"""
+Outbox of newly earned trophies
+
+Every sync path that flips a UserTrophy to earned calls record_earned()
+inside the same transaction, so the event exists if and only if the
+write committed. Downstream computations (milestones, rankings, rarity,
+difficulty hints) read the stream incrementally instead of rescanning:
+
+    def handle(events):
+        ...
+    
+    consume('milestones', handle)   # every event since the last call
+
+Each consumer has an EventCursor holding the id of the last event it
+handled; consume() advances it in the same transaction as the handler,
+so DB work done by the handler happens exactly once per event.
+
+Ids are allocated at INSERT, not COMMIT, so a long transaction can
+commit an event below a cursor that already moved past it. Reads stop
+at events younger than TROPHY_EVENT_SETTLE_SECONDS to give in-flight
+transactions time to land.
+
+compact_events() deletes events every consumer has handled (and that
+are older than TROPHY_EVENT_RETENTION_DAYS), a batch at a time.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import timedelta
+import logging
+from typing import Callable, Iterable, List, Optional
+from trophy_tracker import metrics
+from .models import EventCursor, Trophy, TrophyEvent, UserTrophy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def record_earned(user_trophies: Iterable[UserTrophy]) -> int:
+    """
+    Append an event per newly earned UserTrophy. Call inside the
+    transaction that saved them. Returns the number of events written.
+    """
+    user_trophies = [user_trophy for user_trophy in user_trophies if user_trophy.earned]
+    if not user_trophies:
+        return 0
+    
+    # Trophy game and points, from the loaded trophy when there is one
+    trophy_field = UserTrophy._meta.get_field('trophy')
+    details = {
+        user_trophy.trophy_id: (user_trophy.trophy.game_id, user_trophy.trophy.trophy_type, user_trophy.trophy.points)
+        for user_trophy in user_trophies if trophy_field.is_cached(user_trophy)
+    }
+    missing = {user_trophy.trophy_id for user_trophy in user_trophies} - details.keys()
+    if missing:
+        for pk, game_id, trophy_type, points in Trophy.objects.filter(pk__in=missing).values_list(
+            'pk', 'game_id', 'trophy_type', 'points'
+        ):
+            details[pk] = (game_id, trophy_type, points)
+    
+    now = timezone.now()
+    events = [
+        TrophyEvent(
+            user_id=user_trophy.user_id,
+            trophy_id=user_trophy.trophy_id,
+            game_id=details[user_trophy.trophy_id][0],
+            trophy_type=details[user_trophy.trophy_id][1],
+            points=details[user_trophy.trophy_id][2],
+            earned_datetime=user_trophy.earned_datetime or now,
+        )
+        for user_trophy in user_trophies if user_trophy.trophy_id in details
+    ]
+    TrophyEvent.objects.bulk_create(events, batch_size=DEFAULT_BATCH_SIZE)
+    metrics.increment('trophy_events_recorded', len(events))
+    return len(events)
+
+
+def get_cursor(consumer: str) -> EventCursor:
+    """The consumer's cursor; a new consumer starts from the oldest retained event"""
+    cursor, _ = EventCursor.objects.get_or_create(consumer=consumer)
+    return cursor
+
+
+def _settled(settle_seconds: float = None):
+    if settle_seconds is None:
+        settle_seconds = settings.TROPHY_EVENT_SETTLE_SECONDS
+    return TrophyEvent.objects.filter(created_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+
+
+def read_events(position: int, batch_size: int = DEFAULT_BATCH_SIZE, settle_seconds: float = None) -> List[TrophyEvent]:
+    """The next batch of settled events after position, in id order"""
+    return list(_settled(settle_seconds).filter(pk__gt=position).order_by('pk')[:batch_size])
+
+
+def consume(consumer: str, handler: Callable[[List[TrophyEvent]], None], batch_size: int = DEFAULT_BATCH_SIZE,
+            max_batches: Optional[int] = None, settle_seconds: float = None) -> int:
+    """
+    Feed the events after consumer's cursor to handler a batch at a time.
+    Each batch and its cursor update commit together; if handler raises,
+    the batch is retried on the next call. Returns events consumed.
+    """
+    get_cursor(consumer)
+    consumed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            # Locks the cursor so two runs of the same consumer take turns
+            cursor = EventCursor.objects.select_for_update().get(consumer=consumer)
+            events = read_events(cursor.position, batch_size, settle_seconds)
+            if not events:
+                break
+            handler(events)
+            cursor.position = events[-1].pk
+            cursor.events_consumed += len(events)
+            cursor.save(update_fields=['position', 'events_consumed', 'updated_at'])
+        consumed += len(events)
+        batches += 1
+    
+    if consumed:
+        logger.info(f"📬 {consumer} consumed {consumed} trophy events in {batches} batch(es)")
+    return consumed
+
+
+def consumer_lag(consumer: str) -> int:
+    """Settled events the consumer hasn't handled yet"""
+    return _settled().filter(pk__gt=get_cursor(consumer).position).count()
+
+
+def lag_expression():
+    """consumer_lag() as an expression on EventCursor rows, to annotate every cursor in one query"""
+    lagging = _settled().filter(pk__gt=OuterRef('position')).order_by().annotate(
+        _group=Value(1)
+    ).values('_group').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(lagging, output_field=IntegerField()), 0)
+
+
+def compact_events(batch_size: int = 5000, retain_days: int = None, dry_run: bool = False) -> int:
+    """
+    Delete events that every consumer's cursor has passed and that are
+    older than retain_days, oldest first in batches. With no consumers
+    registered only the age limit applies. Returns events deleted (or
+    that would be, with dry_run).
+    """
+    if retain_days is None:
+        retain_days = settings.TROPHY_EVENT_RETENTION_DAYS
+    deletable = TrophyEvent.objects.filter(created_at__lt=timezone.now() - timedelta(days=retain_days))
+    slowest = EventCursor.objects.aggregate(position=Min('position'))['position']
+    if slowest is not None:
+        deletable = deletable.filter(pk__lte=slowest)
+    
+    if dry_run:
+        return deletable.count()
+    
+    deleted = 0
+    while True:
+        pks = list(deletable.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        deleted += TrophyEvent.objects.filter(pk__in=pks).delete()[0]
+    
+    if deleted:
+        logger.info(f"🧹 Compacted {deleted} trophy events (keeping {retain_days} days)")
+    return deleted
+
+
+def event_samples():
+    """Metrics collector: unconsumed events per consumer"""
+    last = TrophyEvent.objects.aggregate(last=Max('pk'))['last'] or 0
+    for consumer, position in EventCursor.objects.values_list('consumer', 'position'):
+        yield 'trophy_event_lag', {'consumer': consumer}, max(0, last - position)
+
+
+metrics.describe('trophy_event_lag', 'gauge', 'Trophy events newer than the consumer cursor (by id)')
+metrics.register_collector(event_samples)
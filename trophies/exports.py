@@ -0,0 +1,181 @@
+# trophies/exports.py
+"""
+Streaming trophy history exports (CSV / NDJSON, optionally gzipped)
+
+Rows come straight from a values_list() iterator over UserTrophy joined
+to Trophy and Game, are encoded a chunk at a time and handed on as bytes,
+so memory use is flat no matter how many trophies a user has.
+
+UserTrophy only stores earned or in-progress trophies, so unless the
+export is earned-only, the user's remaining trophies follow from an
+anti-join against Trophy (see trophies.queries).
+"""
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Mod
+import csv
+import datetime
+import io
+import itertools
+import json
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+from .models import Trophy, UserTrophy
+from .queries import untracked_trophies
+
+# (column name, UserTrophy lookup)
+EXPORT_COLUMNS = [
+    ('game_np_communication_id', 'trophy__game__np_communication_id'),
+    ('game_title', 'trophy__game__title'),
+    ('platform', 'trophy__game__platform'),
+    ('difficulty_multiplier', 'trophy__game__difficulty_multiplier'),
+    ('trophy_id', 'trophy__trophy_id'),
+    ('trophy_group_id', 'trophy__trophy_group_id'),
+    ('trophy_name', 'trophy__name'),
+    ('trophy_description', 'trophy__description'),
+    ('trophy_type', 'trophy__trophy_type'),
+    ('earn_rate', 'trophy__earn_rate'),
+    ('earned', 'earned'),
+    ('earned_datetime', 'earned_datetime'),
+    ('progress_value', 'progress_value'),
+    ('progress_rate', 'progress_rate'),
+]
+
+# Bulk exports prefix every row with its owner
+USER_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('psn_id', 'user__psn_id'),
+]
+
+# Columns an unearned trophy (no stored row) fills with a constant
+UNEARNED_VALUES = {
+    'earned': False,
+    'earned_datetime': None,
+    'progress_value': None,
+    'progress_rate': None,
+}
+
+# Owner columns when rows come from Trophy joined to the owner's UserGameProgress
+OWNER_LOOKUPS = {
+    'user_id': 'game__user_progress__user_id',
+    'user__username': 'game__user_progress__user__username',
+    'user__psn_id': 'game__user_progress__user__psn_id',
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Bytes buffered before a chunk is handed to the response / file
+FLUSH_BYTES = 64 * 1024
+
+
+def get_chunk_size() -> int:
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_rows(queryset, columns: List[Tuple[str, str]]) -> Iterator[tuple]:
+    """Stream the export columns of a UserTrophy queryset, in primary key order"""
+    lookups = [lookup for _, lookup in columns]
+    return queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=get_chunk_size())
+
+
+def unearned_export_rows(trophies, columns: List[Tuple[str, str]]) -> Iterator[tuple]:
+    """Stream the export columns for a Trophy queryset of trophies with no stored UserTrophy row"""
+    lookups = [
+        OWNER_LOOKUPS.get(lookup, lookup.removeprefix('trophy__'))
+        for _, lookup in columns if lookup not in UNEARNED_VALUES
+    ]
+    for values in trophies.order_by('pk').values_list(*lookups).iterator(chunk_size=get_chunk_size()):
+        values = iter(values)
+        yield tuple(UNEARNED_VALUES[lookup] if lookup in UNEARNED_VALUES else next(values) for _, lookup in columns)
+
+
+def user_export_rows(user, earned_only: bool = False) -> Iterator[tuple]:
+    """Rows for one user's trophy history"""
+    queryset = UserTrophy.objects.filter(user=user)
+    if earned_only:
+        return export_rows(queryset.filter(earned=True), EXPORT_COLUMNS)
+    return itertools.chain(
+        export_rows(queryset, EXPORT_COLUMNS),
+        unearned_export_rows(untracked_trophies(user), EXPORT_COLUMNS),
+    )
+
+
+def shard_export_rows(shard: int, shards: int, earned_only: bool = False) -> Iterator[tuple]:
+    """Rows for every user whose id falls in the given shard (user_id % shards)"""
+    queryset = UserTrophy.objects.annotate(export_shard=Mod(F('user_id'), shards)).filter(export_shard=shard)
+    columns = USER_COLUMNS + EXPORT_COLUMNS
+    if earned_only:
+        return export_rows(queryset.filter(earned=True), columns)
+    
+    # One row per (owner, trophy) of the owner's games, minus trophies they have a row for
+    stored = UserTrophy.objects.filter(user_id=OuterRef('owner_id'), trophy=OuterRef('pk'))
+    untracked = Trophy.objects.annotate(
+        owner_id=F('game__user_progress__user_id'),
+    ).annotate(
+        export_shard=Mod(F('owner_id'), shards),
+    ).filter(export_shard=shard).filter(~Exists(stored))
+    return itertools.chain(export_rows(queryset, columns), unearned_export_rows(untracked, columns))
+
+
+def _plain(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(rows: Iterable[tuple], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def encode_ndjson(rows: Iterable[tuple], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    names = [name for name, _ in columns]
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(names, (_plain(value) for value in row))), ensure_ascii=False)
+        lines.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+            size = 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode(rows: Iterable[tuple], columns: List[Tuple[str, str]], fmt: str = 'csv',
+           compress: bool = False) -> Iterator[bytes]:
+    """Encode export rows as CSV or NDJSON bytes, optionally gzipped"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunks = encode_csv(rows, columns) if fmt == 'csv' else encode_ndjson(rows, columns)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(name: str, fmt: str, compress: bool = False) -> str:
+    filename = f"{name}.{FORMATS[fmt][1]}"
+    return f"{filename}.gz" if compress else filename
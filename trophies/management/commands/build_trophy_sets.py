@@ -0,0 +1,56 @@
+# trophies/management/commands/build_trophy_sets.py
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection
+from trophies.models import UserGameProgress, UserTrophy, UserTrophySet, UserTrophySetEntry
+from trophies.trophy_sets import CHUNK_SIZE, rebuild_trophy_sets
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Build the compact per-game trophy sets (earned bitmaps) from UserTrophy rows'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, help='Only rebuild this username')
+        parser.add_argument('--stats', action='store_true', help='Only report row counts and table sizes')
+    
+    def handle(self, *args, **options):
+        if not options['stats']:
+            if options['user']:
+                user = User.objects.filter(username=options['user']).first()
+                if not user:
+                    raise CommandError(f"User '{options['user']}' not found")
+                user_ids = [user.pk]
+            else:
+                user_ids = list(UserGameProgress.objects.values_list('user_id', flat=True).distinct().order_by())
+            
+            written = 0
+            for start in range(0, len(user_ids), CHUNK_SIZE):
+                written += rebuild_trophy_sets(user_ids[start:start + CHUNK_SIZE])
+                self.stdout.write(f"  {min(start + CHUNK_SIZE, len(user_ids))}/{len(user_ids)} users, {written} sets")
+        
+        for model in (UserTrophy, UserTrophySet, UserTrophySetEntry):
+            size = self.table_size(model._meta.db_table)
+            size_text = f", {size / 1024 / 1024:.1f} MB" if size is not None else ''
+            self.stdout.write(f"📦 {model._meta.db_table}: {model.objects.count():,} rows{size_text}")
+        
+        if not options['stats']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Built {written} trophy sets'))
+    
+    def table_size(self, table):
+        """Table plus index size in bytes, where the database can tell us"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                return cursor.fetchone()[0]
+            if connection.vendor == 'sqlite':
+                try:
+                    cursor.execute(
+                        'SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s)',
+                        [table]
+                    )
+                    return cursor.fetchone()[0] or 0
+                except Exception:
+                    return None  # SQLite built without dbstat
+        return None
@@ -0,0 +1,40 @@
+# trophies/management/commands/check_trophy_points.py
+from django.core.management.base import BaseCommand
+from trophies.scoring import recompute_scores, refresh_trophy_points, stale_trophy_points, stale_user_scores
+
+
+class Command(BaseCommand):
+    help = "Check stored Trophy.points against base points x the game's multiplier, and optionally user scores"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rewrite stale points (and scores with --scores)')
+        parser.add_argument('--scores', action='store_true', help="Also check users' total scores against their trophies")
+        parser.add_argument('--show', type=int, default=10, help='Mismatches to list (default: 10)')
+    
+    def handle(self, *args, **options):
+        stale = stale_trophy_points()
+        stale_count = stale.count()
+        for trophy in stale.select_related('game')[:options['show']]:
+            self.stdout.write(
+                f"  {trophy.game.title} #{trophy.trophy_id} ({trophy.trophy_type}): "
+                f"stored {trophy.points}, expected {int(trophy.expected_points)}"
+            )
+        self.stdout.write(f"{'⚠️' if stale_count else '✅'} {stale_count} trophies with stale points")
+        
+        if stale_count and options['fix']:
+            game_ids = set(stale.values_list('game_id', flat=True))
+            refreshed = refresh_trophy_points(game_ids)
+            self.stdout.write(f"🔧 Refreshed points on {refreshed} trophies in {len(game_ids)} games")
+        
+        if options['scores']:
+            users = stale_user_scores()
+            user_count = users.count()
+            for user in users[:options['show']]:
+                self.stdout.write(f"  {user.username}: stored {user.total_trophy_score}, expected {user.expected_score}")
+            self.stdout.write(f"{'⚠️' if user_count else '✅'} {user_count} users with stale scores")
+            
+            if user_count and options['fix']:
+                recomputed = recompute_scores(users.values_list('pk', flat=True))
+                self.stdout.write(f"🔧 Recomputed scores for {recomputed} users")
+        
+        self.stdout.write(self.style.SUCCESS('✅ Trophy points check complete'))
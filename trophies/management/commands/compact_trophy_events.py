@@ -0,0 +1,31 @@
+# trophies/management/commands/compact_trophy_events.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from trophies.events import compact_events, lag_expression
+from trophies.models import EventCursor, TrophyEvent
+
+
+class Command(BaseCommand):
+    help = 'Delete trophy events every consumer has handled and that are past the retention window'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Events deleted per statement')
+        parser.add_argument('--retain-days', type=int, default=settings.TROPHY_EVENT_RETENTION_DAYS,
+                            help='Keep events younger than this many days')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+    
+    def handle(self, *args, **options):
+        self.stdout.write(f"Trophy events stored: {TrophyEvent.objects.count()}")
+        cursors = EventCursor.objects.order_by('consumer').annotate(lag=lag_expression())
+        for consumer, position, lag in cursors.values_list('consumer', 'position', 'lag'):
+            self.stdout.write(f"  📬 {consumer}: at #{position}, {lag} behind")
+        
+        deleted = compact_events(
+            batch_size=options['batch_size'],
+            retain_days=options['retain_days'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"✅ Would compact {deleted} trophy events"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Compacted {deleted} trophy events"))
@@ -0,0 +1,91 @@
+# trophies/management/commands/export_trophies.py
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from pathlib import Path
+import sys
+import time
+from trophies import exports
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream trophy history exports for one user, or every user into sharded files'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, help='Username or PSN ID to export')
+        parser.add_argument('--all', action='store_true', help='Export every user into sharded files')
+        parser.add_argument('--format', type=str, default='csv', choices=sorted(exports.FORMATS))
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output on the fly')
+        parser.add_argument('--earned-only', action='store_true', help='Skip unearned trophies')
+        parser.add_argument('--output', type=str, default='-', help='Output file for --user (default: stdout)')
+        parser.add_argument('--output-dir', type=str, default='exports', help='Directory for --all shard files')
+        parser.add_argument('--shards', type=int, default=8, help='Number of shard files for --all (by user id)')
+        parser.add_argument(
+            '--shard',
+            type=int,
+            default=None,
+            help='Only write this shard (0-based) - run one process per shard to parallelise'
+        )
+    
+    def handle(self, *args, **options):
+        if bool(options['user']) == options['all']:
+            raise CommandError('Pass exactly one of --user or --all')
+        
+        if options['user']:
+            self.export_user(options)
+        else:
+            self.export_all(options)
+    
+    def export_user(self, options):
+        user = User.objects.filter(Q(username=options['user']) | Q(psn_id=options['user'])).first()
+        if not user:
+            raise CommandError(f"User not found: {options['user']}")
+        
+        rows = exports.user_export_rows(user, earned_only=options['earned_only'])
+        chunks = exports.encode(rows, exports.EXPORT_COLUMNS, options['format'], compress=options['gzip'])
+        
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        
+        written = self.write_chunks(Path(options['output']), chunks)
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported {user.username} to {options['output']} ({written:,} bytes)"))
+    
+    def export_all(self, options):
+        shards = options['shards']
+        if shards < 1:
+            raise CommandError('--shards must be at least 1')
+        if options['shard'] is not None and not 0 <= options['shard'] < shards:
+            raise CommandError(f"--shard must be between 0 and {shards - 1}")
+        
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        shard_numbers = [options['shard']] if options['shard'] is not None else range(shards)
+        columns = exports.USER_COLUMNS + exports.EXPORT_COLUMNS
+        
+        for shard in shard_numbers:
+            started = time.perf_counter()
+            rows = exports.shard_export_rows(shard, shards, earned_only=options['earned_only'])
+            chunks = exports.encode(rows, columns, options['format'], compress=options['gzip'])
+            path = output_dir / exports.export_filename(
+                f"trophies_shard_{shard:03d}_of_{shards:03d}", options['format'], options['gzip']
+            )
+            written = self.write_chunks(path, chunks)
+            self.stdout.write(f"  {path} ({written:,} bytes, {time.perf_counter() - started:.1f}s)")
+        
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported {len(shard_numbers)} shard(s) to {output_dir}"))
+    
+    def write_chunks(self, path, chunks):
+        written = 0
+        # Write to a temporary name so readers never see a half-written shard
+        partial = path.with_name(path.name + '.partial')
+        with open(partial, 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                written += len(chunk)
+        partial.replace(path)
+        return written
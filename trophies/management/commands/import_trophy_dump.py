@@ -0,0 +1,235 @@
+# trophies/management/commands/import_trophy_dump.py
+"""
+Offline bulk import of PSN trophy dumps
+
+Reads dump files (JSON, JSON arrays or NDJSON of per-user records in the
+psn_integration.simulator fixture shape, optionally .gz) incrementally,
+upserts each user through trophies.bulk in worker processes - every user
+always goes to the same worker - and recomputes scores and levels for all
+imported users in one set-based pass at the end.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from pathlib import Path
+import logging
+import multiprocessing
+import queue
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+RETRIES = 3
+
+
+def import_with_retry(record, batch_size):
+    """Import one record, retrying lock timeouts / deadlocks with a short backoff"""
+    from trophies.bulk import import_user_record
+    
+    for attempt in range(RETRIES):
+        try:
+            return import_user_record(record, batch_size=batch_size)
+        except OperationalError:
+            if attempt == RETRIES - 1:
+                raise
+            time.sleep(0.5 * (attempt + 1))
+
+
+def worker_main(records, results, batch_size):
+    """Worker process: import records until a None sentinel arrives"""
+    import django
+    django.setup()
+    connections.close_all()  # never share the parent's connection
+    
+    while True:
+        record = records.get()
+        if record is None:
+            break
+        try:
+            results.put(('ok', import_with_retry(record, batch_size)))
+        except Exception as e:
+            results.put(('error', {'online_id': record.get('online_id'), 'error': str(e)}))
+    
+    connections.close_all()
+    results.put(('done', None))
+
+
+class Command(BaseCommand):
+    help = 'Import PSN trophy dumps (JSON / NDJSON, optionally gzipped) with batched upserts'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', type=str, help='Dump files or directories of dump files')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=max(1, min(4, multiprocessing.cpu_count())),
+            help='Worker processes (users are split between them by PSN ID; SQLite always uses 1)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT statement')
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=4,
+            help='Parsed records buffered per worker (bounds memory use)'
+        )
+        parser.add_argument(
+            '--skip-recompute',
+            action='store_true',
+            help="Don't recompute scores and levels after the import"
+        )
+    
+    def handle(self, *args, **options):
+        files = self.collect_files(options['paths'])
+        if not files:
+            raise CommandError('No dump files found')
+        
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            self.stdout.write(self.style.WARNING('⚠️ SQLite allows a single writer - importing with 1 worker'))
+            workers = 1
+        
+        started = time.perf_counter()
+        self.stdout.write(f"📦 Importing {len(files)} file(s) with {workers} worker(s)...")
+        
+        if workers == 1:
+            summary = self.import_serial(files, options)
+        else:
+            summary = self.import_parallel(files, workers, options)
+        import_seconds = time.perf_counter() - started
+        
+        if summary['user_ids'] and not options['skip_recompute']:
+            from rankings.milestones import backfill_milestones
+            from trophies.scoring import recompute_scores
+            from trophy_tracker.caching import invalidate
+            
+            recompute_started = time.perf_counter()
+            recompute_scores(summary['user_ids'])
+            invalidate('home')
+            # Counters are current now; award what the imported trophies unlocked
+            awarded = backfill_milestones(summary['user_ids'])
+            self.stdout.write(
+                f"🧮 Recomputed scores for {len(summary['user_ids'])} users "
+                f"in {time.perf_counter() - recompute_started:.1f}s ({len(awarded)} milestones awarded)"
+            )
+        
+        for error in summary['errors'][:20]:
+            self.stdout.write(self.style.ERROR(f"  ❌ {error['online_id']}: {error['error']}"))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {len(summary['user_ids'])} users ({summary['users_created']} new), "
+            f"{summary['trophies']:,} trophy definitions, {summary['user_trophies']:,} user trophies "
+            f"({summary['trophies_new']:,} newly earned) in {import_seconds:.1f}s"
+            + (f" - {len(summary['errors'])} failed" if summary['errors'] else '')
+        ))
+    
+    def collect_files(self, paths):
+        files = []
+        for raw_path in paths:
+            path = Path(raw_path)
+            if path.is_dir():
+                files.extend(sorted(
+                    child for child in path.iterdir()
+                    if child.name.endswith(('.json', '.ndjson', '.jsonl', '.json.gz', '.ndjson.gz', '.jsonl.gz'))
+                ))
+            elif path.exists():
+                files.append(path)
+            else:
+                raise CommandError(f"Not found: {path}")
+        return files
+    
+    def iter_records(self, files):
+        from trophies.bulk import iter_dump_records
+        
+        for path in files:
+            yield from iter_dump_records(path)
+    
+    def new_summary(self):
+        return {
+            'user_ids': set(), 'users_created': 0, 'trophies': 0,
+            'user_trophies': 0, 'trophies_new': 0, 'errors': [],
+        }
+    
+    def record_result(self, summary, status, result):
+        if status == 'error':
+            summary['errors'].append(result)
+            logger.error(f"Import failed for {result['online_id']}: {result['error']}")
+            return
+        summary['user_ids'].add(result['user_id'])
+        summary['users_created'] += int(result['user_created'])
+        summary['trophies'] += result['trophies']
+        summary['user_trophies'] += result['user_trophies']
+        summary['trophies_new'] += result['trophies_new']
+        
+        imported = len(summary['user_ids'])
+        if imported % 100 == 0:
+            self.stdout.write(f"  ... {imported} users imported")
+    
+    def import_serial(self, files, options):
+        summary = self.new_summary()
+        for record in self.iter_records(files):
+            try:
+                self.record_result(summary, 'ok', import_with_retry(record, options['batch_size']))
+            except Exception as e:
+                self.record_result(summary, 'error', {'online_id': record.get('online_id'), 'error': str(e)})
+        return summary
+    
+    def import_parallel(self, files, workers, options):
+        summary = self.new_summary()
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        record_queues = [context.Queue(maxsize=options['queue_size']) for _ in range(workers)]
+        
+        connections.close_all()
+        processes = [
+            context.Process(target=worker_main, args=(record_queue, results, options['batch_size']), daemon=True)
+            for record_queue in record_queues
+        ]
+        for process in processes:
+            process.start()
+        
+        finished = []
+        
+        def drain(block=False):
+            """Collect finished imports; block waits up to a second for the first one"""
+            while True:
+                try:
+                    status, result = results.get(block=block, timeout=1 if block else None)
+                except queue.Empty:
+                    return
+                if status == 'done':
+                    finished.append(result)
+                else:
+                    self.record_result(summary, status, result)
+                block = False
+        
+        try:
+            for record in self.iter_records(files):
+                online_id = record.get('online_id') or (record.get('profile') or {}).get('onlineId') or ''
+                # Same user, same worker - a user's records are never imported concurrently
+                target = record_queues[zlib.crc32(online_id.encode()) % workers]
+                while True:
+                    try:
+                        target.put(record, timeout=1)
+                        break
+                    except queue.Full:
+                        drain()
+                        if not any(process.is_alive() for process in processes):
+                            raise CommandError('All import workers exited')
+                drain()
+            
+            for record_queue in record_queues:
+                record_queue.put(None)
+            
+            while len(finished) < workers:
+                drain(block=True)
+                if len(finished) < workers and not any(process.is_alive() for process in processes):
+                    drain()
+                    break
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        
+        return summary
@@ -0,0 +1,27 @@
+# trophies/management/commands/run_admin_jobs.py
+from django.core.management.base import BaseCommand
+from trophies.admin_jobs import run_pending_jobs
+from trophies.models import BulkAdminJob
+from trophies.scoring import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Run queued bulk admin jobs (large score, progress and difficulty actions)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=0, help='Maximum jobs to run (default: 0 for all pending)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Objects per set-based statement batch')
+    
+    def handle(self, *args, **options):
+        pending = BulkAdminJob.objects.filter(status='pending').count()
+        self.stdout.write(f"Pending bulk admin jobs: {pending}")
+        if not pending:
+            return
+        
+        jobs = run_pending_jobs(limit=options['limit'] or None, chunk_size=options['chunk_size'])
+        for job in jobs:
+            status = '✅' if job.status == 'completed' else '❌'
+            detail = job.error_message or f"{job.changed} changed"
+            self.stdout.write(f"  {status} #{job.pk} {job.action}: {job.processed}/{job.total} ({detail})")
+        
+        self.stdout.write(self.style.SUCCESS(f"✅ Ran {len(jobs)} bulk admin jobs"))
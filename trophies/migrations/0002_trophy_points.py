@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:25
+
+from django.db import migrations, models
+from django.db.models import Case, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Floor
+
+BASE_POINTS = {'bronze': 1, 'silver': 3, 'gold': 6, 'platinum': 15}
+BATCH_SIZE = 500
+
+
+def backfill_points(apps, schema_editor):
+    """Fill Trophy.points from each game's multiplier, a batch of games at a time"""
+    Game = apps.get_model('games', 'Game')
+    Trophy = apps.get_model('trophies', 'Trophy')
+    
+    base_points = Case(
+        *[When(trophy_type=trophy_type, then=Value(points)) for trophy_type, points in BASE_POINTS.items()],
+        default=Value(1),
+        output_field=FloatField(),
+    )
+    multiplier = Subquery(
+        Game.objects.filter(pk=OuterRef('game_id')).values('difficulty_multiplier')[:1], output_field=FloatField()
+    )
+    game_ids = list(Trophy.objects.order_by('game_id').values_list('game_id', flat=True).distinct())
+    for start in range(0, len(game_ids), BATCH_SIZE):
+        Trophy.objects.filter(game_id__in=game_ids[start:start + BATCH_SIZE]).update(
+            points=Floor(base_points * multiplier)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_alter_gamedifficultyrating_unique_together_and_more'),
+        ('trophies', '0001_initial'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='trophy',
+            name='points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_alter_gamedifficultyrating_unique_together_and_more'),
+        ('trophies', '0002_trophy_points'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='UserTrophySet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('earned_bits', models.BinaryField(default=bytes)),
+                ('earned_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trophy_sets', to='games.game')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trophy_sets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'trophies_usertrophyset',
+                'unique_together': {('user', 'game')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserTrophySetEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trophy_id', models.IntegerField()),
+                ('earned_datetime', models.DateTimeField(blank=True, null=True)),
+                ('progress_value', models.IntegerField(blank=True, null=True)),
+                ('progress_rate', models.IntegerField(blank=True, null=True)),
+                ('progress_datetime', models.DateTimeField(blank=True, null=True)),
+                ('trophy_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='trophies.usertrophyset')),
+            ],
+            options={
+                'db_table': 'trophies_usertrophysetentry',
+                'indexes': [models.Index(fields=['trophy_set', '-earned_datetime'], name='trophies_us_trophy__5d11ba_idx')],
+                'unique_together': {('trophy_set', 'trophy_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:05
+
+from django.db import migrations
+
+BATCH_SIZE = 5000
+
+
+def delete_dead_rows(apps, schema_editor):
+    """
+    Unearned rows with no progress carry nothing a Trophy anti-join can't
+    derive; delete them a batch of primary keys at a time
+    """
+    UserTrophy = apps.get_model('trophies', 'UserTrophy')
+    dead = UserTrophy.objects.filter(earned=False, progress_value__isnull=True)
+    last_pk = 0
+    while True:
+        pks = list(dead.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not pks:
+            break
+        UserTrophy.objects.filter(pk__in=pks).delete()
+        last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so a large table isn't locked in one transaction
+    atomic = False
+    
+    dependencies = [
+        ('trophies', '0003_trophy_sets'),
+    ]
+    
+    operations = [
+        migrations.RunPython(delete_dead_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trophies', '0004_delete_unearned_usertrophy_rows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='BulkAdminJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('object_ids', models.JSONField(default=list)),
+                ('total', models.IntegerField(default=0)),
+                ('processed', models.IntegerField(default=0)),
+                ('changed', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_admin_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'trophies_bulkadminjob',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='trophies_bu_status_1b9786_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_alter_gamedifficultyrating_unique_together_and_more'),
+        ('trophies', '0005_bulkadminjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('events_consumed', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'trophies_eventcursor',
+                'ordering': ['consumer'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrophyEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('trophy_type', models.CharField(max_length=10)),
+                ('points', models.IntegerField(default=0)),
+                ('earned_datetime', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trophy_events', to='games.game')),
+                ('trophy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='trophies.trophy')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trophy_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'trophies_trophyevent',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def fail_unfinished_id_list_jobs(apps, schema_editor):
+    """Jobs queued as pk lists can't be resumed from a selection - they need queueing again"""
+    BulkAdminJob = apps.get_model('trophies', 'BulkAdminJob')
+    BulkAdminJob.objects.filter(status__in=['pending', 'running']).update(
+        status='failed',
+        error_message='Queued before selections were staged as job items - run the admin action again',
+        completed_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trophies', '0006_trophy_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkadminjob',
+            name='model_label',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='bulkadminjob',
+            name='last_pk',
+            field=models.BigIntegerField(default=0, help_text='Highest pk processed so far (resume point)'),
+        ),
+        migrations.RunPython(fail_unfinished_id_list_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='bulkadminjob',
+            name='object_ids',
+        ),
+        migrations.CreateModel(
+            name='BulkAdminJobItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_pk', models.BigIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='trophies.bulkadminjob')),
+            ],
+            options={
+                'db_table': 'trophies_bulkadminjobitem',
+                'constraints': [models.UniqueConstraint(fields=('job', 'object_pk'), name='trophies_bulkadminjobitem_unique_pk')],
+            },
+        ),
+    ]
@@ -26,6 +26,9 @@ class Trophy(models.Model):
     # Trophy Properties
     hidden = models.BooleanField(default=False)
     
+    # Score: base points x game multiplier, kept in step by refresh_trophy_points()
+    points = models.IntegerField(default=0)
+    
     # Progress Tracking (PS5 feature)
     has_progress_target = models.BooleanField(default=False)
     progress_target_value = models.IntegerField(null=True, blank=True)
@@ -54,10 +57,20 @@ class Trophy(models.Model):
         }
         return base_points.get(self.trophy_type, 1)
     
+    def compute_points(self):
+        """Base points times the game's current multiplier"""
+        return int(self.get_base_points() * self.game.difficulty_multiplier)
+    
     def calculate_score(self):
-        """Calculate final score including game multiplier"""
-        base_points = self.get_base_points()
-        return int(base_points * self.game.difficulty_multiplier)
+        """Final score including game multiplier (the stored points)"""
+        return self.points
+    
+    def save(self, *args, **kwargs):
+        self.points = self.compute_points()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'points' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'points']
+        super().save(*args, **kwargs)
     
     def get_rarity_name(self):
         """Return rarity level name"""
@@ -165,8 +178,8 @@ class UserGameProgress(models.Model):
             self.progress_percentage = 0
         
         # Calculate scores
-        self.total_score_earned = sum(ut.calculate_points_earned() for ut in user_trophies)
-        self.max_possible_score = self.game.calculate_max_possible_score()
+        self.total_score_earned = user_trophies.aggregate(total=models.Sum('trophy__points'))['total'] or 0
+        self.max_possible_score = Trophy.objects.filter(game=self.game).aggregate(total=models.Sum('points'))['total'] or 0
         
         # Check completion
         self.completed = (self.progress_percentage == 100)
@@ -179,8 +192,187 @@ class UserGameProgress(models.Model):
             self.last_trophy_date = last_trophy.earned_datetime
         
         self.save()
+        
+        # Every game with progress has a trophy set, even before anything is
+        # earned; sync folds trophies into it (trophies.trophy_sets)
+        UserTrophySet.objects.get_or_create(user_id=self.user_id, game_id=self.game_id)
     
     class Meta:
         db_table = 'trophies_usergameprogress'
         unique_together = ['user', 'game']
-        ordering = ['-last_updated']
\ No newline at end of file
+        ordering = ['-last_updated']
+
+class UserTrophySet(models.Model):
+    """
+    Compact record of a user's earned trophies in one game: bit n of
+    earned_bits is set when the trophy with PSN trophy_id n is earned.
+    Earned dates and progress live in UserTrophySetEntry, only for
+    earned or in-progress trophies. Kept in step with UserTrophy by
+    trophies.trophy_sets.
+    """
+    
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='trophy_sets')
+    game = models.ForeignKey('games.Game', on_delete=models.CASCADE, related_name='trophy_sets')
+    
+    earned_bits = models.BinaryField(default=bytes)  # little-endian bitmap by trophy_id
+    earned_count = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.game.title} ({self.earned_count} earned)"
+    
+    @property
+    def bits(self) -> int:
+        return int.from_bytes(bytes(self.earned_bits), 'little')
+    
+    @bits.setter
+    def bits(self, value: int):
+        self.earned_bits = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+        self.earned_count = value.bit_count()
+    
+    def has_earned(self, trophy_id: int) -> bool:
+        return bool(self.bits >> trophy_id & 1)
+    
+    def earned_trophy_ids(self):
+        return _bit_positions(self.bits)
+    
+    def count_by_type(self, masks=None):
+        """Earned count per trophy type; masks is this game's entry from type_masks()"""
+        if masks is None:
+            from .trophy_sets import type_masks
+            masks = type_masks([self.game_id]).get(self.game_id, {})
+        bits = self.bits
+        return {trophy_type: (bits & mask).bit_count() for trophy_type, mask in masks.items()}
+    
+    def diff(self, other):
+        """Trophy ids only this set has, only other has, and both have"""
+        mine, theirs = self.bits, other.bits if other else 0
+        return {
+            'only_mine': _bit_positions(mine & ~theirs),
+            'only_theirs': _bit_positions(theirs & ~mine),
+            'both': _bit_positions(mine & theirs),
+        }
+
+    class Meta:
+        db_table = 'trophies_usertrophyset'
+        unique_together = ['user', 'game']
+
+class UserTrophySetEntry(models.Model):
+    """Earned date and progress for one earned or in-progress trophy of a UserTrophySet"""
+    
+    trophy_set = models.ForeignKey(UserTrophySet, on_delete=models.CASCADE, related_name='entries')
+    trophy_id = models.IntegerField()  # PSN trophy id, the bit position
+    
+    earned_datetime = models.DateTimeField(null=True, blank=True)
+    progress_value = models.IntegerField(null=True, blank=True)
+    progress_rate = models.IntegerField(null=True, blank=True)
+    progress_datetime = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'trophies_usertrophysetentry'
+        unique_together = ['trophy_set', 'trophy_id']
+        indexes = [
+            models.Index(fields=['trophy_set', '-earned_datetime']),
+        ]
+
+class BulkAdminJob(models.Model):
+    """
+    A set-based admin action over a selection too large to run inside the
+    request; picked up by the run_admin_jobs command (see trophies.admin_jobs)
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    action = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    # The selected pks of model_label are staged as BulkAdminJobItem rows, read back in pk order
+    model_label = models.CharField(max_length=100)
+    last_pk = models.BigIntegerField(default=0, help_text="Highest pk processed so far (resume point)")
+    
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    changed = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    
+    requested_by = models.ForeignKey(
+        'users.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='bulk_admin_jobs'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.action} ({self.total} objects) - {self.status}"
+    
+    def progress_percentage(self):
+        if not self.total:
+            return 100 if self.status == 'completed' else 0
+        return min(100, int(self.processed * 100 / self.total))
+
+    class Meta:
+        db_table = 'trophies_bulkadminjob'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+class BulkAdminJobItem(models.Model):
+    """One object selected for a BulkAdminJob, staged when the job was queued"""
+    
+    job = models.ForeignKey(BulkAdminJob, on_delete=models.CASCADE, related_name='items')
+    object_pk = models.BigIntegerField()
+    
+    class Meta:
+        db_table = 'trophies_bulkadminjobitem'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'object_pk'], name='trophies_bulkadminjobitem_unique_pk'),
+        ]
+
+class TrophyEvent(models.Model):
+    """
+    Append-only outbox of newly earned trophies, written in the same
+    transaction as the UserTrophy change. Consumers read it in id order
+    through an EventCursor (see trophies.events).
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='trophy_events')
+    trophy = models.ForeignKey(Trophy, on_delete=models.CASCADE, related_name='events')
+    game = models.ForeignKey('games.Game', on_delete=models.CASCADE, related_name='trophy_events')
+    trophy_type = models.CharField(max_length=10)
+    points = models.IntegerField(default=0)
+    earned_datetime = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"#{self.pk} user {self.user_id} earned trophy {self.trophy_id} (+{self.points})"
+    
+    class Meta:
+        db_table = 'trophies_trophyevent'
+        ordering = ['id']
+
+class EventCursor(models.Model):
+    """How far a named consumer has read the TrophyEvent stream"""
+    
+    consumer = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)  # id of the last event consumed
+    events_consumed = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
+    
+    class Meta:
+        db_table = 'trophies_eventcursor'
+        ordering = ['consumer']
+
+def _bit_positions(bits: int):
+    return [position for position in range(bits.bit_length()) if bits >> position & 1]
@@ -0,0 +1,58 @@
+# trophies/queries.py
+"""
+Queries over sparse UserTrophy rows
+
+UserTrophy only has rows for earned or in-progress trophies. A trophy
+the user has no row for is unearned, as long as they own the game
+(have a UserGameProgress row for it). These helpers derive the unearned
+side by anti-joining Trophy against UserTrophy.
+"""
+
+from django.db.models import Exists, OuterRef, Q
+from typing import List
+from .models import Trophy, UserTrophy
+
+# Rows worth keeping: everything else is an unearned trophy with no progress
+LIVE_ROWS = Q(earned=True) | Q(progress_value__isnull=False)
+
+
+def dead_user_trophies():
+    """Stored rows that carry nothing beyond 'not earned yet'"""
+    return UserTrophy.objects.exclude(LIVE_ROWS)
+
+
+def owned_trophies(user, game=None):
+    """Every trophy of every game the user owns (or of one game)"""
+    trophies = Trophy.objects.filter(game__user_progress__user=user)
+    if game is not None:
+        trophies = trophies.filter(game=game)
+    return trophies
+
+
+def unearned_trophies(user, game=None):
+    """Trophies of the user's games they haven't earned (with or without a progress row)"""
+    earned = UserTrophy.objects.filter(user=user, trophy=OuterRef('pk'), earned=True)
+    return owned_trophies(user, game).filter(~Exists(earned))
+
+
+def untracked_trophies(user, game=None):
+    """Trophies of the user's games with no UserTrophy row at all"""
+    stored = UserTrophy.objects.filter(user=user, trophy=OuterRef('pk'))
+    return owned_trophies(user, game).filter(~Exists(stored))
+
+
+def game_user_trophies(user, game) -> List[UserTrophy]:
+    """
+    One UserTrophy per trophy in the game, in trophy order: the stored row
+    when there is one, otherwise an unsaved unearned placeholder
+    """
+    stored = {
+        user_trophy.trophy_id: user_trophy
+        for user_trophy in UserTrophy.objects.filter(user=user, trophy__game=game)
+    }
+    user_trophies = []
+    for trophy in Trophy.objects.filter(game=game).select_related('game').order_by('trophy_id'):
+        user_trophy = stored.get(trophy.pk) or UserTrophy(user=user, earned=False)
+        user_trophy.trophy = trophy
+        user_trophies.append(user_trophy)
+    return user_trophies
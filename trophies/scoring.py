@@ -0,0 +1,228 @@
+# trophies/scoring.py
+"""
+Set-based score, count and level recomputation
+
+Equivalent to UserGameProgress.update_progress() and the
+calculate_total_score() / update_trophy_level() / update_trophy_counts()
+trio on User, but done as a handful of UPDATE ... SELECT statements per
+chunk of users instead of a Python loop per row. Used after bulk imports.
+
+Progress recomputes rebuild the rows' trophy sets in the same
+transaction, so the compact sets never lag what was recomputed.
+
+Scores sum the points stored on each Trophy. refresh_trophy_points()
+keeps those in step with the game's difficulty multiplier.
+"""
+
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, Floor
+from django.utils import timezone
+from typing import Dict, Iterable, List
+from games.models import Game
+from users.models import LEVEL_THRESHOLDS, User
+from .models import Trophy, UserGameProgress, UserTrophy
+from .trophy_sets import rebuild_trophy_sets
+
+# Mirrors Trophy.get_base_points()
+BASE_POINTS = {
+    'bronze': 1,
+    'silver': 3,
+    'gold': 6,
+    'platinum': 15,
+}
+
+CHUNK_SIZE = 500
+
+
+def trophy_points(prefix: str = 'trophy__'):
+    """Expression for a trophy's stored score"""
+    return F(f"{prefix}points")
+
+
+def computed_trophy_points(prefix: str = '', multiplier=None):
+    """Expression for a trophy's score worked out from scratch, int(base points x game multiplier)"""
+    base_points = Case(
+        *[When(**{f"{prefix}trophy_type": trophy_type}, then=Value(points)) for trophy_type, points in BASE_POINTS.items()],
+        default=Value(1),
+        output_field=FloatField(),
+    )
+    if multiplier is None:
+        multiplier = F(f"{prefix}game__difficulty_multiplier")
+    return Floor(base_points * multiplier)
+
+
+def refresh_trophy_points(game_ids: Iterable[int] = None) -> int:
+    """Rewrite Trophy.points from the games' current multipliers (every game when game_ids is None)"""
+    multiplier = Subquery(
+        Game.objects.filter(pk=OuterRef('game_id')).values('difficulty_multiplier')[:1], output_field=FloatField()
+    )
+    points = computed_trophy_points(multiplier=multiplier)
+    if game_ids is None:
+        game_ids = Game.objects.filter(trophies__isnull=False).distinct().values_list('pk', flat=True)
+    
+    updated = 0
+    for chunk in _chunks(game_ids):
+        updated += Trophy.objects.filter(game_id__in=chunk).update(points=points)
+    return updated
+
+
+def stale_trophy_points():
+    """Trophies whose stored points don't match base points x their game's multiplier"""
+    return Trophy.objects.annotate(expected_points=computed_trophy_points()).exclude(points=F('expected_points'))
+
+
+def _sum_subquery(queryset, expression):
+    """Scalar subquery summing expression over queryset (0 when empty)"""
+    total = queryset.order_by().annotate(_group=Value(1)).values('_group').annotate(total=Sum(expression)).values('total')
+    return Coalesce(Subquery(total, output_field=IntegerField()), 0)
+
+
+def _count_subquery(queryset):
+    count = queryset.order_by().annotate(_group=Value(1)).values('_group').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(count, output_field=IntegerField()), 0)
+
+
+def _chunks(ids: Iterable[int]) -> Iterable[List[int]]:
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def _recompute_progress(progress) -> int:
+    """
+    Recompute earned counts, progress percentage, completion, scores and
+    last trophy date on a UserGameProgress queryset from the stored UserTrophy rows
+    """
+    earned = UserTrophy.objects.filter(
+        user_id=OuterRef('user_id'), trophy__game_id=OuterRef('game_id'), earned=True
+    )
+    # The same stored per-trophy points the earned score sums, so a completed game scores its maximum
+    max_score = _sum_subquery(Trophy.objects.filter(game_id=OuterRef('game_id')), F('points'))
+    total_available = Game.objects.filter(pk=OuterRef('game_id')).annotate(
+        total=F('bronze_count') + F('silver_count') + F('gold_count') + F('platinum_count')
+    ).values('total')
+    percentage = Case(
+        When(Q(_total_available__gt=0), then=F('_total_earned') * 100 / F('_total_available')),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    
+    last_earned = earned.filter(earned_datetime__isnull=False).order_by('-earned_datetime').values('earned_datetime')[:1]
+    
+    updated = progress.update(
+        total_score_earned=_sum_subquery(earned, trophy_points()),
+        max_possible_score=max_score,
+        last_trophy_date=Coalesce(Subquery(last_earned), F('last_trophy_date')),
+        **{
+            f"{trophy_type}_earned": _count_subquery(earned.filter(trophy__trophy_type=trophy_type))
+            for trophy_type in BASE_POINTS
+        },
+    )
+    # Percentage from the counts just written
+    progress.annotate(
+        _total_earned=F('bronze_earned') + F('silver_earned') + F('gold_earned') + F('platinum_earned'),
+        _total_available=Coalesce(Subquery(total_available, output_field=IntegerField()), 0),
+    ).update(progress_percentage=percentage)
+    progress.update(completed=Case(
+        When(progress_percentage=100, then=Value(True)), default=Value(False), output_field=BooleanField()
+    ))
+    progress.filter(completed=True, completion_date__isnull=True).update(completion_date=timezone.now())
+    return updated
+
+
+def recompute_progress_scores(user_ids: Iterable[int]) -> int:
+    """Recompute every UserGameProgress row, and trophy set, of the given users"""
+    updated = 0
+    for chunk in _chunks(user_ids):
+        with transaction.atomic():
+            updated += _recompute_progress(UserGameProgress.objects.filter(user_id__in=chunk))
+            rebuild_trophy_sets(chunk)
+    return updated
+
+
+def recompute_progress_rows(progress_ids: Iterable[int]) -> int:
+    """Recompute the given UserGameProgress rows and their trophy sets"""
+    updated = 0
+    for chunk in _chunks(progress_ids):
+        progress = UserGameProgress.objects.filter(pk__in=chunk)
+        with transaction.atomic():
+            updated += _recompute_progress(progress)
+            for game_id, user_ids in _users_by_game(progress).items():
+                rebuild_trophy_sets(user_ids, [game_id])
+    return updated
+
+
+def _users_by_game(progress) -> Dict[int, List[int]]:
+    users = {}
+    for user_id, game_id in progress.values_list('user_id', 'game_id').order_by():
+        users.setdefault(game_id, []).append(user_id)
+    return users
+
+
+def level_expression():
+    """Trophy level for a score, as a CASE over LEVEL_THRESHOLDS"""
+    return Case(
+        *[When(**{'total_trophy_score__gte': threshold}, then=Value(level))
+          for threshold, level in reversed(LEVEL_THRESHOLDS)],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def level_progress_expression():
+    """Percentage of the way from the current level's threshold to the next"""
+    whens = [When(total_trophy_score__gte=LEVEL_THRESHOLDS[-1][0], then=Value(100.0))]
+    for (threshold, _), (next_threshold, _) in reversed(list(zip(LEVEL_THRESHOLDS, LEVEL_THRESHOLDS[1:]))):
+        whens.append(When(
+            total_trophy_score__gte=threshold,
+            then=ExpressionWrapper(
+                (F('total_trophy_score') - Value(threshold)) * Value(100.0) / Value(float(next_threshold - threshold)),
+                output_field=FloatField(),
+            ),
+        ))
+    return Case(*whens, default=Value(0.0), output_field=FloatField())
+
+
+def recompute_user_scores(user_ids: Iterable[int]) -> int:
+    """Recompute total score, trophy counts, level and level progress for users"""
+    earned = UserTrophy.objects.filter(user_id=OuterRef('pk'), earned=True)
+    counts = {
+        f"{trophy_type}_count": _count_subquery(earned.filter(trophy__trophy_type=trophy_type))
+        for trophy_type in BASE_POINTS
+    }
+    now = timezone.now()
+    
+    updated = 0
+    for chunk in _chunks(user_ids):
+        users = User.objects.filter(pk__in=chunk)
+        updated += users.update(
+            total_trophy_score=_sum_subquery(earned, trophy_points()),
+            # Scores feed the cached profile - key it afresh. last_trophy_sync is
+            # left to the sync and import paths; a recompute isn't a PSN sync.
+            profile_updated=now,
+            **counts,
+        )
+        # Second statement so the level reads the new score
+        users.update(
+            current_trophy_level=level_expression(),
+            level_progress_percentage=level_progress_expression(),
+        )
+    return updated
+
+
+def stale_user_scores():
+    """Users whose total_trophy_score doesn't match the sum of their earned trophies' points"""
+    earned = UserTrophy.objects.filter(user_id=OuterRef('pk'), earned=True)
+    return User.objects.annotate(
+        expected_score=_sum_subquery(earned, trophy_points())
+    ).exclude(total_trophy_score=F('expected_score'))
+
+
+def recompute_scores(user_ids: Iterable[int]) -> int:
+    """Recompute per-game progress scores, then user totals and levels"""
+    user_ids = list(user_ids)
+    recompute_progress_scores(user_ids)
+    return recompute_user_scores(user_ids)
@@ -0,0 +1,36 @@
+# trophies/signals.py
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+import logging
+from games.signals import difficulty_multiplier_changed, difficulty_multipliers_changed
+from .admin_jobs import run_or_queue
+from .models import UserGameProgress
+from .scoring import refresh_trophy_points
+
+logger = logging.getLogger(__name__)
+
+
+def rescore_players(game_ids):
+    """
+    Recompute progress scores and user totals for everyone with progress
+    in the games - inline for a few players, as bulk admin jobs otherwise
+    """
+    progress = UserGameProgress.objects.filter(game_id__in=game_ids)
+    players = get_user_model().objects.filter(game_progress__game_id__in=game_ids).distinct()
+    for queryset, action in [(progress, 'recalculate_progress'), (players, 'recalculate_user_scores')]:
+        count, changed, job = run_or_queue(None, queryset, action)
+        if job:
+            logger.info(f"⏳ Rescoring {count} rows after a multiplier change: bulk admin job #{job.pk}")
+
+
+@receiver(difficulty_multiplier_changed)
+def refresh_points_after_multiplier_change(sender, game, **kwargs):
+    """Stored trophy points follow the game's multiplier, and players' scores follow the points"""
+    refresh_trophy_points([game.pk])
+    rescore_players([game.pk])
+
+
+@receiver(difficulty_multipliers_changed)
+def refresh_points_after_bulk_multiplier_change(sender, game_ids, **kwargs):
+    refresh_trophy_points(game_ids)
+    rescore_players(game_ids)
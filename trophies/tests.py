@@ -1,3 +1,344 @@
-from django.test import TestCase
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from games.models import Game
+from trophy_tracker.testing import QueryBudgetMixin
+from .admin_jobs import run_job, run_or_queue, run_pending_jobs
+from .events import compact_events, consume, consumer_lag, get_cursor, lag_expression, record_earned
+from .models import EventCursor, Trophy, TrophyEvent, UserGameProgress, UserTrophy, UserTrophySet, UserTrophySetEntry
+from .scoring import recompute_progress_rows, recompute_scores, recompute_user_scores, stale_user_scores
+from .trophy_sets import apply_to_trophy_sets, has_complete_sets, user_trophies
+
+User = get_user_model()
+
+
+class AdminChangelistQueryTests(QueryBudgetMixin, TestCase):
+    """Changelists run the same number of queries whatever the page size"""
+    
+    CHANGELISTS = [
+        ('admin:games_game_changelist', Game),
+        ('admin:trophies_trophy_changelist', Trophy),
+        ('admin:trophies_usertrophy_changelist', UserTrophy),
+        ('admin:trophies_usergameprogress_changelist', UserGameProgress),
+        ('admin:users_user_changelist', User),
+    ]
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        games = [
+            Game.objects.create(
+                np_communication_id=f'NPWR{i:05d}_00',
+                title=f'Game {i}',
+                platform='PS5',
+                difficulty_multiplier=1.0 + i,
+                bronze_count=4,
+                silver_count=2,
+                gold_count=1,
+                platinum_count=1,
+            )
+            for i in range(4)
+        ]
+        trophy_types = ['platinum', 'gold', 'silver', 'silver', 'bronze', 'bronze', 'bronze', 'bronze']
+        for game in games:
+            for trophy_id, trophy_type in enumerate(trophy_types):
+                Trophy.objects.create(
+                    game=game,
+                    trophy_id=trophy_id,
+                    name=f'{game.title} trophy {trophy_id}',
+                    description='',
+                    trophy_type=trophy_type,
+                    earn_rate=10.0 + trophy_id,
+                )
+        
+        for i in range(8):
+            user = User.objects.create_user(f'player{i}', psn_id=f'player{i}', bronze_count=i, level_progress_percentage=12.5)
+            for game in games:
+                UserGameProgress.objects.create(user=user, game=game, bronze_earned=1)
+                for trophy in game.trophies.all()[:3]:
+                    UserTrophy.objects.create(user=user, trophy=trophy, earned=True)
+    
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+    
+    def count_changelist_queries(self, url_name, model, per_page):
+        model_admin = admin.site._registry[model]
+        original = model_admin.list_per_page
+        model_admin.list_per_page = per_page
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(url_name))
+        finally:
+            model_admin.list_per_page = original
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+    
+    def test_constant_queries_per_page(self):
+        for url_name, model in self.CHANGELISTS:
+            with self.subTest(changelist=url_name):
+                small = self.count_changelist_queries(url_name, model, per_page=2)
+                large = self.count_changelist_queries(url_name, model, per_page=100)
+                self.assertEqual(small, large)
+    
+    def test_changelists_within_budget(self):
+        for url_name, model in self.CHANGELISTS:
+            with self.subTest(changelist=url_name):
+                self.assertQueryBudget(reverse(url_name))
+
+
+class ScoreRecomputeTests(TestCase):
+    """Recomputing scores doesn't pass for a PSN sync"""
+    
+    def test_recompute_leaves_last_trophy_sync(self):
+        game = Game.objects.create(np_communication_id='NPWR00100_00', title='Recompute', difficulty_multiplier=2.0)
+        trophy = Trophy.objects.create(game=game, trophy_id=0, name='Gold', trophy_type='gold')
+        user = User.objects.create_user('never_synced', psn_id='never_synced')
+        UserTrophy.objects.create(user=user, trophy=trophy, earned=True)
+        
+        recompute_user_scores([user.pk])
+        
+        user.refresh_from_db()
+        self.assertEqual(user.total_trophy_score, trophy.points)
+        self.assertEqual(user.gold_count, 1)
+        self.assertIsNone(user.last_trophy_sync)
+    
+    def test_completed_game_scores_its_maximum(self):
+        # floor(3 x 1.5) = 4, but each bronze stores floor(1.5) = 1 point
+        game = Game.objects.create(np_communication_id='NPWR00101_00', title='Floors', difficulty_multiplier=1.5, bronze_count=3)
+        user = User.objects.create_user('completionist')
+        for trophy_id in range(3):
+            trophy = Trophy.objects.create(game=game, trophy_id=trophy_id, name='Bronze', trophy_type='bronze')
+            UserTrophy.objects.create(user=user, trophy=trophy, earned=True)
+        progress = UserGameProgress.objects.create(user=user, game=game)
+        
+        recompute_scores([user.pk])
+        
+        progress.refresh_from_db()
+        self.assertTrue(progress.completed)
+        self.assertEqual((progress.total_score_earned, progress.max_possible_score), (3, 3))
+    
+    def test_multiplier_change_rescores_players(self):
+        game = Game.objects.create(np_communication_id='NPWR00102_00', title='Rescore', difficulty_multiplier=1.0, gold_count=1)
+        trophy = Trophy.objects.create(game=game, trophy_id=0, name='Gold', trophy_type='gold')
+        user = User.objects.create_user('rescored')
+        UserTrophy.objects.create(user=user, trophy=trophy, earned=True)
+        UserGameProgress.objects.create(user=user, game=game)
+        recompute_scores([user.pk])
+        
+        for inline_limit, multiplier in [(10, 2.0), (0, 3.0)]:
+            with self.subTest(inline_limit=inline_limit), override_settings(BULK_ADMIN_INLINE_LIMIT=inline_limit):
+                game.difficulty_multiplier = multiplier
+                game.save()
+                run_pending_jobs()
+                
+                user.refresh_from_db()
+                progress = UserGameProgress.objects.get(user=user, game=game)
+                self.assertEqual(user.total_trophy_score, 6 * multiplier)
+                self.assertEqual((progress.total_score_earned, progress.max_possible_score), (6 * multiplier, 6 * multiplier))
+                self.assertFalse(stale_user_scores().exists())
+
+
+@override_settings(BULK_ADMIN_INLINE_LIMIT=2)
+class BulkAdminJobTests(TestCase):
+    """Large admin selections are queued as a query and read back in keyset batches"""
+    
+    def setUp(self):
+        game = Game.objects.create(np_communication_id='NPWR00200_00', title='Bulk', difficulty_multiplier=1.0)
+        trophy = Trophy.objects.create(game=game, trophy_id=0, name='Bronze', trophy_type='bronze')
+        self.users = [User.objects.create_user(f'bulk{i}') for i in range(5)]
+        for user in self.users:
+            UserTrophy.objects.create(user=user, trophy=trophy, earned=True)
+        self.request = RequestFactory().post('/')
+        self.request.user = User.objects.create_superuser('bulk_admin', 'bulk@example.com', 'password')
+    
+    def test_small_selection_runs_inline(self):
+        count, changed, job = run_or_queue(self.request, User.objects.filter(pk__in=[self.users[0].pk]), 'recalculate_user_scores')
+        self.assertEqual((count, changed, job), (1, 1, None))
+    
+    def test_large_selection_is_queued_and_resumable(self):
+        selection = User.objects.filter(username__startswith='bulk').exclude(username='bulk_admin')
+        count, changed, job = run_or_queue(self.request, selection, 'recalculate_user_scores')
+        self.assertIsNone(changed)
+        self.assertEqual((count, job.total, job.model_label), (5, 5, 'users.User'))
+        self.assertEqual(sorted(job.items.values_list('object_pk', flat=True)), [user.pk for user in self.users])
+        
+        # Resume after the first two users, as if a previous run stopped there
+        job.last_pk = self.users[1].pk
+        job.processed = 2
+        job = run_job(job, chunk_size=2)
+        
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.processed, job.changed, job.last_pk), (5, 3, self.users[-1].pk))
+        scores = dict(User.objects.filter(pk__in=[user.pk for user in self.users]).values_list('pk', 'bronze_count'))
+        self.assertEqual([scores[user.pk] for user in self.users], [0, 0, 1, 1, 1])
+        self.assertFalse(job.items.exists())
+    
+    def test_derived_selection_is_staged(self):
+        # The progress admin's "recalculate scores" selects users through a join
+        game = Game.objects.get(np_communication_id='NPWR00200_00')
+        for user in self.users:
+            UserGameProgress.objects.create(user=user, game=game)
+        selection = User.objects.filter(game_progress__game=game).distinct()
+        count, changed, job = run_or_queue(self.request, selection, 'recalculate_user_scores')
+        self.assertEqual((count, job.items.count()), (5, 5))
+
+
+class TrophyEventOutboxTests(TestCase):
+    """Earned trophies land in the outbox and consumers read them exactly once"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(np_communication_id='NPWR00300_00', title='Outbox', difficulty_multiplier=2.0)
+        cls.trophies = [
+            Trophy.objects.create(game=cls.game, trophy_id=trophy_id, name=trophy_type.title(), trophy_type=trophy_type)
+            for trophy_id, trophy_type in enumerate(['platinum', 'gold', 'silver', 'bronze'])
+        ]
+        cls.user = User.objects.create_user('outbox', psn_id='outbox')
+    
+    def earn(self, trophies):
+        user_trophies = [
+            UserTrophy.objects.create(user=self.user, trophy=trophy, earned=True, earned_datetime=timezone.now())
+            for trophy in trophies
+        ]
+        record_earned(user_trophies)
+        return list(TrophyEvent.objects.order_by('pk'))
+    
+    def test_record_earned_skips_unearned(self):
+        UserTrophy.objects.create(user=self.user, trophy=self.trophies[0], earned=True)
+        UserTrophy.objects.create(user=self.user, trophy=self.trophies[1], earned=False)
+        # Trophy details are looked up when the relation isn't loaded
+        self.assertEqual(record_earned(UserTrophy.objects.filter(user=self.user)), 1)
+        
+        event = TrophyEvent.objects.get()
+        self.assertEqual((event.user_id, event.trophy_id, event.game_id), (self.user.pk, self.trophies[0].pk, self.game.pk))
+        self.assertEqual((event.trophy_type, event.points), ('platinum', self.trophies[0].points))
+        self.assertIsNotNone(event.earned_datetime)
+    
+    def test_consume_advances_cursor_in_batches(self):
+        events = self.earn(self.trophies[:3])
+        batches = []
+        
+        self.assertEqual(consume('test', batches.append, batch_size=2, settle_seconds=0), 3)
+        self.assertEqual([[event.pk for event in batch] for batch in batches], [[e.pk for e in events[:2]], [events[2].pk]])
+        cursor = get_cursor('test')
+        self.assertEqual((cursor.position, cursor.events_consumed), (events[-1].pk, 3))
+        
+        # Nothing new: the cursor doesn't move and the handler isn't called
+        self.assertEqual(consume('test', batches.append, settle_seconds=0), 0)
+        self.assertEqual(len(batches), 2)
+    
+    def test_failed_batch_is_retried(self):
+        events = self.earn(self.trophies[:2])
+        
+        def fail(batch):
+            raise RuntimeError('handler failed')
+        
+        with self.assertRaises(RuntimeError):
+            consume('test', fail, settle_seconds=0)
+        self.assertEqual(get_cursor('test').position, 0)
+        
+        batches = []
+        self.assertEqual(consume('test', batches.append, settle_seconds=0), 2)
+        self.assertEqual([event.pk for event in batches[0]], [event.pk for event in events])
+    
+    @override_settings(TROPHY_EVENT_SETTLE_SECONDS=60)
+    def test_unsettled_events_wait(self):
+        self.earn(self.trophies[:1])
+        batches = []
+        self.assertEqual(consumer_lag('test'), 0)
+        self.assertEqual(consume('test', batches.append), 0)
+        self.assertEqual(EventCursor.objects.annotate(lag=lag_expression()).get(consumer='test').lag, 0)
+        self.assertEqual((batches, get_cursor('test').position), ([], 0))
+    
+    @override_settings(TROPHY_EVENT_SETTLE_SECONDS=0)
+    def test_lag_expression_matches_consumer_lag(self):
+        events = self.earn(self.trophies)
+        get_cursor('behind')
+        EventCursor.objects.filter(consumer='behind').update(position=events[0].pk)
+        
+        lags = dict(EventCursor.objects.annotate(lag=lag_expression()).values_list('consumer', 'lag'))
+        self.assertEqual(lags['behind'], len(events) - 1)
+        self.assertEqual(lags['behind'], consumer_lag('behind'))
+    
+    def test_compact_respects_slowest_cursor(self):
+        events = self.earn(self.trophies)
+        TrophyEvent.objects.filter(pk__in=[event.pk for event in events[:3]]).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        EventCursor.objects.create(consumer='fast', position=events[-1].pk)
+        EventCursor.objects.create(consumer='slow', position=events[1].pk)
+        
+        self.assertEqual(compact_events(retain_days=30, dry_run=True), 2)
+        self.assertEqual(TrophyEvent.objects.count(), 4)
+        self.assertEqual(compact_events(batch_size=1, retain_days=30), 2)
+        self.assertEqual(list(TrophyEvent.objects.order_by('pk').values_list('pk', flat=True)), [e.pk for e in events[2:]])
+        
+        # Once the slow consumer catches up, only the retention window keeps events
+        EventCursor.objects.filter(consumer='slow').update(position=events[-1].pk)
+        self.assertEqual(compact_events(retain_days=30), 1)
+        self.assertEqual(list(TrophyEvent.objects.values_list('pk', flat=True)), [events[-1].pk])
+
+
+class TrophySetTests(TestCase):
+    """Trophy sets follow UserTrophy through the sync and set-based write paths"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(np_communication_id='NPWR00500_00', title='Sets', difficulty_multiplier=1.0, bronze_count=3)
+        cls.trophies = [
+            Trophy.objects.create(game=cls.game, trophy_id=trophy_id, name=f'Bronze {trophy_id}', trophy_type='bronze')
+            for trophy_id in range(3)
+        ]
+        cls.user = User.objects.create_user('sets', psn_id='sets')
+        cls.progress = UserGameProgress.objects.create(user=cls.user, game=cls.game)
+    
+    def earned_ids(self):
+        return [user_trophy.trophy.trophy_id for user_trophy in user_trophies(self.user, self.game)]
+    
+    def test_sync_folds_rows_into_the_set(self):
+        self.progress.update_progress()
+        self.assertEqual(UserTrophySet.objects.get(user=self.user, game=self.game).earned_count, 0)
+        
+        earned = UserTrophy.objects.create(user=self.user, trophy=self.trophies[2], earned=True, earned_datetime=timezone.now())
+        in_progress = UserTrophy.objects.create(user=self.user, trophy=self.trophies[0], progress_value=40)
+        self.assertEqual(apply_to_trophy_sets([earned, in_progress]), 2)
+        self.assertEqual(self.earned_ids(), [2])
+        
+        # Progress moving on updates its entry in place
+        in_progress.progress_value = 80
+        apply_to_trophy_sets([in_progress])
+        entry = UserTrophySetEntry.objects.get(trophy_set__user=self.user, trophy_id=0)
+        self.assertEqual((entry.progress_value, entry.earned_datetime), (80, None))
+        self.assertEqual(UserTrophySetEntry.objects.filter(trophy_set__user=self.user).count(), 2)
+        
+        # update_progress() leaves the folded set alone
+        self.progress.update_progress()
+        self.assertEqual(self.earned_ids(), [2])
+    
+    def test_progress_recompute_rebuilds_stale_sets(self):
+        UserTrophy.objects.create(user=self.user, trophy=self.trophies[0], earned=True, earned_datetime=timezone.now())
+        self.progress.update_progress()
+        apply_to_trophy_sets(UserTrophy.objects.filter(user=self.user))
+        
+        # A set-based write the set doesn't know about
+        UserTrophy.objects.bulk_create([UserTrophy(user=self.user, trophy=self.trophies[1], earned=True)])
+        recompute_progress_rows([self.progress.pk])
+        
+        self.assertEqual(sorted(self.earned_ids()), [0, 1])
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.bronze_earned, 2)
+    
+    def test_sets_are_complete_per_game(self):
+        other = Game.objects.create(np_communication_id='NPWR00501_00', title='Other', difficulty_multiplier=1.0)
+        # As many sets as progress rows, but for the wrong games
+        UserTrophySet.objects.create(user=self.user, game=other)
+        self.assertFalse(has_complete_sets(self.user))
+        
+        UserTrophySet.objects.create(user=self.user, game=self.game)
+        self.assertTrue(has_complete_sets(self.user))
 
-# Create your tests here.
@@ -0,0 +1,283 @@
+# trophies/trophy_sets.py
+"""
+Compact earned-trophy storage
+
+UserTrophySet keeps one row per (user, game) with an earned bitmap
+indexed by PSN trophy_id; UserTrophySetEntry keeps earned dates and
+progress for earned or in-progress trophies only. A game's worth of
+UserTrophy rows (earned and unearned) becomes one narrow row plus one
+entry per earned trophy.
+
+- apply_to_trophy_sets() folds newly saved UserTrophy rows into their
+  sets (the sync path); rebuild_trophy_sets() rewrites whole sets from
+  UserTrophy rows (build_trophy_sets, imports and score recomputes).
+- type_masks() / UserTrophySet.count_by_type() count by trophy type.
+- diff_users() compares two users game by game.
+- user_trophies() / recent_user_trophies() return UserTrophy instances
+  (unsaved, built from the sets) so code written against UserTrophy
+  keeps working; users whose sets aren't built yet read UserTrophy.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from typing import Dict, Iterable, List
+from .models import Trophy, UserGameProgress, UserTrophy, UserTrophySet, UserTrophySetEntry
+from .queries import LIVE_ROWS, game_user_trophies, untracked_trophies
+
+CHUNK_SIZE = 500
+
+TROPHY_TYPES = ['bronze', 'silver', 'gold', 'platinum']
+
+
+def _chunks(ids: Iterable[int]) -> Iterable[List[int]]:
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def type_masks(game_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Per game, a bitmap of which trophy ids are bronze, silver, gold and platinum"""
+    masks = {}
+    rows = Trophy.objects.filter(game_id__in=list(game_ids)).values_list('game_id', 'trophy_id', 'trophy_type')
+    for game_id, trophy_id, trophy_type in rows.order_by():
+        game_masks = masks.setdefault(game_id, dict.fromkeys(TROPHY_TYPES, 0))
+        game_masks[trophy_type] = game_masks.get(trophy_type, 0) | 1 << trophy_id
+    return masks
+
+
+def apply_to_trophy_sets(user_trophies: Iterable[UserTrophy]) -> int:
+    """
+    Fold saved UserTrophy rows into their sets: OR in the earned bits and
+    upsert one entry per earned or in-progress row, leaving the rest of
+    each set alone. Returns the number of entries written.
+    """
+    user_trophies = [user_trophy for user_trophy in user_trophies if user_trophy.earned or user_trophy.progress_value is not None]
+    if not user_trophies:
+        return 0
+    
+    trophy_field = UserTrophy._meta.get_field('trophy')
+    positions = {
+        user_trophy.trophy_id: (user_trophy.trophy.game_id, user_trophy.trophy.trophy_id)
+        for user_trophy in user_trophies if trophy_field.is_cached(user_trophy)
+    }
+    missing = {user_trophy.trophy_id for user_trophy in user_trophies} - positions.keys()
+    if missing:
+        for pk, game_id, trophy_id in Trophy.objects.filter(pk__in=missing).values_list('pk', 'game_id', 'trophy_id'):
+            positions[pk] = (game_id, trophy_id)
+    
+    by_set = {}
+    for user_trophy in user_trophies:
+        game_id, trophy_id = positions[user_trophy.trophy_id]
+        by_set.setdefault((user_trophy.user_id, game_id), []).append((trophy_id, user_trophy))
+    
+    entries = []
+    with transaction.atomic():
+        for (user_id, game_id), rows in by_set.items():
+            trophy_set, _ = UserTrophySet.objects.select_for_update().get_or_create(user_id=user_id, game_id=game_id)
+            bits = trophy_set.bits
+            for trophy_id, user_trophy in rows:
+                bits |= 1 << trophy_id if user_trophy.earned else 0
+                entries.append(UserTrophySetEntry(
+                    trophy_set=trophy_set,
+                    trophy_id=trophy_id,
+                    earned_datetime=user_trophy.earned_datetime if user_trophy.earned else None,
+                    progress_value=user_trophy.progress_value,
+                    progress_rate=user_trophy.progress_rate,
+                    progress_datetime=user_trophy.progress_datetime,
+                ))
+            if bits != trophy_set.bits:
+                trophy_set.bits = bits
+                trophy_set.save(update_fields=['earned_bits', 'earned_count', 'updated_at'])
+        UserTrophySetEntry.objects.bulk_create(
+            entries,
+            batch_size=CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=['trophy_set', 'trophy_id'],
+            update_fields=['earned_datetime', 'progress_value', 'progress_rate', 'progress_datetime'],
+        )
+    return len(entries)
+
+
+def rebuild_trophy_sets(user_ids: Iterable[int], game_ids: Iterable[int] = None) -> int:
+    """
+    Rewrite the users' trophy sets (for game_ids, or every game) from their
+    UserTrophy rows. Returns the number of sets written.
+    """
+    if game_ids is not None:
+        game_ids = list(game_ids)
+    
+    written = 0
+    for chunk in _chunks(user_ids):
+        rows = UserTrophy.objects.filter(user_id__in=chunk).filter(LIVE_ROWS)
+        progress = UserGameProgress.objects.filter(user_id__in=chunk)
+        if game_ids is not None:
+            rows = rows.filter(trophy__game_id__in=game_ids)
+            progress = progress.filter(game_id__in=game_ids)
+        
+        # Every game the user has progress in gets a set, even with nothing earned
+        bits = dict.fromkeys(progress.values_list('user_id', 'game_id').order_by(), 0)
+        entries = {}
+        for (user_id, game_id, trophy_id, earned, earned_datetime,
+             progress_value, progress_rate, progress_datetime) in rows.values_list(
+            'user_id', 'trophy__game_id', 'trophy__trophy_id', 'earned', 'earned_datetime',
+            'progress_value', 'progress_rate', 'progress_datetime',
+        ).order_by():
+            key = (user_id, game_id)
+            bits[key] = bits.get(key, 0) | (1 << trophy_id if earned else 0)
+            entries.setdefault(key, []).append(UserTrophySetEntry(
+                trophy_id=trophy_id,
+                earned_datetime=earned_datetime if earned else None,
+                progress_value=progress_value,
+                progress_rate=progress_rate,
+                progress_datetime=progress_datetime,
+            ))
+        if not bits:
+            continue
+        
+        sets = []
+        for (user_id, game_id), value in sorted(bits.items()):
+            trophy_set = UserTrophySet(user_id=user_id, game_id=game_id)
+            trophy_set.bits = value
+            sets.append(trophy_set)
+        
+        with transaction.atomic():
+            UserTrophySet.objects.bulk_create(
+                sets,
+                batch_size=CHUNK_SIZE,
+                update_conflicts=True,
+                unique_fields=['user', 'game'],
+                update_fields=['earned_bits', 'earned_count', 'updated_at'],
+            )
+            set_ids = {
+                (user_id, game_id): pk
+                for pk, user_id, game_id in UserTrophySet.objects.filter(
+                    user_id__in=chunk, game_id__in={game_id for _, game_id in bits}
+                ).values_list('pk', 'user_id', 'game_id')
+                if (user_id, game_id) in bits
+            }
+            UserTrophySetEntry.objects.filter(trophy_set_id__in=set_ids.values()).delete()
+            new_entries = []
+            for key, set_entries in entries.items():
+                for entry in set_entries:
+                    entry.trophy_set_id = set_ids[key]
+                    new_entries.append(entry)
+            UserTrophySetEntry.objects.bulk_create(new_entries, batch_size=CHUNK_SIZE)
+        written += len(sets)
+    return written
+
+
+def diff_users(user_a, user_b, game_ids: Iterable[int] = None) -> Dict[int, Dict[str, List[int]]]:
+    """
+    Per game either user has a set for, the trophy ids only user_a earned,
+    only user_b earned and both earned (keys only_mine / only_theirs / both)
+    """
+    sets = UserTrophySet.objects.filter(user__in=[user_a, user_b])
+    if game_ids is not None:
+        sets = sets.filter(game_id__in=list(game_ids))
+    
+    by_game = {}
+    for trophy_set in sets:
+        by_game.setdefault(trophy_set.game_id, {})[trophy_set.user_id] = trophy_set
+    
+    empty = UserTrophySet()
+    return {
+        game_id: pair.get(user_a.pk, empty).diff(pair.get(user_b.pk, empty))
+        for game_id, pair in by_game.items()
+    }
+
+
+def has_complete_sets(user) -> bool:
+    """True when every game the user has progress in has a trophy set"""
+    return not UserGameProgress.objects.filter(user=user).exclude(
+        game_id__in=UserTrophySet.objects.filter(user=user).values('game_id')
+    ).exists()
+
+
+def _as_user_trophies(user, trophy_sets, earned_only: bool) -> List[UserTrophy]:
+    """Unsaved UserTrophy instances for the given sets"""
+    trophies = Trophy.objects.filter(game_id__in=[trophy_set.game_id for trophy_set in trophy_sets]).select_related('game')
+    by_game = {}
+    for trophy in trophies:
+        by_game.setdefault(trophy.game_id, []).append(trophy)
+    entries = {
+        (entry.trophy_set_id, entry.trophy_id): entry
+        for entry in UserTrophySetEntry.objects.filter(trophy_set__in=trophy_sets)
+    }
+    
+    user_trophies = []
+    for trophy_set in trophy_sets:
+        bits = trophy_set.bits
+        for trophy in by_game.get(trophy_set.game_id, []):
+            earned = bool(bits >> trophy.trophy_id & 1)
+            if earned_only and not earned:
+                continue
+            entry = entries.get((trophy_set.pk, trophy.trophy_id))
+            user_trophies.append(UserTrophy(
+                user=user,
+                trophy=trophy,
+                earned=earned,
+                earned_datetime=entry.earned_datetime if entry else None,
+                progress_value=entry.progress_value if entry else None,
+                progress_rate=entry.progress_rate if entry else None,
+                progress_datetime=entry.progress_datetime if entry else None,
+            ))
+    return user_trophies
+
+
+def user_trophies(user, game=None, earned_only: bool = True) -> List[UserTrophy]:
+    """A user's trophies (for one game, or all), from the sets when built, else from UserTrophy"""
+    sets = UserTrophySet.objects.filter(user=user)
+    if game is not None:
+        sets = list(sets.filter(game=game))
+        complete = bool(sets)
+    else:
+        complete = has_complete_sets(user)
+        sets = list(sets) if complete else []
+    
+    if complete:
+        return _as_user_trophies(user, sets, earned_only)
+    
+    if not earned_only and game is not None:
+        return game_user_trophies(user, game)
+    
+    queryset = UserTrophy.objects.filter(user=user).select_related('trophy__game')
+    if game is not None:
+        queryset = queryset.filter(trophy__game=game)
+    if earned_only:
+        return list(queryset.filter(earned=True))
+    # Unearned trophies have no stored row
+    return list(queryset) + [
+        UserTrophy(user=user, trophy=trophy, earned=False)
+        for trophy in untracked_trophies(user).select_related('game')
+    ]
+
+
+def recent_user_trophies(user, limit: int = 10) -> List[UserTrophy]:
+    """The user's most recently earned trophies, newest first"""
+    if not has_complete_sets(user):
+        return list(UserTrophy.objects.filter(
+            user=user,
+            earned=True,
+            earned_datetime__isnull=False
+        ).select_related('trophy__game').order_by('-earned_datetime')[:limit])
+    
+    entries = list(UserTrophySetEntry.objects.filter(
+        trophy_set__user=user, earned_datetime__isnull=False
+    ).select_related('trophy_set').order_by('-earned_datetime')[:limit])
+    lookup = Q(pk__in=[])
+    for entry in entries:
+        lookup |= Q(game_id=entry.trophy_set.game_id, trophy_id=entry.trophy_id)
+    trophies = {(trophy.game_id, trophy.trophy_id): trophy for trophy in Trophy.objects.filter(lookup).select_related('game')}
+    
+    return [
+        UserTrophy(
+            user=user,
+            trophy=trophies[(entry.trophy_set.game_id, entry.trophy_id)],
+            earned=True,
+            earned_datetime=entry.earned_datetime,
+            progress_value=entry.progress_value,
+            progress_rate=entry.progress_rate,
+            progress_datetime=entry.progress_datetime,
+        )
+        for entry in entries if (entry.trophy_set.game_id, entry.trophy_id) in trophies
+    ]
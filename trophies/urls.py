@@ -6,4 +6,5 @@ app_name = 'trophies'
 urlpatterns = [
     path('my-collection/', views.my_trophy_collection, name='my_collection'),
     path('sync/', views.sync_trophies, name='sync_trophies'),
+    path('export/<str:fmt>/', views.export_my_trophies, name='export'),
 ]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from . import exports
 
 @login_required
 def my_trophy_collection(request):
@@ -9,3 +11,23 @@ def my_trophy_collection(request):
 @login_required
 def sync_trophies(request):
     return HttpResponse("Trophy sync - Coming soon!")
+
+@login_required
+def export_my_trophies(request, fmt):
+    """Stream the user's full trophy history as CSV or NDJSON (?gzip=1, ?earned=1)"""
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest("Export format must be csv or ndjson")
+    
+    compress = request.GET.get('gzip') == '1'
+    earned_only = request.GET.get('earned') == '1'
+    rows = exports.user_export_rows(request.user, earned_only=earned_only)
+    
+    response = StreamingHttpResponse(
+        exports.encode(rows, exports.EXPORT_COLUMNS, fmt, compress=compress),
+        content_type='application/gzip' if compress else exports.FORMATS[fmt][0],
+    )
+    filename = exports.export_filename(
+        f"trophies_{request.user.username}_{timezone.now():%Y%m%d}", fmt, compress
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,108 @@
+# trophy_tracker/caching.py
+"""
+Namespaced, versioned caching on top of Django's cache framework
+
+Every key lives in a namespace ('home', 'profile', ...) whose version is
+itself stored in the cache. Invalidating a namespace bumps that version,
+so all of its keys go stale at once on every backend (locmem, file or a
+shared Redis/Memcached) without having to know or delete the keys.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+from trophy_tracker import metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    """The cache alias used for page data (CACHE_ALIAS setting)"""
+    return caches[getattr(settings, 'CACHE_ALIAS', 'default')]
+
+
+def _record(namespace: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'invalidations': 0})
+        counters[outcome] += 1
+
+
+def _fresh_version() -> int:
+    # Seeded from the clock so a lost (evicted) version never revives old keys
+    return int(time.time() * 1000)
+
+
+def namespace_version(namespace: str) -> int:
+    """Current version of a namespace"""
+    version_key = f"{settings.CACHE_KEY_PREFIX}:{namespace}:version"
+    cache = get_cache()
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, _fresh_version(), timeout=None)
+        version = cache.get(version_key) or _fresh_version()
+    return version
+
+
+def make_key(namespace: str, name: str) -> str:
+    """Build a versioned key, e.g. tt:home:v<version>:top_users"""
+    return f"{settings.CACHE_KEY_PREFIX}:{namespace}:v{namespace_version(namespace)}:{name}"
+
+
+def cached(namespace: str, name: str, producer: Callable[[], Any], timeout: int = None) -> Any:
+    """Return the cached value for namespace/name, computing it with producer() on a miss"""
+    key = make_key(namespace, name)
+    value = get_cache().get(key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, 'hits')
+        return value
+    
+    _record(namespace, 'misses')
+    value = producer()
+    get_cache().set(key, value, timeout if timeout is not None else settings.CACHE_DEFAULT_TIMEOUT)
+    return value
+
+
+def invalidate(namespace: str):
+    """Invalidate every key in a namespace by bumping its version"""
+    version_key = f"{settings.CACHE_KEY_PREFIX}:{namespace}:version"
+    cache = get_cache()
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # Version not set yet (or evicted)
+        cache.set(version_key, _fresh_version(), timeout=None)
+    _record(namespace, 'invalidations')
+    logger.info(f"🧹 Invalidated cache namespace '{namespace}'")
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Per-namespace hit/miss/invalidation counters for this process"""
+    with _stats_lock:
+        return {namespace: dict(counters) for namespace, counters in _stats.items()}
+
+
+def cache_samples():
+    """Metrics collector: per-namespace cache lookups and hit ratio"""
+    samples = []
+    for namespace, counters in cache_stats().items():
+        lookups = counters['hits'] + counters['misses']
+        samples.append(('cache_hits', {'namespace': namespace}, counters['hits']))
+        samples.append(('cache_misses', {'namespace': namespace}, counters['misses']))
+        samples.append(('cache_invalidations', {'namespace': namespace}, counters['invalidations']))
+        samples.append(('cache_hit_ratio', {'namespace': namespace}, round(counters['hits'] / lookups, 4) if lookups else 0.0))
+    return samples
+
+
+metrics.describe('cache_hits', 'counter', 'Cache hits per namespace since process start')
+metrics.describe('cache_misses', 'counter', 'Cache misses per namespace since process start')
+metrics.describe('cache_invalidations', 'counter', 'Namespace invalidations since process start')
+metrics.describe('cache_hit_ratio', 'gauge', 'Share of cache lookups answered from the cache')
+metrics.register_collector(cache_samples)
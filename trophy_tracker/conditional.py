@@ -0,0 +1,48 @@
+# trophy_tracker/conditional.py
+"""
+ETag / Last-Modified support built on django.views.decorators.http.condition
+
+A view declares one validators function returning (etag, last_modified)
+from cheap timestamp lookups. It runs once per request, before the view,
+and a matching If-None-Match / If-Modified-Since gets a 304 without the
+view's own queries or template rendering.
+"""
+
+from django.views.decorators.http import condition
+from functools import wraps
+from trophy_tracker import metrics
+
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def conditional_view(name, validators):
+    """
+    Decorate a view with conditional GET support; validators(request, *args, **kwargs)
+    returns (etag, last_modified) or None when the response must not be validated
+    """
+    def decorator(view):
+        def get_validators(request, *args, **kwargs):
+            if not hasattr(request, '_conditional_validators'):
+                request._conditional_validators = validators(request, *args, **kwargs) or (None, None)
+            return request._conditional_validators
+        
+        conditional = condition(
+            etag_func=lambda request, *args, **kwargs: get_validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: get_validators(request, *args, **kwargs)[1],
+        )(view)
+        
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and any(header in request.META for header in CONDITIONAL_HEADERS):
+                outcome = 'not_modified' if response.status_code == 304 else 'modified'
+                metrics.increment('conditional_responses', view=name, outcome=outcome)
+            return response
+        
+        return wrapper
+    return decorator
+
+
+def timestamp_token(value):
+    """Compact, stable ETag component for an optional datetime"""
+    return f"{value.timestamp():.6f}" if value else '0'
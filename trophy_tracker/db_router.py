@@ -0,0 +1,187 @@
+# trophy_tracker/db_router.py
+"""
+Read-replica routing
+
+Reads go to a replica only inside views marked with @replica_reads (or
+API viewsets using ReplicaReadsMixin), and only for GET/HEAD. Everything
+else - writes, and reads anywhere else - uses 'default'.
+
+- Replicas are the REPLICA_DATABASES aliases (default: every alias
+  starting with 'replica').
+- Replicas lagging more than REPLICA_MAX_LAG seconds are skipped; with
+  none healthy, reads fall back to the primary.
+- A user whose request wrote to the database, or whose sync just
+  finished, reads from the primary for REPLICA_STICKY_SECONDS
+  (read-your-writes).
+
+Local testing with SQLite: add a 'replica' alias whose NAME is a copy of
+the primary file. Its lag is how long the primary has been written to
+since the copy was made.
+"""
+
+from django.conf import settings
+from django.db import connections
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import logging
+import math
+import os
+import random
+import threading
+import time
+from trophy_tracker import metrics
+from trophy_tracker.caching import get_cache
+
+logger = logging.getLogger(__name__)
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_wrote = ContextVar('primary_write', default=False)
+
+_lag_checks = {}
+_lag_lock = threading.Lock()
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases():
+    configured = getattr(settings, 'REPLICA_DATABASES', None)
+    if configured is not None:
+        return list(configured)
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def measure_lag(alias: str) -> float:
+    """Seconds the replica is behind the primary (inf if it can't be reached)"""
+    connection = connections[alias]
+    try:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL)
+                return float(cursor.fetchone()[0])
+        if connection.vendor == 'sqlite':
+            primary = settings.DATABASES['default']['NAME']
+            replica = settings.DATABASES[alias]['NAME']
+            return max(0.0, os.path.getmtime(primary) - os.path.getmtime(replica))
+        return 0.0
+    except Exception as e:
+        logger.warning(f"⚠️ Replica {alias} lag check failed: {e}")
+        return math.inf
+
+
+def replica_lag(alias: str) -> float:
+    """Lag for alias, re-measured at most every REPLICA_LAG_CHECK_INTERVAL seconds per process"""
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag_checks.get(alias)
+        if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return checked[1]
+        # Claim the check so concurrent requests reuse the previous value meanwhile
+        _lag_checks[alias] = (now, checked[1] if checked else 0.0)
+    
+    lag = measure_lag(alias)
+    with _lag_lock:
+        _lag_checks[alias] = (time.monotonic(), lag)
+    metrics.set_gauge('db_replica_lag_seconds', lag if lag != math.inf else -1, alias=alias)
+    return lag
+
+
+def healthy_replicas():
+    return [alias for alias in replica_aliases() if replica_lag(alias) <= settings.REPLICA_MAX_LAG]
+
+
+class ReplicaRouter:
+    """Sends reads inside replica_reads() to a healthy replica, everything else to default"""
+    
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db  # related objects come from the same database
+        replicas = healthy_replicas()
+        if not replicas:
+            return None
+        return random.choice(replicas)
+    
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db not in replica_aliases()
+
+
+@contextmanager
+def use_replicas():
+    """Route reads in this block to a replica (when one is healthy)"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _sticky_key(user_id):
+    return f"{settings.CACHE_KEY_PREFIX}:db_primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Serve user_id's reads from the primary for the next REPLICA_STICKY_SECONDS"""
+    get_cache().set(_sticky_key(user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(request) -> bool:
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and get_cache().get(_sticky_key(user.pk)))
+
+
+def replica_reads(view):
+    """Decorator: serve a read-only view's GET/HEAD queries from a replica"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not replica_aliases() or is_pinned(request):
+            return view(request, *args, **kwargs)
+        with use_replicas():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadsMixin:
+    """DRF viewset mixin: read-only requests are served from a replica"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not replica_aliases() or is_pinned(request):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replicas():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryStickinessMiddleware:
+    """Pins a user to the primary after any request of theirs that wrote to the database"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _wrote.reset(token)
+        
+        if wrote and replica_aliases() and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return response
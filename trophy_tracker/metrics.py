@@ -0,0 +1,200 @@
+# trophy_tracker/metrics.py
+"""
+In-process metric counters, gauges and histograms
+
+Metrics are identified by a name plus optional labels, e.g.
+increment('conditional_responses', view='profile', outcome='not_modified').
+Updates only touch a dict under a lock - nothing is written to the
+database. Values that live in the database (queue depth, jobs by status)
+come from collectors registered with register_collector(), which run
+when /metrics is scraped. Every process keeps its own registry.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+_counters = {}
+_gauges = {}
+_histograms = {}
+_descriptions = {}
+_collectors = []
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'trophy_tracker'
+
+# Seconds - covers sub-millisecond cache work up to slow PSN calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds - queue waits and whole sync jobs
+LONG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+def _key(name: str, labels: Dict[str, str]) -> Tuple:
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def increment(name: str, amount: int = 1, **labels):
+    """Add amount to a labelled counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def get_counter(name: str, **labels) -> int:
+    """Current value of one labelled counter"""
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def counters(name: str = None) -> Dict[Tuple, int]:
+    """All counters (or those called name) keyed by (name, labels)"""
+    with _lock:
+        return {key: value for key, value in _counters.items() if name is None or key[0] == name}
+
+
+def set_gauge(name: str, value: float, **labels):
+    """Set a labelled gauge"""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def get_gauge(name: str, **labels) -> float:
+    with _lock:
+        return _gauges.get(_key(name, labels), 0)
+
+
+def observe(name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS, **labels):
+    """Record value in a labelled histogram (buckets are fixed by the first observation)"""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': tuple(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        index = bisect.bisect_left(histogram['buckets'], value)
+        if index < len(histogram['counts']):
+            histogram['counts'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+
+def histograms(name: str = None) -> Dict[Tuple, Dict]:
+    """Snapshot of all histograms (or those called name) keyed by (name, labels)"""
+    with _lock:
+        return {
+            key: {**value, 'counts': list(value['counts'])}
+            for key, value in _histograms.items() if name is None or key[0] == name
+        }
+
+
+def describe(name: str, kind: str, help_text: str):
+    """Declare a metric's Prometheus type ('counter', 'gauge', 'histogram') and help text"""
+    _descriptions[name] = (kind, help_text)
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]):
+    """
+    Register a function run at scrape time, returning (name, labels,
+    value) samples - for values read from the database or other modules.
+    Samples are gauges unless the name is described as a counter, for
+    running totals kept outside this registry.
+    """
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def collect() -> List[Tuple[str, Dict[str, str], float]]:
+    """Samples from every registered collector (a failing collector is skipped)"""
+    samples = []
+    for collector in list(_collectors):
+        try:
+            samples.extend(collector())
+        except Exception as e:
+            logger.warning(f"⚠️ Metrics collector {collector.__name__} failed: {e}")
+            increment('metrics_collector_errors', collector=collector.__name__)
+    return samples
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(int(value))
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    collected = collect()
+    with _lock:
+        counter_items = sorted(_counters.items())
+        gauge_items = dict(_gauges)
+        histogram_items = sorted(
+            (key, {**value, 'counts': list(value['counts'])}) for key, value in _histograms.items()
+        )
+    for name, labels, value in collected:
+        if _descriptions.get(name, ('gauge',))[0] == 'counter':
+            counter_items.append((_key(name, labels), value))
+        else:
+            gauge_items[_key(name, labels)] = value
+    counter_items.sort()
+    
+    families = {}
+    for (name, labels), value in counter_items:
+        families.setdefault((name, 'counter'), []).append((f"{PREFIX}_{name}_total", labels, value))
+    for (name, labels), value in sorted(gauge_items.items()):
+        families.setdefault((name, 'gauge'), []).append((f"{PREFIX}_{name}", labels, value))
+    for (name, labels), histogram in histogram_items:
+        samples = families.setdefault((name, 'histogram'), [])
+        cumulative = 0
+        for bound, count in zip(histogram['buckets'], histogram['counts']):
+            cumulative += count
+            samples.append((f"{PREFIX}_{name}_bucket", labels + (('le', _format_value(float(bound))),), cumulative))
+        samples.append((f"{PREFIX}_{name}_bucket", labels + (('le', '+Inf'),), histogram['count']))
+        samples.append((f"{PREFIX}_{name}_sum", labels, histogram['sum']))
+        samples.append((f"{PREFIX}_{name}_count", labels, histogram['count']))
+    
+    lines = []
+    for (name, kind), samples in sorted(families.items()):
+        family = f"{PREFIX}_{name}" + ('_total' if kind == 'counter' else '')
+        help_text = _descriptions.get(name, (kind, name.replace('_', ' ')))[1]
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def conditional_hit_rates() -> Dict[str, Dict[str, float]]:
+    """Per-view share of conditional requests answered with 304 Not Modified"""
+    rates = {}
+    for (name, labels), value in counters('conditional_responses').items():
+        labels = dict(labels)
+        view = rates.setdefault(labels['view'], {'requests': 0, 'not_modified': 0})
+        view['requests'] += value
+        if labels['outcome'] == 'not_modified':
+            view['not_modified'] += value
+    
+    for view in rates.values():
+        view['hit_rate'] = round(view['not_modified'] / view['requests'], 3) if view['requests'] else 0.0
+    return rates
+
+
+def reset():
+    """Clear all counters, gauges and histograms (tests)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
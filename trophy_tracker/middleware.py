@@ -0,0 +1,124 @@
+# trophy_tracker/middleware.py
+"""
+Opt-in per-request query profiling (QUERY_PROFILING setting)
+
+Counts queries and DB time on every database connection, keeps the
+slowest statements and the most repeated SQL template (the usual N+1
+signature), adds X-DB-* / Server-Timing headers, logs one JSON line per
+request and flags requests over their QUERY_BUDGETS entry.
+"""
+
+from django.conf import settings
+from django.db import connections
+from contextlib import ExitStack
+from fnmatch import fnmatchcase
+import json
+import logging
+import time
+from collections import Counter
+from typing import Optional
+from trophy_tracker import metrics
+
+logger = logging.getLogger('trophy_tracker.profiling')
+
+
+def get_query_budget(view_name: Optional[str], path: str) -> Optional[int]:
+    """
+    Query budget for a request: the QUERY_BUDGETS entry matching the URL
+    name (e.g. 'users:profile', 'admin:*_changelist') or, failing that,
+    the path (e.g. '/api/v1/*'); else QUERY_BUDGET_DEFAULT
+    """
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    for pattern, budget in budgets.items():
+        if view_name and fnmatchcase(view_name, pattern):
+            return budget
+    for pattern, budget in budgets.items():
+        if pattern.startswith('/') and fnmatchcase(path, pattern):
+            return budget
+    return getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+
+
+class QueryRecorder:
+    """execute_wrapper hook collecting count, time and slowest statements"""
+    
+    def __init__(self, keep_slowest: int = 5):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = []
+        self.templates = Counter()
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.templates[sql] += 1
+            if len(self.slowest) < self.keep_slowest or elapsed > self.slowest[-1][0]:
+                self.slowest.append((elapsed, context['connection'].alias, sql))
+                self.slowest.sort(key=lambda item: -item[0])
+                del self.slowest[self.keep_slowest:]
+    
+    def most_repeated(self):
+        """(sql, times) of the most repeated statement, if any ran more than once"""
+        if not self.templates:
+            return None
+        sql, times = self.templates.most_common(1)[0]
+        return (sql, times) if times > 1 else None
+
+
+class QueryProfilingMiddleware:
+    """Records queries, DB time and slowest statements per request"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        recorder = QueryRecorder(keep_slowest=getattr(settings, 'QUERY_PROFILING_SLOWEST', 5))
+        started = time.perf_counter()
+        
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.seconds * 1000
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        budget = get_query_budget(view_name, request.path)
+        over_budget = budget is not None and recorder.count > budget
+        
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f"{db_ms:.1f}"
+        response['Server-Timing'] = f"db;dur={db_ms:.1f};desc=\"{recorder.count} queries\", total;dur={total_ms:.1f}"
+        if budget is not None:
+            response['X-DB-Query-Budget'] = f"{recorder.count}/{budget}" + (' exceeded' if over_budget else '')
+        
+        repeated = recorder.most_repeated()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 1),
+            'total_ms': round(total_ms, 1),
+            'budget': budget,
+            'slowest': [
+                {'ms': round(seconds * 1000, 2), 'db': alias, 'sql': sql[:300]}
+                for seconds, alias, sql in recorder.slowest
+            ],
+            'most_repeated': {'times': repeated[1], 'sql': repeated[0][:300]} if repeated else None,
+        }
+        
+        if over_budget:
+            metrics.increment('query_budget_exceeded', view=view_name or request.path)
+            logger.warning(f"🐢 Query budget exceeded: {json.dumps(record)}")
+        else:
+            logger.info(json.dumps(record))
+        
+        return response
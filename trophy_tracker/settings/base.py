@@ -25,6 +25,8 @@ INSTALLED_APPS = [
     'trophies',
     'rankings',
     'psn_integration',
+    'api',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -33,6 +35,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'trophy_tracker.db_router.PrimaryStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -69,13 +72,30 @@ DATABASES = {
     }
 }
 
-# Alternative: SQLite for development (uncomment if you don't want PostgreSQL)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.sqlite3',
-#         'NAME': BASE_DIR / 'db.sqlite3',
-#     }
-# }
+# Alternative: SQLite for development (DB_ENGINE=sqlite if you don't want PostgreSQL)
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# Read replicas (trophy_tracker.db_router): same credentials, one alias per host
+for _index, _host in enumerate(host.strip() for host in config('DB_REPLICA_HOSTS', default='').split(',') if host.strip()):
+    DATABASES['replica' if _index == 0 else f'replica_{_index + 1}'] = {
+        **DATABASES['default'], 'HOST': _host, 'TEST': {'MIRROR': 'default'},
+    }
+# Local testing: a copy of the SQLite primary acts as the replica
+if config('DB_REPLICA_NAME', default='') and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['replica'] = {
+        **DATABASES['default'], 'NAME': config('DB_REPLICA_NAME'), 'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['trophy_tracker.db_router.ReplicaRouter']
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=5.0, cast=float)  # seconds behind before falling back
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=5, cast=int)  # seconds
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=60, cast=int)  # read-your-writes window
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -127,6 +147,107 @@ PSN_TOKEN_ENCRYPTION_KEY = config(
     default=base64.urlsafe_b64encode(b'your-32-byte-key-here-for-dev-only!').decode()
 )
 
+# PSN circuit breaker (shared across sync workers)
+PSN_BREAKER_FAILURE_THRESHOLD = config('PSN_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+PSN_BREAKER_BASE_DELAY = config('PSN_BREAKER_BASE_DELAY', default=30, cast=int)  # seconds
+PSN_BREAKER_MAX_DELAY = config('PSN_BREAKER_MAX_DELAY', default=900, cast=int)  # seconds
+PSN_BREAKER_PROBE_TIMEOUT = config('PSN_BREAKER_PROBE_TIMEOUT', default=120, cast=int)  # seconds
+
+# PSN rate limit (headroom reported on /metrics)
+PSN_RATE_LIMIT_CALLS = config('PSN_RATE_LIMIT_CALLS', default=300, cast=int)
+PSN_RATE_LIMIT_WINDOW = config('PSN_RATE_LIMIT_WINDOW', default=900, cast=int)  # seconds
+
+# PSN API call log retention (rollup_api_calls command)
+PSN_API_CALL_RETENTION_DAYS = config('PSN_API_CALL_RETENTION_DAYS', default=14, cast=int)
+PSN_API_CALL_ARCHIVE_DIR = config('PSN_API_CALL_ARCHIVE_DIR', default='')
+
+# Sync job retention (archive_sync_jobs command)
+PSN_SYNC_JOBS_KEEP_PER_USER = config('PSN_SYNC_JOBS_KEEP_PER_USER', default=20, cast=int)
+
+# PSN ID validation cache (per-process LRU in front of PSNUserValidation)
+PSN_VALIDATION_CACHE_SIZE = config('PSN_VALIDATION_CACHE_SIZE', default=1024, cast=int)
+PSN_VALIDATION_CACHE_TTL = config('PSN_VALIDATION_CACHE_TTL', default=24 * 3600, cast=int)  # seconds
+PSN_VALIDATION_NEGATIVE_TTL = config('PSN_VALIDATION_NEGATIVE_TTL', default=600, cast=int)  # seconds
+
+# PSN backend: 'live' talks to PSN, 'replay' serves recorded fixtures (psn_integration.simulator)
+PSN_BACKEND = config('PSN_BACKEND', default='live')
+PSN_REPLAY_FIXTURES_DIR = config('PSN_REPLAY_FIXTURES_DIR', default=str(BASE_DIR / 'psn_fixtures'))
+PSN_REPLAY_LATENCY_MS = config('PSN_REPLAY_LATENCY_MS', default=0, cast=int)
+PSN_REPLAY_JITTER_MS = config('PSN_REPLAY_JITTER_MS', default=0, cast=int)
+PSN_REPLAY_ERROR_RATE = config('PSN_REPLAY_ERROR_RATE', default=0.0, cast=float)
+PSN_REPLAY_RATE_LIMIT_RATE = config('PSN_REPLAY_RATE_LIMIT_RATE', default=0.0, cast=float)
+PSN_REPLAY_SEED = config('PSN_REPLAY_SEED', default=None, cast=lambda v: int(v) if v not in (None, '') else None)
+
+# Caching - CACHE_BACKEND is locmem (per process), file, redis or memcached.
+# Use a shared backend in production so sync workers' invalidations reach web processes.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_DEFAULT_TIMEOUT = config('CACHE_DEFAULT_TIMEOUT', default=300, cast=int)  # seconds
+CACHE_KEY_PREFIX = config('CACHE_KEY_PREFIX', default='tt')
+CACHE_ALIAS = 'default'
+PROFILE_CACHE_TIMEOUT = config('PROFILE_CACHE_TIMEOUT', default=3600, cast=int)  # keys change on sync anyway
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'trophy-tracker'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'dummy': ('django.core.cache.backends.dummy.DummyCache', ''),
+}
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=_CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': CACHE_DEFAULT_TIMEOUT,
+    }
+}
+
+# Read API (api app, mounted at /api/v1/)
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'] + (
+        ['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []
+    ),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.AnonRateThrottle',
+        'rest_framework.throttling.UserRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': config('API_ANON_RATE', default='120/min'),
+        'user': config('API_USER_RATE', default='600/min'),
+    },
+}
+
+# Trophy exports (trophies.exports) - rows fetched per database round trip
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Query profiling (trophy_tracker.middleware.QueryProfilingMiddleware)
+QUERY_PROFILING = config('QUERY_PROFILING', default=False, cast=bool)
+QUERY_PROFILING_SLOWEST = config('QUERY_PROFILING_SLOWEST', default=5, cast=int)
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=30, cast=int)
+# URL name (or '/path/*') patterns -> max queries per request
+QUERY_BUDGETS = {
+    'users:home': 10,
+    'users:profile': 15,
+    'users:public_profile': 15,
+    'api:*': 10,
+    'search:*': 5,
+    'admin:*_changelist': 15,
+}
+if QUERY_PROFILING:
+    MIDDLEWARE.insert(0, 'trophy_tracker.middleware.QueryProfilingMiddleware')
+
+# Prometheus /metrics - bearer token for scrapers (staff users can always read it)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Admin bulk actions over more objects than this are queued for run_admin_jobs
+BULK_ADMIN_INLINE_LIMIT = config('BULK_ADMIN_INLINE_LIMIT', default=2000, cast=int)
+
+# Trophy event outbox - events younger than the settle window aren't handed to consumers
+# yet (ids are allocated before commit); consumed events older than the retention are compacted
+TROPHY_EVENT_SETTLE_SECONDS = config('TROPHY_EVENT_SETTLE_SECONDS', default=10, cast=int)
+TROPHY_EVENT_RETENTION_DAYS = config('TROPHY_EVENT_RETENTION_DAYS', default=30, cast=int)
+
 # Session settings
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 SESSION_COOKIE_SECURE = not DEBUG
@@ -163,6 +284,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'trophy_tracker.profiling': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -0,0 +1,73 @@
+# trophy_tracker/testing.py
+"""
+Test helpers for query budgets
+
+    with query_budget(5):
+        client.get(url)
+
+    class ProfileTests(QueryBudgetMixin, TestCase):
+        def test_profile(self):
+            self.assertQueryBudget(reverse('users:profile'))  # QUERY_BUDGETS entry
+
+Both fail with the captured statements and the most repeated one, which
+is usually the N+1.
+"""
+
+from django.db import connections
+from django.urls import resolve
+from contextlib import ExitStack, contextmanager
+from typing import Optional
+from .middleware import QueryRecorder, get_query_budget
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block or view ran more queries than its budget"""
+    pass
+
+
+def _failure_message(label, recorder, budget):
+    lines = [f"{label} ran {recorder.count} queries, budget is {budget}"]
+    repeated = recorder.most_repeated()
+    if repeated:
+        lines.append(f"Most repeated ({repeated[1]}x): {repeated[0]}")
+    lines.append('Slowest:')
+    lines.extend(f"  {seconds * 1000:.2f}ms {sql}" for seconds, alias, sql in recorder.slowest)
+    return '\n'.join(lines)
+
+
+@contextmanager
+def query_budget(budget: int, label: str = 'Block', using: Optional[str] = None):
+    """Fail if the block runs more than budget queries (on using, or every database)"""
+    recorder = QueryRecorder()
+    aliases = [using] if using else list(connections)
+    
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+    
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(_failure_message(label, recorder, budget))
+
+
+def assert_query_budget(client, url: str, budget: Optional[int] = None, method: str = 'get', **kwargs):
+    """
+    Request url with client and fail if it exceeds budget - by default the
+    QUERY_BUDGETS / QUERY_BUDGET_DEFAULT budget the middleware applies
+    """
+    if budget is None:
+        path = url.split('?')[0]
+        budget = get_query_budget(resolve(path).view_name, path)
+    if budget is None:
+        raise ValueError(f"No query budget configured for {url}")
+    
+    with query_budget(budget, label=f"{method.upper()} {url}"):
+        response = getattr(client, method)(url, **kwargs)
+    return response
+
+
+class QueryBudgetMixin:
+    """TestCase mixin adding assertQueryBudget()"""
+    
+    def assertQueryBudget(self, url, budget=None, method='get', **kwargs):
+        return assert_query_budget(self.client, url, budget=budget, method=method, **kwargs)
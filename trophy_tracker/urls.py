@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from trophy_tracker.views import prometheus_metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,6 +16,9 @@ urlpatterns = [
     path('trophies/', include('trophies.urls')),
     path('rankings/', include('rankings.urls')),
     path('psn/', include('psn_integration.urls')),  # Add PSN integration URLs
+    path('api/v1/', include('api.urls')),  # Read-only REST API
+    path('search/', include('search.urls')),
+    path('metrics', prometheus_metrics, name='metrics'),  # Prometheus scrape endpoint
 ]
 
 # Serve media files in development
@@ -0,0 +1,24 @@
+# trophy_tracker/views.py
+"""
+Project-level views
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+import hmac
+from trophy_tracker import caching, metrics  # caching registers its collector on import
+
+
+@never_cache
+@require_GET
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint - METRICS_TOKEN bearer token or a staff session"""
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(token) and hmac.compare_digest(authorization, f"Bearer {token}")
+    if not token_ok and not request.user.is_staff:
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
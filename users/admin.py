@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import F
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import User
+from trophies.admin_jobs import queued_message, run_or_queue
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -62,8 +64,8 @@ class UserAdmin(BaseUserAdmin):
         progress_bar = self.get_progress_bar(obj.level_progress_percentage)
         
         return format_html(
-            '<span style="color: {}; font-weight: bold;">Level {}: {}</span><br/>{}<br/><small>{:.1f}% to next level</small>',
-            color, obj.current_trophy_level, level_name, progress_bar, obj.level_progress_percentage
+            '<span style="color: {}; font-weight: bold;">Level {}: {}</span><br/>{}<br/><small>{}% to next level</small>',
+            color, obj.current_trophy_level, level_name, progress_bar, f"{obj.level_progress_percentage:.1f}"
         )
     get_trophy_level_display.short_description = 'Trophy Level'
     
@@ -101,8 +103,7 @@ class UserAdmin(BaseUserAdmin):
         """Display trophy counts with icons"""
         return format_html(
             '🥉{} 🥈{} 🥇{} 🏆{}<br/><strong>Total: {}</strong>',
-            obj.bronze_count, obj.silver_count, obj.gold_count, obj.platinum_count,
-            obj.bronze_count + obj.silver_count + obj.gold_count + obj.platinum_count
+            obj.bronze_count, obj.silver_count, obj.gold_count, obj.platinum_count, obj.trophy_total
         )
     get_trophy_summary.short_description = 'Trophies'
     
@@ -114,6 +115,12 @@ class UserAdmin(BaseUserAdmin):
     
     actions = ['sync_trophy_data', 'recalculate_scores', 'reset_sync_errors', 'disable_sync', 'enable_sync']
     
+    def get_queryset(self, request):
+        """Total trophy count computed in the list query"""
+        return super().get_queryset(request).annotate(
+            trophy_total=F('bronze_count') + F('silver_count') + F('gold_count') + F('platinum_count')
+        )
+    
     def sync_trophy_data(self, request, queryset):
         """Action to sync trophy data for selected users"""
         from psn_integration.services import PSNAWPService
@@ -143,11 +150,10 @@ class UserAdmin(BaseUserAdmin):
     
     def recalculate_scores(self, request, queryset):
         """Action to recalculate trophy scores for selected users"""
-        count = 0
-        for user in queryset:
-            user.update_all_trophy_data()
-            count += 1
-        
+        count, changed, job = run_or_queue(request, queryset, 'recalculate_user_scores')
+        if job:
+            self.message_user(request, queued_message(job))
+            return
         self.message_user(request, f"♻️ Recalculated trophy data for {count} users.")
     recalculate_scores.short_description = "♻️ Recalculate trophy scores and levels"
     
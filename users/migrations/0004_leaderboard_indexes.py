@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_remove_user_psn_access_token_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-total_trophy_score', 'id'], name='users_user_score_idx'),
+        ),
+    ]
@@ -4,6 +4,37 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
 
+# (minimum score, level) - level thresholds from the project plan
+LEVEL_THRESHOLDS = [
+    (0, 1), (100, 2), (350, 3), (850, 4), (1850, 5),
+    (3850, 6), (7850, 7), (15350, 8), (27850, 9), (47850, 10),
+    (80350, 11), (130350, 12), (205350, 13), (315350, 14), (475350, 15),
+    (700350, 16), (1010350, 17), (1430350, 18), (1980350, 19), (2730350, 20)
+]
+
+TROPHY_LEVEL_NAMES = {
+    1: "PS Noob",
+    2: "Button Masher",
+    3: "Trophy Hunter",
+    4: "Achievement Seeker",
+    5: "Digital Collector",
+    6: "Gaming Enthusiast",
+    7: "Skill Apprentice",
+    8: "Trophy Veteran",
+    9: "Gaming Gladiator",
+    10: "Platinum Pursuer",
+    11: "Elite Gamer",
+    12: "Trophy Titan",
+    13: "Achievement Ace",
+    14: "Legendary Hunter",
+    15: "Gaming Virtuoso",
+    16: "Trophy Overlord",
+    17: "Digital Deity",
+    18: "PlayStation Paragon",
+    19: "Trophy Transcendent",
+    20: "Maybe I Was The PlayStation All Along"
+}
+
 class User(AbstractUser):
     """Extended User model with PSN integration and trophy tracking"""
     
@@ -48,42 +79,14 @@ class User(AbstractUser):
     
     def get_trophy_level_name(self):
         """Return the trophy level name based on current level"""
-        level_names = {
-            1: "PS Noob",
-            2: "Button Masher", 
-            3: "Trophy Hunter",
-            4: "Achievement Seeker",
-            5: "Digital Collector",
-            6: "Gaming Enthusiast",
-            7: "Skill Apprentice",
-            8: "Trophy Veteran",
-            9: "Gaming Gladiator",
-            10: "Platinum Pursuer",
-            11: "Elite Gamer",
-            12: "Trophy Titan",
-            13: "Achievement Ace",
-            14: "Legendary Hunter",
-            15: "Gaming Virtuoso",
-            16: "Trophy Overlord",
-            17: "Digital Deity",
-            18: "PlayStation Paragon",
-            19: "Trophy Transcendent",
-            20: "Maybe I Was The PlayStation All Along"
-        }
-        return level_names.get(self.current_trophy_level, "Unknown Level")
+        return TROPHY_LEVEL_NAMES.get(self.current_trophy_level, "Unknown Level")
     
     def calculate_total_score(self):
         """Calculate total trophy score from all user trophies"""
         from trophies.models import UserTrophy
-        total = 0
-        user_trophies = UserTrophy.objects.filter(user=self, earned=True).select_related('trophy__game')
-        
-        for user_trophy in user_trophies:
-            trophy = user_trophy.trophy
-            game = trophy.game
-            base_points = trophy.get_base_points()
-            multiplier = game.difficulty_multiplier
-            total += int(base_points * multiplier)
+        total = UserTrophy.objects.filter(user=self, earned=True).aggregate(
+            total=models.Sum('trophy__points')
+        )['total'] or 0
         
         self.total_trophy_score = total
         self.save(update_fields=['total_trophy_score'])
@@ -91,13 +94,7 @@ class User(AbstractUser):
     
     def update_trophy_level(self):
         """Update user's trophy level based on total score"""
-        # Level thresholds from the project plan
-        level_thresholds = [
-            (0, 1), (100, 2), (350, 3), (850, 4), (1850, 5),
-            (3850, 6), (7850, 7), (15350, 8), (27850, 9), (47850, 10),
-            (80350, 11), (130350, 12), (205350, 13), (315350, 14), (475350, 15),
-            (700350, 16), (1010350, 17), (1430350, 18), (1980350, 19), (2730350, 20)
-        ]
+        level_thresholds = LEVEL_THRESHOLDS
         
         new_level = 1
         next_threshold = 100
@@ -197,4 +194,8 @@ class User(AbstractUser):
         ])
 
     class Meta:
-        db_table = 'users_user'
\ No newline at end of file
+        db_table = 'users_user'
+        indexes = [
+            # Leaderboard order (home page, API cursor pagination)
+            models.Index(fields=['-total_trophy_score', 'id'], name='users_user_score_idx'),
+        ]
\ No newline at end of file
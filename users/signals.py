@@ -0,0 +1,25 @@
+# users/signals.py
+from django.dispatch import receiver
+from games.signals import difficulty_multiplier_changed, difficulty_multipliers_changed
+from psn_integration.signals import sync_completed
+from trophy_tracker.caching import invalidate
+from trophy_tracker.db_router import pin_to_primary
+
+
+@receiver(sync_completed)
+def invalidate_home_after_sync(sender, sync_job, **kwargs):
+    """Scores and leaderboard positions may have changed"""
+    invalidate('home')
+
+
+@receiver(sync_completed)
+def pin_user_to_primary_after_sync(sender, sync_job, **kwargs):
+    """Read-your-writes: the user sees their new trophies even if replicas lag"""
+    pin_to_primary(sync_job.user_id)
+
+
+@receiver(difficulty_multiplier_changed)
+@receiver(difficulty_multipliers_changed)
+def invalidate_home_after_multiplier_change(sender, **kwargs):
+    """Featured games are picked by difficulty multiplier"""
+    invalidate('home')
@@ -15,11 +15,17 @@ from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.urls import reverse_lazy
+from django.conf import settings as django_settings
+from trophy_tracker.caching import cached
+from trophy_tracker.conditional import conditional_view, timestamp_token
+from trophy_tracker.db_router import replica_reads
 from .forms import PSNRegistrationForm
+from .models import TROPHY_LEVEL_NAMES
 
 # Import PSNAWPService
 from psn_integration.services import PSNAWPService
 from psn_integration.models import PSNSyncJob, PSNUserValidation
+from psn_integration.validation_cache import validate_psn_id as validate_psn_id_cached
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,6 +33,7 @@ logger = logging.getLogger(__name__)
 # Import trophy models
 try:
     from trophies.models import UserTrophy, UserGameProgress
+    from trophies.trophy_sets import recent_user_trophies
 except ImportError:
     UserTrophy = None
     UserGameProgress = None
@@ -60,37 +67,54 @@ class CustomLoginView(LoginView):
         messages.error(self.request, 'Invalid username or password.')
         return super().form_invalid(form)
 
+@replica_reads
 def home(request):
-    """Home page view with featured content"""
+    """Home page view with featured content (served from the 'home' cache namespace)"""
     
     # Get some sample data for the home page
-    total_users = User.objects.count()
-    total_games = Game.objects.count() if Game else 0
+    counts = cached('home', 'counts', lambda: {
+        'total_users': User.objects.count(),
+        'total_games': Game.objects.count() if Game else 0,
+    })
     
     # Get top users for leaderboard preview
-    top_users = User.objects.filter(
-        total_trophy_score__gt=0
-    ).order_by('-total_trophy_score')[:10]
+    top_users = cached('home', 'top_user_rows', get_top_users)
     
     # Get featured games (high difficulty or popular)
-    featured_games = []
-    if Game:
-        featured_games = Game.objects.filter(
-            difficulty_multiplier__gte=5.0
-        ).order_by('-difficulty_multiplier')[:6]
-        
-        # If no high-difficulty games, get any games
-        if not featured_games:
-            featured_games = Game.objects.all()[:6]
+    featured_games = cached('home', 'featured_games', get_featured_games)
     
     context = {
-        'total_users': total_users,
-        'total_games': total_games,
+        'total_users': counts['total_users'],
+        'total_games': counts['total_games'],
         'top_users': top_users,
         'featured_games': featured_games,
     }
     return render(request, 'users/home.html', context)
 
+def get_top_users():
+    """Leaderboard preview rows - just the fields the home page shows, cheap to cache"""
+    top_users = list(User.objects.filter(total_trophy_score__gt=0).order_by('-total_trophy_score').values(
+        'username', 'psn_id', 'current_trophy_level', 'total_trophy_score',
+        'bronze_count', 'silver_count', 'gold_count', 'platinum_count',
+    )[:10])
+    for row in top_users:
+        row['level_name'] = TROPHY_LEVEL_NAMES.get(row['current_trophy_level'], "Unknown Level")
+    return top_users
+
+def get_featured_games():
+    """High difficulty games for the home page, or any games if there are none"""
+    if not Game:
+        return []
+    
+    featured_games = list(Game.objects.filter(
+        difficulty_multiplier__gte=5.0
+    ).order_by('-difficulty_multiplier')[:6])
+    
+    # If no high-difficulty games, get any games
+    if not featured_games:
+        featured_games = list(Game.objects.all()[:6])
+    return featured_games
+
 def register(request):
     """Simplified registration with PSN ID"""
     if request.method == 'POST':
@@ -127,6 +151,39 @@ def sync_progress(request):
     
     return render(request, 'users/sync_progress.html')
 
+def profile_validators(request, username=None):
+    """ETag/Last-Modified for a profile page from the profile's (and viewer's) timestamps"""
+    viewer = request.user if request.user.is_authenticated else None
+    
+    if username and not (viewer and viewer.username == username):
+        profile_row = User.objects.filter(username=username).values(
+            'pk', 'last_trophy_sync', 'profile_updated', 'profile_public'
+        ).first()
+        # Missing and private profiles are never validated, so the view handles them
+        if not profile_row or not profile_row['profile_public']:
+            return None
+    elif viewer:
+        profile_row = {
+            'pk': viewer.pk,
+            'last_trophy_sync': viewer.last_trophy_sync,
+            'profile_updated': viewer.profile_updated,
+        }
+    else:
+        return None
+    
+    # The page header shows the viewer too, so their changes count as well
+    timestamps = [profile_row['last_trophy_sync'], profile_row['profile_updated']]
+    if viewer:
+        timestamps += [viewer.last_trophy_sync, viewer.profile_updated]
+    
+    etag = '-'.join([
+        'profile', str(profile_row['pk']), str(viewer.pk if viewer else 0),
+        *(timestamp_token(value) for value in timestamps),
+    ])
+    return etag, max((value for value in timestamps if value), default=None)
+
+@replica_reads
+@conditional_view('profile', profile_validators)
 def profile(request, username=None):
     """User profile view"""
     if username:
@@ -142,36 +199,56 @@ def profile(request, username=None):
             messages.error(request, 'This profile is private.')
             return redirect('users:home')
     
-    # Get trophy statistics
-    total_trophies = (profile_user.bronze_count + profile_user.silver_count + 
-                     profile_user.gold_count + profile_user.platinum_count)
-    
-    # Get recent trophy activity
-    recent_trophies = []
-    if UserTrophy:
-        recent_trophies = UserTrophy.objects.filter(
-            user=profile_user, 
-            earned=True,
-            earned_datetime__isnull=False
-        ).select_related('trophy__game').order_by('-earned_datetime')[:10]
-    
-    # Get game progress
-    game_progress = []
-    if UserGameProgress:
-        game_progress = UserGameProgress.objects.filter(
-            user=profile_user
-        ).select_related('game').order_by('-last_updated')[:10]
+    # Trophy data is cached per profile; the key changes after every sync or profile save
+    profile_data = get_profile_data(profile_user)
     
     context = {
         'profile_user': profile_user,
-        'total_trophies': total_trophies,
-        'recent_trophies': recent_trophies,
-        'game_progress': game_progress,
+        'total_trophies': profile_data['total_trophies'],
+        'recent_trophies': profile_data['recent_trophies'],
+        'game_progress': profile_data['game_progress'],
         'is_own_profile': profile_user == request.user if request.user.is_authenticated else False,
     }
     
     return render(request, 'users/profile.html', context)
 
+def get_profile_data(profile_user):
+    """
+    Trophy statistics, recent trophies and game progress for a profile,
+    cached under a key built from last_trophy_sync and profile_updated
+    so the first view after a sync rebuilds it
+    """
+    last_sync = profile_user.last_trophy_sync.timestamp() if profile_user.last_trophy_sync else 0
+    updated = profile_user.profile_updated.timestamp() if profile_user.profile_updated else 0
+    
+    def build():
+        # Get trophy statistics
+        total_trophies = (profile_user.bronze_count + profile_user.silver_count + 
+                         profile_user.gold_count + profile_user.platinum_count)
+        
+        # Get recent trophy activity
+        recent_trophies = []
+        if UserTrophy:
+            recent_trophies = recent_user_trophies(profile_user, limit=10)
+        
+        # Get game progress
+        game_progress = []
+        if UserGameProgress:
+            game_progress = list(UserGameProgress.objects.filter(
+                user=profile_user
+            ).select_related('game').order_by('-last_updated')[:10])
+        
+        return {
+            'total_trophies': total_trophies,
+            'recent_trophies': recent_trophies,
+            'game_progress': game_progress,
+        }
+    
+    return cached(
+        'profile', f"{profile_user.pk}:{last_sync:.0f}:{updated:.6f}", build,
+        timeout=django_settings.PROFILE_CACHE_TIMEOUT
+    )
+
 @login_required
 def profile_edit(request):
     """Edit profile page"""
@@ -226,8 +303,7 @@ def settings(request):
         if new_psn_id and new_psn_id != request.user.psn_id:
             try:
                 # Validate new PSN ID
-                psn_service = PSNAWPService()
-                validation_result = psn_service.validate_psn_user(new_psn_id)
+                validation_result = validate_psn_id_cached(new_psn_id)
                 
                 if validation_result['valid']:
                     request.user.psn_id = new_psn_id
@@ -295,7 +371,7 @@ def sync_trophies(request):
     # Check for existing running sync job
     existing_job = PSNSyncJob.objects.filter(
         user=request.user,
-        status__in=['pending', 'running']
+        status__in=['pending', 'running', 'parked']
     ).first()
     
     if existing_job:
@@ -338,7 +414,18 @@ def sync_trophies(request):
             'message': f'Error starting trophy sync: {str(e)}'
         })
 
+def sync_status_validators(request):
+    """ETag for the sync status JSON from the job's progress fields"""
+    job_id = request.GET.get('job_id')
+    if not job_id:
+        return None
+    try:
+        return PSNSyncJob.progress_etag(job_id, request.user), None
+    except (ValidationError, ValueError):
+        return None
+
 @login_required
+@conditional_view('sync_status', sync_status_validators)
 def sync_status(request):
     """Get status of current sync job"""
     job_id = request.GET.get('job_id')
@@ -368,6 +455,7 @@ def sync_status(request):
             'level_after': sync_job.level_after,
             'levels_gained': sync_job.level_gained(),
             'error_message': sync_job.error_message,
+            'resume_after': sync_job.resume_after.isoformat() if sync_job.resume_after else None,
             'started_at': sync_job.started_at.isoformat() if sync_job.started_at else None,
             'completed_at': sync_job.completed_at.isoformat() if sync_job.completed_at else None,
         })
@@ -398,28 +486,10 @@ def validate_psn_id(request):
         })
     
     try:
-        # Validate with PlayStation Network
-        psn_service = PSNAWPService()
-        validation_result = psn_service.validate_psn_user(psn_id)
+        # Validate with PlayStation Network (cached, stored in PSNUserValidation)
+        validation_result = validate_psn_id_cached(psn_id)
         
         if validation_result['valid']:
-            # Store validation result
-            PSNUserValidation.objects.update_or_create(
-                psn_id=psn_id,
-                defaults={
-                    'validation_status': 'valid',
-                    'is_valid': True,
-                    'is_public': True,
-                    'psn_account_id': validation_result.get('account_id', ''),
-                    'display_name': validation_result.get('display_name', psn_id),
-                    'avatar_url': validation_result.get('avatar_url', ''),
-                    'trophy_level': validation_result.get('trophy_level', 1),
-                    'total_trophies': validation_result.get('total_trophies', {}),
-                    'trophy_points': validation_result.get('trophy_points', 0),
-                    'last_error': ''
-                }
-            )
-            
             return JsonResponse({
                 'success': True,
                 'message': 'PSN ID is valid and accessible!',